@@ -0,0 +1,24 @@
+# Configuração de produção: gunicorn -c gunicorn.conf.py src.main:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+keepalive = 5
+
+# Carregar o app (e o índice de estratégias) no mestre, antes do fork
+preload_app = True
+
+
+def when_ready(server):
+    from src.main import app, preload
+    preload(app)
+
+
+def post_fork(server, worker):
+    from src.main import app
+    from src.models.engine import dispose_engines
+    dispose_engines(app)
@@ -3,42 +3,164 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import threading
+import time
+
+_import_started = time.perf_counter()
+
+from flask import Flask, current_app
 from src.models.user import db
+from src.models.migrations import run_migrations
+from src.models.engine import configure_database, worker_context
 from src.routes.user import user_bp
 from src.routes.bot import bot_bp
 from src.routes.signal import signal_bp
+from src.routes.admin import admin_bp
+from src.routes.bulk import bulk_bp
+from src.services.serializer import FastJSONProvider
+from src.services.retention import retention
+from src.services.counters import counters
+from src.services.outbox import outbox
+from src.services.event_log import event_log
+from src.services.checkpoint import checkpoint
+from src.services.monitors import monitors
+from src.services.feed_router import feed_router
+from src.services.strategy_index import strategy_index
+from src.services import telegram_service
+from src.services.static_assets import StaticManifest
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo de inicialização esperado para um worker (segundos)
+STARTUP_TARGET = float(os.environ.get('STARTUP_TARGET_SECONDS', 1.0))
+
+_init_lock = threading.Lock()
+
+
+def create_app(database_url=None):
+    """
+    Criar a aplicação Flask
+
+    Não acessa o banco: a verificação de esquema e os serviços de
+    background rodam na primeira requisição (ou em preload()).
+    """
+    started = time.perf_counter()
+
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
+    app.json = FastJSONProvider(app)
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(bot_bp, url_prefix='/api')
+    app.register_blueprint(signal_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    app.register_blueprint(bulk_bp, url_prefix='/api')
+
+    # Banco configurável por DATABASE_URL / DATABASE_READ_URL (padrão: SQLite local)
+    configure_database(app, database_url)
+
+    # Manifesto em memória da pasta estática (recarregado em modo debug)
+    app.extensions['static_manifest'] = StaticManifest(
+        app.static_folder,
+        auto_reload=os.environ.get('APP_ENV', 'development') != 'production'
+    )
+    app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', serve)
+
+    app.extensions['roasbot'] = {'schema_ready': False, 'services_pid': None}
+    app.before_request(lambda: _ensure_initialized(app))
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    app.config['STARTUP_SECONDS'] = round(time.perf_counter() - started, 4)
+    return app
 
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(bot_bp, url_prefix='/api')
-app.register_blueprint(signal_bp, url_prefix='/api')
 
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+def ensure_schema(app):
+    """Criar tabelas e aplicar migrações (uma vez por aplicação)"""
+    state = app.extensions['roasbot']
+    if state['schema_ready']:
+        return
+
+    with _init_lock:
+        if state['schema_ready']:
+            return
+        with app.app_context():
+            db.create_all()
+            run_migrations()
+        state['schema_ready'] = True
+
+
+def start_background_services(app):
+    """Iniciar threads de background (uma vez por processo, após o fork)"""
+    state = app.extensions['roasbot']
+    if state['services_pid'] == os.getpid():
+        return
+
+    with _init_lock:
+        if state['services_pid'] == os.getpid():
+            return
+        retention.start(app)
+        counters.start(app)
+        outbox.start(app)
+        checkpoint.restore(feed_router)
+        event_log.start(app, feed_router)
+        checkpoint.start(feed_router)
+        with worker_context(app):
+            monitors.resume(app)
+        state['services_pid'] = os.getpid()
+
+
+def _ensure_initialized(app):
+    state = app.extensions['roasbot']
+    if state['schema_ready'] and state['services_pid'] == os.getpid():
+        return
+    ensure_schema(app)
+    start_background_services(app)
+
+
+def preload(app):
+    """
+    Preparar o processo mestre antes do fork dos workers
+
+    Verifica o esquema, importa módulos pesados, carrega o índice de
+    estratégias e restaura o histórico dos feeds (checkpoint + log de
+    rodadas); os workers herdam tudo por copy-on-write.
+    """
+    ensure_schema(app)
+    telegram_service.load_requests()
+    with app.app_context():
+        strategy_index.preload()
+        checkpoint.restore(feed_router)
+        event_log.preload(feed_router)
+
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    manifest = current_app.extensions['static_manifest']
+    if manifest.folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    asset = manifest.lookup(path)
+    if asset is None:
+        return "index.html not found", 404
+    return manifest.respond(asset)
+
+
+app = create_app()
+
+STARTUP_SECONDS = round(time.perf_counter() - _import_started, 4)
+app.config['IMPORT_SECONDS'] = STARTUP_SECONDS
+if STARTUP_SECONDS > STARTUP_TARGET:
+    logger.warning(f"Inicialização levou {STARTUP_SECONDS}s (meta: {STARTUP_TARGET}s)")
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    production = os.environ.get('APP_ENV', 'development') == 'production'
+    if production:
+        preload(app)
+    app.run(
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', 5000)),
+        debug=not production,
+        threaded=True
+    )
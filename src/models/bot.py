@@ -1,6 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import json
 from src.models.user import db
+from src.services.serializer import RawJSON, dumps_bytes, game_data_as_string
 
 class Bot(db.Model):
     __tablename__ = 'bots'
@@ -11,6 +13,7 @@ class Bot(db.Model):
     casino_site = db.Column(db.String(50), nullable=False)  # blaze, smashup, 1win, etc
     telegram_token = db.Column(db.String(200), nullable=False)
     telegram_chat_id = db.Column(db.String(50), nullable=False)
+    digest_window = db.Column(db.Float, default=0)  # Segundos agrupando sinais do chat (0 = desativado)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -26,6 +29,7 @@ class Bot(db.Model):
             'casino_site': self.casino_site,
             'telegram_token': self.telegram_token,
             'telegram_chat_id': self.telegram_chat_id,
+            'digest_window': self.digest_window or 0,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
@@ -83,25 +87,155 @@ class Strategy(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# Códigos compactos para o campo "result" das rodadas
+RESULT_CODES = {
+    'red': 1,
+    'black': 2,
+    'green': 3,
+    'win': 4,
+    'loss': 5
+}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+class RoundDataMixin:
+    """Colunas tipadas dos dados de uma rodada (sem JSON no caminho comum)"""
+    
+    game_type = db.Column(db.String(50), nullable=False)
+    casino_site = db.Column(db.String(50))  # Feed de origem (blaze, 1win, etc)
+    multiplier = db.Column(db.Float)
+    result_code = db.Column(db.SmallInteger)  # Ver RESULT_CODES
+    crashed = db.Column(db.Boolean)
+    value = db.Column(db.Integer)
+    played_at = db.Column(db.DateTime)
+    extra = db.Column(db.Text)  # JSON apenas com campos não mapeados (normalmente nulo)
+    
+    @classmethod
+    def from_game_data(cls, game_type, game_data, casino_site=None):
+        """Criar rodada a partir do dict de dados do jogo"""
+        data = dict(game_data or {})
+        round_ = cls(game_type=game_type, casino_site=casino_site)
+        
+        timestamp = data.pop('timestamp', None)
+        if timestamp:
+            try:
+                round_.played_at = datetime.fromisoformat(timestamp)
+            except (TypeError, ValueError):
+                data['timestamp'] = timestamp
+        
+        if 'multiplier' in data:
+            try:
+                round_.multiplier = float(data['multiplier'])
+                del data['multiplier']
+            except (TypeError, ValueError):
+                pass
+        
+        if 'result' in data:
+            code = RESULT_CODES.get(str(data['result']).lower())
+            if code is not None:
+                round_.result_code = code
+                del data['result']
+        
+        if isinstance(data.get('crashed'), bool):
+            round_.crashed = data.pop('crashed')
+        
+        if isinstance(data.get('value'), int) and not isinstance(data.get('value'), bool):
+            round_.value = data.pop('value')
+        
+        round_.extra = json.dumps(data) if data else None
+        return round_
+    
+    def to_game_data(self):
+        """Reconstruir o dict de dados do jogo no formato original"""
+        data = {}
+        if self.result_code is not None:
+            data['result'] = RESULT_NAMES.get(self.result_code, 'unknown')
+        if self.multiplier is not None:
+            data['multiplier'] = self.multiplier
+        if self.crashed is not None:
+            data['crashed'] = self.crashed
+        if self.value is not None:
+            data['value'] = self.value
+        if self.extra:
+            data.update(json.loads(self.extra))
+        if self.played_at is not None:
+            data['timestamp'] = self.played_at.isoformat()
+        return data
+
+class GameRound(RoundDataMixin, db.Model):
+    __tablename__ = 'game_rounds'
+    __table_args__ = (
+        db.Index('ix_game_rounds_game_type_played_at', 'game_type', 'played_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+
+class RoundEvent(RoundDataMixin, db.Model):
+    """Log append-only das rodadas recebidas, lido por todos os workers"""
+    __tablename__ = 'round_events'
+    __table_args__ = (
+        db.Index('ix_round_events_feed_id', 'casino_site', 'game_type', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    received_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
 class GameResult(db.Model):
     __tablename__ = 'game_results'
     
     id = db.Column(db.Integer, primary_key=True)
-    strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=False)
-    game_data = db.Column(db.Text, nullable=False)  # JSON com dados do jogo
+    strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=False, index=True)
+    round_id = db.Column(db.Integer, db.ForeignKey('game_rounds.id'), index=True)
+    game_data = db.Column(db.Text)  # JSON legado (linhas ainda não migradas para game_rounds)
     signal_sent = db.Column(db.Boolean, default=False)
     result = db.Column(db.String(20))  # win, loss, pending
     used_gale = db.Column(db.Boolean, default=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
-    def to_dict(self):
+    round = db.relationship('GameRound', lazy='joined')
+    
+    def to_dict(self, as_string=None):
+        """
+        Args:
+            as_string: game_data como string JSON (formato da API) ou
+                objeto; por padrão segue GAME_DATA_AS_STRING (ligado)
+        """
+        if as_string is None:
+            as_string = game_data_as_string()
+        
+        if self.round is not None:
+            game_data = self.round.to_game_data()
+            if as_string:
+                game_data = dumps_bytes(game_data).decode('utf-8')
+        elif as_string:
+            game_data = self.game_data
+        else:
+            game_data = RawJSON(self.game_data)  # JSON armazenado, repassado sem re-codificar
+        
         return {
             'id': self.id,
             'strategy_id': self.strategy_id,
-            'game_data': self.game_data,
+            'round_id': self.round_id,
+            'game_data': game_data,
             'signal_sent': self.signal_sent,
             'result': self.result,
             'used_gale': self.used_gale,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
+class ResultArchive(db.Model):
+    __tablename__ = 'result_archives'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)  # Partição diária arquivada
+    path = db.Column(db.String(255), nullable=False)  # Arquivo NDJSON comprimido (gzip)
+    row_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'day': self.day.isoformat() if self.day else None,
+            'path': self.path,
+            'row_count': self.row_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
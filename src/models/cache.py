@@ -0,0 +1,13 @@
+from src.models.user import db
+
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(100), primary_key=True)  # ex.: "bots", "strategies:12"
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version
+        }
@@ -0,0 +1,168 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from src.models.user import db
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'app.db')}"
+READ_BIND = 'read'
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def normalize_database_url(url: str) -> str:
+    """Aceitar URLs no formato postgres:// (Heroku/Render) como postgresql://"""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Opções de engine/pool para uma URL, a partir das variáveis de ambiente
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE e
+    DB_POOL_PRE_PING. Para SQLite em memória o pool padrão é mantido.
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True)
+    }
+
+    if parsed.get_backend_name() == 'sqlite':
+        options['connect_args'] = {
+            'timeout': float(os.environ.get('DB_SQLITE_BUSY_TIMEOUT', 30)),
+            'check_same_thread': False
+        }
+        if not parsed.database or parsed.database == ':memory:':
+            return options
+
+    options.update({
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    })
+    return options
+
+
+def configure_database(app, database_url: Optional[str] = None, read_url: Optional[str] = None):
+    """
+    Configurar SQLAlchemy no app (URL, pool e engine de leitura opcional)
+
+    Args:
+        app: Aplicação Flask
+        database_url: URL do banco principal (padrão: DATABASE_URL ou SQLite local)
+        read_url: URL de réplica somente leitura (padrão: DATABASE_READ_URL)
+    """
+    database_url = normalize_database_url(
+        database_url or os.environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+    )
+    read_url = read_url or os.environ.get('DATABASE_READ_URL')
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    if read_url:
+        read_url = normalize_database_url(read_url)
+        app.config['SQLALCHEMY_BINDS'] = {
+            READ_BIND: {'url': read_url, **engine_options(read_url)}
+        }
+
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                _configure_sqlite(engine)
+
+
+def _configure_sqlite(engine):
+    """Habilitar WAL no SQLite para leitores concorrentes com um escritor"""
+    wal = env_bool('DB_SQLITE_WAL', True)
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal and engine.url.database not in (None, '', ':memory:'):
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+
+def dispose_engines(app):
+    """Descartar conexões herdadas do processo mestre (chamar após o fork)"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def read_engine():
+    """Engine de leitura (réplica se configurada, senão o principal)"""
+    return db.engines.get(READ_BIND, db.engine)
+
+
+@contextmanager
+def read_session():
+    """
+    Sessão curta para o caminho quente de leitura
+
+    Usa a réplica quando DATABASE_READ_URL está definida. Os objetos
+    retornados não devem ser alterados (não há commit).
+    """
+    session = Session(bind=read_engine(), expire_on_commit=False, autoflush=False)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+_writer_sessions = {}
+_writer_lock = threading.Lock()
+
+
+def writer_session() -> scoped_session:
+    """
+    Sessão dedicada para escritas em background (flush de contadores, filas)
+
+    Separada da sessão das requisições e escopada por thread, de modo que
+    flushes periódicos não disputam a sessão de quem atende a requisição.
+    """
+    engine = db.engine
+    with _writer_lock:
+        session = _writer_sessions.get(engine)
+        if session is None:
+            session = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+            _writer_sessions[engine] = session
+        return session
+
+
+@contextmanager
+def worker_context(app):
+    """
+    Contexto de aplicação para threads de background (monitores, workers)
+
+    Cada thread recebe sua própria sessão escopada do Flask-SQLAlchemy,
+    que é descartada (e a conexão devolvida ao pool) ao sair.
+    """
+    with app.app_context():
+        try:
+            yield
+        finally:
+            db.session.remove()
+            writer_session().remove()
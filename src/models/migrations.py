@@ -0,0 +1,123 @@
+import json
+from sqlalchemy import inspect, text
+from src.models.user import db
+from src.models.bot import Bot, Strategy, GameRound, GameResult
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 1000
+
+def run_migrations():
+    """Aplicar migrações de esquema/dados pendentes (idempotente)"""
+    _ensure_game_results_round_column()
+    _ensure_column('game_rounds', 'casino_site', 'VARCHAR(50)')
+    _ensure_column('bots', 'digest_window', 'FLOAT DEFAULT 0')
+    _ensure_indexes()
+    migrated = migrate_game_data_to_rounds()
+    if migrated:
+        logger.info(f"{migrated} resultados migrados para game_rounds")
+    return migrated
+
+def _ensure_game_results_round_column():
+    """Adicionar game_results.round_id e tornar game_data opcional em bancos antigos"""
+    inspector = inspect(db.engine)
+    if 'game_results' not in inspector.get_table_names():
+        return
+
+    columns = {column['name'] for column in inspector.get_columns('game_results')}
+    if 'round_id' in columns:
+        return
+
+    with db.engine.begin() as conn:
+        if conn.dialect.name == 'sqlite':
+            # SQLite não altera NOT NULL: recriar a tabela e copiar as linhas
+            conn.execute(text('ALTER TABLE game_results RENAME TO game_results_legacy'))
+            for index in GameResult.__table__.indexes:
+                conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+            GameResult.__table__.create(conn)
+            conn.execute(text(
+                'INSERT INTO game_results '
+                '(id, strategy_id, game_data, signal_sent, result, used_gale, timestamp) '
+                'SELECT id, strategy_id, game_data, signal_sent, result, used_gale, timestamp '
+                'FROM game_results_legacy'
+            ))
+            conn.execute(text('DROP TABLE game_results_legacy'))
+        else:
+            conn.execute(text(
+                'ALTER TABLE game_results ADD COLUMN round_id INTEGER REFERENCES game_rounds (id)'
+            ))
+            conn.execute(text('ALTER TABLE game_results ALTER COLUMN game_data DROP NOT NULL'))
+            conn.execute(text(
+                'CREATE INDEX IF NOT EXISTS ix_game_results_round_id ON game_results (round_id)'
+            ))
+
+def _ensure_column(table, column, ddl_type):
+    """Adicionar coluna opcional a uma tabela existente (create_all não altera tabelas)"""
+    inspector = inspect(db.engine)
+    if table not in inspector.get_table_names():
+        return
+    if column in {existing['name'] for existing in inspector.get_columns(table)}:
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}'))
+
+def _ensure_indexes():
+    """Criar índices adicionados ao modelo depois da criação das tabelas"""
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_game_results_timestamp ON game_results (timestamp)'
+        ))
+
+def migrate_game_data_to_rounds(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Converter game_results.game_data (JSON) em linhas de game_rounds
+
+    Resultados com o mesmo JSON para o mesmo tipo de jogo (a mesma rodada
+    disparando várias estratégias) passam a apontar para uma única rodada.
+
+    Returns:
+        Quantidade de resultados migrados
+    """
+    total = 0
+    round_ids = {}
+
+    while True:
+        rows = db.session.query(GameResult.id, GameResult.game_data, Bot.game_type) \
+            .outerjoin(Strategy, Strategy.id == GameResult.strategy_id) \
+            .outerjoin(Bot, Bot.id == Strategy.bot_id) \
+            .filter(GameResult.round_id.is_(None), GameResult.game_data.isnot(None)) \
+            .order_by(GameResult.id) \
+            .limit(batch_size) \
+            .all()
+
+        if not rows:
+            break
+
+        updates = []
+        for result_id, raw, game_type in rows:
+            game_type = game_type or 'unknown'
+            key = (game_type, raw)
+            round_id = round_ids.get(key)
+
+            if round_id is None:
+                try:
+                    game_data = json.loads(raw)
+                except ValueError:
+                    game_data = {'raw': raw}
+                if not isinstance(game_data, dict):
+                    game_data = {'value': game_data}
+
+                game_round = GameRound.from_game_data(game_type, game_data)
+                db.session.add(game_round)
+                db.session.flush()
+                round_id = round_ids[key] = game_round.id
+
+            updates.append({'id': result_id, 'round_id': round_id, 'game_data': None})
+
+        db.session.execute(db.update(GameResult), updates)
+        db.session.commit()
+        total += len(updates)
+
+    return total
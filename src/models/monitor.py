@@ -0,0 +1,23 @@
+from datetime import datetime
+from src.models.user import db
+
+class MonitorLease(db.Model):
+    """Estado pedido e posse do monitor de um robô (compartilhado entre os workers)"""
+    __tablename__ = 'monitor_leases'
+
+    bot_id = db.Column(db.Integer, primary_key=True)
+    desired_state = db.Column(db.String(20), nullable=False, default='running')  # running, paused, stopped
+    interval = db.Column(db.Float)
+    owner = db.Column(db.String(120))  # "host:pid" do processo que roda a thread
+    heartbeat_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'bot_id': self.bot_id,
+            'desired_state': self.desired_state,
+            'interval': self.interval,
+            'owner': self.owner,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
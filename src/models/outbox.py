@@ -0,0 +1,45 @@
+from datetime import datetime
+from src.models.user import db
+
+# Estados de uma mensagem no outbox
+OUTBOX_PENDING = 'pending'
+OUTBOX_SENDING = 'sending'
+OUTBOX_SENT = 'sent'
+OUTBOX_FAILED = 'failed'
+
+class OutboxMessage(db.Model):
+    __tablename__ = 'telegram_outbox'
+    __table_args__ = (
+        db.Index('ix_telegram_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    idempotency_key = db.Column(db.String(120), nullable=False, unique=True)
+    bot_id = db.Column(db.Integer, nullable=False, index=True)  # Token resolvido no envio
+    chat_id = db.Column(db.String(100), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    parse_mode = db.Column(db.String(20), default='HTML')
+    result_id = db.Column(db.Integer)  # GameResult marcado como enviado após a entrega
+    status = db.Column(db.String(20), nullable=False, default=OUTBOX_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = db.Column(db.DateTime)  # Reserva do worker que está enviando
+    claim_token = db.Column(db.String(40), index=True)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    sent_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'idempotency_key': self.idempotency_key,
+            'bot_id': self.bot_id,
+            'chat_id': self.chat_id,
+            'result_id': self.result_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -0,0 +1,286 @@
+from flask import Blueprint, request, jsonify, Response, current_app
+from src.services.profiler import profiler
+from src.services.retention import retention
+from src.services.serializer import row_cache
+from src.services.http_cache import response_cache
+from src.services.counters import counters
+from src.services.outbox import outbox
+from src.services.telegram_service import telegram_registry
+from src.services.event_log import event_log
+from src.services.checkpoint import checkpoint
+from src.services.monitors import monitors, validate_interval
+from src.models.user import db
+from src.models.bot import Bot
+from functools import wraps
+import hmac
+import os
+
+admin_bp = Blueprint('admin', __name__)
+
+def require_admin(view):
+    """Exigir o cabeçalho X-Admin-Token igual à variável ADMIN_TOKEN"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        admin_token = os.environ.get('ADMIN_TOKEN')
+        if not admin_token:
+            return jsonify({
+                'success': False,
+                'error': 'Endpoints administrativos desabilitados (ADMIN_TOKEN não configurado)'
+            }), 403
+
+        provided = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(provided, admin_token):
+            return jsonify({
+                'success': False,
+                'error': 'Token administrativo inválido'
+            }), 401
+
+        return view(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/admin/info', methods=['GET'])
+@require_admin
+def process_info():
+    """Informações do processo (pid e tempos de inicialização)"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'pid': os.getpid(),
+            'import_seconds': current_app.config.get('IMPORT_SECONDS'),
+            'create_app_seconds': current_app.config.get('STARTUP_SECONDS'),
+            'caches': {
+                'rows': row_cache.stats(),
+                'responses': response_cache.stats()
+            },
+            'counters': counters.stats(),
+            'telegram': telegram_registry.stats(),
+            'event_log': event_log.stats(),
+            'checkpoint': checkpoint.stats(),
+            'monitors': monitors.stats()
+        }
+    })
+
+@admin_bp.route('/admin/profiler', methods=['GET'])
+@require_admin
+def profiler_status():
+    """Obter estado do profiler"""
+    return jsonify({
+        'success': True,
+        'data': profiler.status()
+    })
+
+@admin_bp.route('/admin/profiler/start', methods=['POST'])
+@require_admin
+def profiler_start():
+    """Iniciar amostragem por N segundos"""
+    try:
+        data = request.get_json(silent=True) or {}
+        status = profiler.start(
+            duration=data.get('duration', 10),
+            interval_ms=data.get('interval_ms', 5),
+            only_app=data.get('only_app', True)
+        )
+
+        return jsonify({
+            'success': True,
+            'data': status
+        })
+
+    except RuntimeError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 409
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/profiler/stop', methods=['POST'])
+@require_admin
+def profiler_stop():
+    """Interromper a amostragem"""
+    return jsonify({
+        'success': True,
+        'data': profiler.stop()
+    })
+
+@admin_bp.route('/admin/profiler/stacks', methods=['GET'])
+@require_admin
+def profiler_stacks():
+    """Exportar pilhas coletadas (collapsed para flamegraph, ou JSON com ?format=json)"""
+    if request.args.get('format') == 'json':
+        limit = request.args.get('limit', 50, type=int)
+        return jsonify({
+            'success': True,
+            'data': {
+                'status': profiler.status(),
+                'stacks': profiler.top_stacks(limit)
+            }
+        })
+
+    return Response(profiler.collapsed(), mimetype='text/plain')
+
+@admin_bp.route('/admin/retention', methods=['GET'])
+@require_admin
+def retention_status():
+    """Obter estado da retenção e partições arquivadas"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'status': retention.status(),
+                'archives': retention.archives()
+            }
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/retention/run', methods=['POST'])
+@require_admin
+def retention_run():
+    """Executar arquivamento e compactação imediatamente"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': retention.run_once()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/outbox', methods=['GET'])
+@require_admin
+def outbox_status():
+    """Tamanho e taxa de envio do outbox do Telegram"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': outbox.stats()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/outbox/drain', methods=['POST'])
+@require_admin
+def outbox_drain():
+    """Enviar imediatamente as mensagens vencidas"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': outbox.drain()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/outbox/retry', methods=['POST'])
+@require_admin
+def outbox_retry():
+    """Recolocar na fila as mensagens que falharam definitivamente"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': {'requeued': outbox.retry_failed()}
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/monitors', methods=['GET'])
+@require_admin
+def list_monitors():
+    """Estado de todos os monitores (pedidos em qualquer worker)"""
+    return jsonify({
+        'success': True,
+        'data': monitors.statuses()
+    })
+
+@admin_bp.route('/admin/monitors/<int:bot_id>', methods=['GET'])
+@require_admin
+def monitor_status(bot_id):
+    """Estado do monitor de um robô"""
+    status = monitors.status(bot_id)
+    if status is None:
+        return jsonify({
+            'success': False,
+            'error': 'Monitor não encontrado'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': status
+    })
+
+@admin_bp.route('/admin/monitors/<int:bot_id>/start', methods=['POST'])
+@require_admin
+def monitor_start(bot_id):
+    """Iniciar ou retomar o monitor de um robô (intervalo opcional em segundos)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        interval = validate_interval(data.get('interval'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    try:
+        if db.session.get(Bot, bot_id) is None:
+            return jsonify({
+                'success': False,
+                'error': 'Robô não encontrado'
+            }), 404
+
+        status = monitors.start(current_app._get_current_object(), bot_id, interval)
+
+        return jsonify({
+            'success': True,
+            'data': status
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/admin/monitors/<int:bot_id>/<action>', methods=['POST'])
+@require_admin
+def monitor_control(bot_id, action):
+    """Parar ou pausar o monitor de um robô"""
+    if action not in ('stop', 'pause'):
+        return jsonify({
+            'success': False,
+            'error': 'Ação inválida (use start, stop ou pause)'
+        }), 400
+
+    status = monitors.stop(bot_id) if action == 'stop' else monitors.pause(bot_id)
+    if status is None:
+        return jsonify({
+            'success': False,
+            'error': 'Monitor não encontrado'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': status
+    })
@@ -1,20 +1,67 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.bot import Bot, Strategy, GameResult
+from src.services.serializer import cached_dict
+from src.services.strategy_index import strategy_index
+from src.services.http_cache import conditional_listing, versions, bots_key, strategies_key, overview_key
+from src.services import projections
+from src.services.projections import ProjectionError
+from src.services.counters import counters, COUNTER_FIELDS
+from src.services.telegram_service import telegram_registry
+from src.services.outbox import parse_digest_window
 from datetime import datetime
 import json
 
 bot_bp = Blueprint('bot', __name__)
 
 @bot_bp.route('/bots', methods=['GET'])
+@conditional_listing(bots_key, validate=lambda: projections.validate_bot_projection(request.args))
 def get_bots():
-    """Listar todos os robôs"""
+    """Listar todos os robôs (projeção com ?view=summary ou ?fields=id,name,...)"""
     try:
+        if projections.wants_projection(request.args):
+            fields = projections.parse_fields(request.args, projections.BOT_FIELDS,
+                                              projections.BOT_SUMMARY_FIELDS)
+            return jsonify({
+                'success': True,
+                'data': projections.list_bots(fields)
+            })
+        
         bots = Bot.query.all()
         return jsonify({
             'success': True,
-            'data': [bot.to_dict() for bot in bots]
+            'data': [cached_dict(bot) for bot in bots]
+        })
+    except ProjectionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bot_bp.route('/bots/overview', methods=['GET'])
+@conditional_listing(overview_key, validate=lambda: projections.validate_overview_fields(request.args))
+def get_bots_overview():
+    """Robôs com quantidade de estratégias, sinais e taxa de acerto agregados"""
+    try:
+        fields = None
+        if request.args.get('fields'):
+            fields = projections.parse_fields(request.args, projections.BOT_FIELDS,
+                                              projections.BOT_SUMMARY_FIELDS)
+        
+        return jsonify({
+            'success': True,
+            'data': projections.bots_overview(fields)
         })
+    except ProjectionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -36,17 +83,34 @@ def create_bot():
                     'error': f'Campo obrigatório: {field}'
                 }), 400
         
+        try:
+            digest_window = parse_digest_window(data.get('digest_window'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # Validação opcional do token/chat no Telegram (getMe/getChat em cache)
+        if data.get('validate_telegram'):
+            validation = telegram_registry.validate(data['telegram_token'], data['telegram_chat_id'])
+            if not validation['success']:
+                return jsonify(validation), 400
+        
         bot = Bot(
             name=data['name'],
             game_type=data['game_type'],
             casino_site=data['casino_site'],
             telegram_token=data['telegram_token'],
             telegram_chat_id=data['telegram_chat_id'],
+            digest_window=digest_window,
             is_active=data.get('is_active', True)
         )
         
         db.session.add(bot)
         db.session.commit()
+        strategy_index.invalidate()
+        versions.bump(bots_key())
         
         return jsonify({
             'success': True,
@@ -67,14 +131,38 @@ def update_bot(bot_id):
         bot = Bot.query.get_or_404(bot_id)
         data = request.get_json()
         
+        if 'digest_window' in data:
+            try:
+                data['digest_window'] = parse_digest_window(data['digest_window'])
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        
+        if data.get('validate_telegram'):
+            validation = telegram_registry.validate(
+                data.get('telegram_token', bot.telegram_token),
+                data.get('telegram_chat_id', bot.telegram_chat_id)
+            )
+            if not validation['success']:
+                return jsonify(validation), 400
+        
+        previous_token = bot.telegram_token
+        
         # Atualizar campos permitidos
-        allowed_fields = ['name', 'game_type', 'casino_site', 'telegram_token', 'telegram_chat_id', 'is_active']
+        allowed_fields = ['name', 'game_type', 'casino_site', 'telegram_token', 'telegram_chat_id',
+                          'digest_window', 'is_active']
         for field in allowed_fields:
             if field in data:
                 setattr(bot, field, data[field])
         
         bot.updated_at = datetime.utcnow()
         db.session.commit()
+        strategy_index.invalidate()
+        versions.bump(bots_key())
+        if bot.telegram_token != previous_token:
+            telegram_registry.forget(previous_token)
         
         return jsonify({
             'success': True,
@@ -95,6 +183,8 @@ def delete_bot(bot_id):
         bot = Bot.query.get_or_404(bot_id)
         db.session.delete(bot)
         db.session.commit()
+        strategy_index.invalidate()
+        versions.bump(bots_key(), strategies_key(bot_id))
         
         return jsonify({
             'success': True,
@@ -109,17 +199,32 @@ def delete_bot(bot_id):
         }), 500
 
 @bot_bp.route('/bots/<int:bot_id>/strategies', methods=['GET'])
+@conditional_listing(strategies_key, validate=lambda: projections.validate_strategy_projection(request.args))
 def get_bot_strategies(bot_id):
-    """Listar estratégias de um robô"""
+    """Listar estratégias de um robô (projeção com ?view=summary ou ?fields=)"""
     try:
         bot = Bot.query.get_or_404(bot_id)
+        
+        if projections.wants_projection(request.args):
+            fields = projections.parse_fields(request.args, projections.STRATEGY_FIELDS,
+                                              projections.STRATEGY_SUMMARY_FIELDS)
+            return jsonify({
+                'success': True,
+                'data': projections.list_strategies(bot_id, fields)
+            })
+        
         strategies = Strategy.query.filter_by(bot_id=bot_id).all()
         
         return jsonify({
             'success': True,
-            'data': [strategy.to_dict() for strategy in strategies]
+            'data': [cached_dict(strategy) for strategy in strategies]
         })
         
+    except ProjectionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -163,6 +268,8 @@ def create_strategy():
         
         db.session.add(strategy)
         db.session.commit()
+        strategy_index.invalidate()
+        versions.bump(strategies_key(strategy.bot_id))
         
         return jsonify({
             'success': True,
@@ -192,6 +299,8 @@ def update_strategy(strategy_id):
         
         strategy.updated_at = datetime.utcnow()
         db.session.commit()
+        strategy_index.invalidate()
+        versions.bump(strategies_key(strategy.bot_id))
         
         return jsonify({
             'success': True,
@@ -211,14 +320,16 @@ def reset_strategy_stats(strategy_id):
     try:
         strategy = Strategy.query.get_or_404(strategy_id)
         
-        strategy.total_signals = 0
-        strategy.wins = 0
-        strategy.losses = 0
-        strategy.wins_no_gale = 0
-        strategy.wins_with_gale = 0
-        strategy.updated_at = datetime.utcnow()
+        # Zerar no próprio SQL, descartando incrementos ainda não gravados
+        counters.discard(strategy_id)
+        values = {field: 0 for field in COUNTER_FIELDS}
+        values['updated_at'] = datetime.utcnow()
+        Strategy.query.filter_by(id=strategy_id).update(values, synchronize_session=False)
         
         db.session.commit()
+        db.session.refresh(strategy)
+        strategy_index.invalidate()
+        versions.bump(strategies_key(strategy.bot_id))
         
         return jsonify({
             'success': True,
@@ -0,0 +1,326 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from sqlalchemy import insert, select, update
+from src.models.user import db
+from src.models.bot import Bot, Strategy
+from src.services.serializer import dumps_bytes, loads
+from src.services.strategy_index import strategy_index
+from src.services.http_cache import versions, bots_key, strategies_key
+from src.services.outbox import parse_digest_window
+from datetime import datetime, time
+
+bulk_bp = Blueprint('bulk', __name__)
+
+BULK_MAX_ITEMS = 50000
+
+BOT_REQUIRED_FIELDS = ['name', 'game_type', 'casino_site', 'telegram_token', 'telegram_chat_id']
+BOT_FIELDS = BOT_REQUIRED_FIELDS + ['digest_window', 'is_active']
+BOT_DEFAULTS = {'digest_window': 0, 'is_active': True}
+STRATEGY_REQUIRED_FIELDS = ['name', 'pattern', 'action']
+STRATEGY_FIELDS = STRATEGY_REQUIRED_FIELDS + ['start_time', 'end_time', 'custom_message',
+                                              'use_default_message', 'is_active']
+STRATEGY_DEFAULTS = {'use_default_message': True, 'is_active': True}
+
+
+class BulkPayloadError(ValueError):
+    """Corpo da requisição em lote inválido"""
+
+
+def _read_items(*keys):
+    """
+    Ler uma lista de itens do corpo (JSON ou NDJSON)
+
+    Aceita um array JSON, um objeto com a lista em uma das chaves
+    informadas ou application/x-ndjson (um objeto por linha).
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        items = []
+        for number, line in enumerate(request.get_data().splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(loads(line))
+            except ValueError:
+                raise BulkPayloadError(f'JSON inválido na linha {number}')
+    else:
+        try:
+            items = loads(request.get_data() or b'null')
+        except ValueError:
+            raise BulkPayloadError('JSON inválido')
+        if isinstance(items, dict):
+            items = next((items[key] for key in keys if key in items), None)
+
+    if not isinstance(items, list):
+        raise BulkPayloadError('Esperada uma lista de itens')
+    if len(items) > BULK_MAX_ITEMS:
+        raise BulkPayloadError(f'Máximo de {BULK_MAX_ITEMS} itens por requisição')
+    return items
+
+
+def _is_id(value):
+    """Id inteiro (bool é subclasse de int no Python, mas não é id)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _valid_time(value):
+    if value in (None, ''):
+        return True
+    try:
+        time.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _strategy_row(item, bot_id=None):
+    """Validar e montar a linha de uma estratégia (erro, linha)"""
+    if not isinstance(item, dict):
+        return 'Item deve ser um objeto', None
+
+    for field in STRATEGY_REQUIRED_FIELDS:
+        if not item.get(field):
+            return f'Campo obrigatório: {field}', None
+    for field in ('start_time', 'end_time'):
+        if not _valid_time(item.get(field)):
+            return f'Horário inválido em {field} (use HH:MM)', None
+
+    row = {field: item.get(field, STRATEGY_DEFAULTS.get(field)) for field in STRATEGY_FIELDS}
+    row['bot_id'] = bot_id if bot_id is not None else item.get('bot_id')
+    return None, row
+
+
+def _bulk_error(errors):
+    return jsonify({
+        'success': False,
+        'error': f'{len(errors)} item(ns) inválido(s); nada foi gravado',
+        'errors': errors[:100]
+    }), 400
+
+
+def _invalidate(bot_ids, bots_changed=False):
+    strategy_index.invalidate()
+    keys = {strategies_key(bot_id) for bot_id in bot_ids}
+    if bots_changed:
+        keys.add(bots_key())
+    if keys:
+        versions.bump(*keys)
+
+
+@bulk_bp.route('/strategies/bulk', methods=['POST'])
+def bulk_create_strategies():
+    """Criar estratégias em lote (uma transação, insert em massa)"""
+    try:
+        items = _read_items('strategies', 'items')
+
+        errors = []
+        rows = []
+        for index, item in enumerate(items):
+            error, row = _strategy_row(item)
+            if error is None and not _is_id(row['bot_id']):
+                error = 'Campo obrigatório: bot_id'
+            if error:
+                errors.append({'index': index, 'error': error})
+            else:
+                rows.append(row)
+
+        bot_ids = {row['bot_id'] for row in rows}
+        if bot_ids:
+            existing = {bot_id for (bot_id,) in db.session.query(Bot.id).filter(Bot.id.in_(bot_ids))}
+            for index, item in enumerate(items):
+                if isinstance(item, dict) and _is_id(item.get('bot_id')) \
+                        and item['bot_id'] not in existing:
+                    errors.append({'index': index, 'error': 'Robô não encontrado'})
+
+        if errors:
+            return _bulk_error(sorted(errors, key=lambda error: error['index']))
+
+        if rows:
+            db.session.execute(insert(Strategy), rows)
+        db.session.commit()
+        _invalidate(bot_ids)
+
+        return jsonify({
+            'success': True,
+            'data': {'created': len(rows)}
+        }), 201
+
+    except BulkPayloadError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bulk_bp.route('/strategies/bulk', methods=['PUT'])
+def bulk_update_strategies():
+    """Atualizar estratégias em lote (itens com "id" e os campos a alterar)"""
+    try:
+        items = _read_items('strategies', 'items')
+
+        errors = []
+        rows = []
+        now = datetime.utcnow()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not _is_id(item.get('id')):
+                errors.append({'index': index, 'error': 'Campo obrigatório: id'})
+                continue
+            row = {field: item[field] for field in STRATEGY_FIELDS if field in item}
+            if any(field in row and not row[field] for field in STRATEGY_REQUIRED_FIELDS):
+                errors.append({'index': index, 'error': 'Campos name, pattern e action não podem ser vazios'})
+                continue
+            if not all(_valid_time(row.get(field)) for field in ('start_time', 'end_time')):
+                errors.append({'index': index, 'error': 'Horário inválido (use HH:MM)'})
+                continue
+            row['id'] = item['id']
+            row['updated_at'] = now
+            rows.append(row)
+
+        ids = {row['id'] for row in rows}
+        bot_by_strategy = dict(db.session.query(Strategy.id, Strategy.bot_id).filter(Strategy.id.in_(ids))) if ids else {}
+        for index, item in enumerate(items):
+            if isinstance(item, dict) and _is_id(item.get('id')) and item['id'] not in bot_by_strategy:
+                errors.append({'index': index, 'error': 'Estratégia não encontrada'})
+
+        if errors:
+            return _bulk_error(sorted(errors, key=lambda error: error['index']))
+
+        # Um executemany por conjunto de colunas: linhas com chaves diferentes
+        # não entram no mesmo lote e virariam um UPDATE por linha
+        shapes = {}
+        for row in rows:
+            shapes.setdefault(tuple(sorted(row)), []).append(row)
+        for shape_rows in shapes.values():
+            db.session.execute(update(Strategy), shape_rows)
+        db.session.commit()
+        _invalidate(set(bot_by_strategy.values()))
+
+        return jsonify({
+            'success': True,
+            'data': {'updated': len(rows)}
+        })
+
+    except BulkPayloadError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bulk_bp.route('/bots/bulk', methods=['POST'])
+def bulk_create_bots():
+    """
+    Importar robôs em lote, cada um com suas estratégias (campo "strategies")
+
+    Aceita o mesmo formato produzido por GET /export.
+    """
+    try:
+        items = _read_items('bots', 'items')
+
+        errors = []
+        bot_rows = []
+        strategy_rows = []  # (posição do robô, linha da estratégia)
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'error': 'Item deve ser um objeto'})
+                continue
+            missing = next((field for field in BOT_REQUIRED_FIELDS if not item.get(field)), None)
+            if missing:
+                errors.append({'index': index, 'error': f'Campo obrigatório: {missing}'})
+                continue
+
+            strategies = item.get('strategies') or []
+            if not isinstance(strategies, list):
+                errors.append({'index': index, 'error': 'strategies deve ser uma lista'})
+                continue
+
+            try:
+                digest_window = parse_digest_window(item.get('digest_window'))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+
+            position = len(bot_rows)
+            for strategy_position, strategy in enumerate(strategies):
+                error, row = _strategy_row(strategy, bot_id=position)
+                if error:
+                    errors.append({'index': index, 'strategy': strategy_position, 'error': error})
+                else:
+                    strategy_rows.append(row)
+
+            row = {field: item.get(field, BOT_DEFAULTS.get(field)) for field in BOT_FIELDS}
+            row['digest_window'] = digest_window
+            bot_rows.append(row)
+
+        if errors:
+            return _bulk_error(errors)
+
+        bot_ids = []
+        if bot_rows:
+            bot_ids = list(db.session.scalars(
+                insert(Bot).returning(Bot.id, sort_by_parameter_order=True),
+                bot_rows
+            ))
+        for row in strategy_rows:
+            row['bot_id'] = bot_ids[row['bot_id']]
+        if strategy_rows:
+            db.session.execute(insert(Strategy), strategy_rows)
+        db.session.commit()
+        _invalidate(set(bot_ids), bots_changed=True)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'bots_created': len(bot_ids),
+                'strategies_created': len(strategy_rows),
+                'bot_ids': bot_ids
+            }
+        }), 201
+
+    except BulkPayloadError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bulk_bp.route('/export', methods=['GET'])
+def export_configuration():
+    """Exportar robôs e estratégias como NDJSON (um robô por linha, em streaming)"""
+    def generate():
+        strategy_iter = db.session.scalars(
+            select(Strategy).order_by(Strategy.bot_id, Strategy.id).execution_options(yield_per=1000)
+        )
+        pending = next(strategy_iter, None)
+
+        bots = db.session.scalars(select(Bot).order_by(Bot.id).execution_options(yield_per=1000))
+        for bot in bots:
+            data = bot.to_dict()
+            data['strategies'] = []
+            while pending is not None and pending.bot_id <= bot.id:
+                if pending.bot_id == bot.id:
+                    data['strategies'].append(pending.to_dict())
+                pending = next(strategy_iter, None)
+            yield dumps_bytes(data) + b'\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=roasbot-export.ndjson'}
+    )
@@ -1,15 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from src.models.user import db
-from src.models.bot import Bot, Strategy, GameResult
-from src.services.telegram_service import TelegramService
-from src.services.signal_analyzer import SignalAnalyzer
-from datetime import datetime
-import json
-import threading
-import time
+from src.models.bot import Bot
+from src.services.telegram_service import telegram_registry
+from src.services.strategy_index import strategy_index
+from src.services.feed_router import feed_router
+from src.services.signal_dispatcher import dispatch_signals
+from src.services.monitors import monitors
 
 signal_bp = Blueprint('signal', __name__)
-analyzer = SignalAnalyzer()
 
 @signal_bp.route('/signals/test-telegram', methods=['POST'])
 def test_telegram():
@@ -25,8 +23,14 @@ def test_telegram():
                 'error': 'bot_token e chat_id são obrigatórios'
             }), 400
         
-        telegram = TelegramService(bot_token)
-        result = telegram.test_connection(chat_id)
+        # Token e chat validados com cache (sem getMe/getChat repetidos)
+        validation = telegram_registry.validate(bot_token, chat_id)
+        if not validation['success'] or data.get('send_message') is False:
+            return jsonify(validation)
+        
+        result = telegram_registry.get(bot_token).test_connection(chat_id)
+        if result['success']:
+            result['bot'] = validation['bot']
         
         return jsonify(result)
         
@@ -50,15 +54,14 @@ def send_manual_signal():
                 'error': 'bot_id e message são obrigatórios'
             }), 400
         
-        bot = Bot.query.get(bot_id)
+        bot = db.session.get(Bot, bot_id)
         if not bot:
             return jsonify({
                 'success': False,
                 'error': 'Robô não encontrado'
             }), 404
         
-        telegram = TelegramService(bot.telegram_token)
-        result = telegram.send_message(bot.telegram_chat_id, message)
+        result = telegram_registry.get(bot.telegram_token).send_message(bot.telegram_chat_id, message)
         
         return jsonify(result)
         
@@ -74,6 +77,7 @@ def analyze_signals():
     try:
         data = request.get_json()
         game_type = data.get('game_type')
+        casino_site = data.get('casino_site')
         game_data = data.get('game_data', {})
         
         if not game_type:
@@ -82,23 +86,22 @@ def analyze_signals():
                 'error': 'game_type é obrigatório'
             }), 400
         
-        # Buscar estratégias ativas para o tipo de jogo
-        bots = Bot.query.filter_by(game_type=game_type, is_active=True).all()
-        strategies = []
+        # Feed independente por (casino_site, game_type)
+        feed = feed_router.feed(casino_site, game_type)
         
-        for bot in bots:
-            bot_strategies = Strategy.query.filter_by(bot_id=bot.id, is_active=True).all()
-            strategies.extend([s.to_dict() for s in bot_strategies])
+        # Estratégias ativas do feed (índice em memória, engine de leitura)
+        strategies = strategy_index.get(game_type, casino_site)
         
         # Analisar sinais
-        signals = analyzer.analyze_game_data(game_type, game_data, strategies)
+        signals = feed.analyze(game_data, strategies)
         
         return jsonify({
             'success': True,
             'data': {
+                'casino_site': feed.casino_site,
                 'signals_detected': len(signals),
                 'signals': signals,
-                'game_stats': analyzer.get_game_statistics(game_type)
+                'game_stats': feed.game_statistics()
             }
         })
         
@@ -108,68 +111,68 @@ def analyze_signals():
             'error': str(e)
         }), 500
 
+@signal_bp.route('/signals/ingest', methods=['POST'])
+def ingest_round():
+    """Enfileirar uma rodada no feed (análise e envio assíncronos)"""
+    try:
+        data = request.get_json()
+        game_type = data.get('game_type')
+        casino_site = data.get('casino_site')
+        game_data = data.get('game_data', {})
+        
+        if not game_type or not casino_site:
+            return jsonify({
+                'success': False,
+                'error': 'game_type e casino_site são obrigatórios'
+            }), 400
+        
+        feed = feed_router.feed(casino_site, game_type)
+        if not feed.submit(game_data, _process_feed_round, current_app._get_current_object()):
+            return jsonify({
+                'success': False,
+                'error': 'Fila do feed cheia, rodada descartada'
+            }), 503
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'queued': True,
+                'queue_depth': feed.queue_depth()
+            }
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _process_feed_round(feed, game_data, received_at):
+    """Processar uma rodada enfileirada (executado no worker do feed)"""
+    strategies = strategy_index.get(feed.game_type, feed.casino_site)
+    signals = feed.analyze(game_data, strategies, received_at)
+    dispatch_signals(feed.game_type, game_data, signals, feed.casino_site)
+
 @signal_bp.route('/signals/simulate-game', methods=['POST'])
 def simulate_game():
     """Simular dados de jogo para teste"""
     try:
         data = request.get_json()
         game_type = data.get('game_type', 'mines')
+        casino_site = data.get('casino_site')
+        
+        feed = feed_router.feed(casino_site, game_type)
         
         # Simular dados do jogo
-        game_data = analyzer.simulate_game_data(game_type)
+        game_data = feed.analyzer.simulate_game_data(game_type)
         
         # Analisar sinais baseado nos dados simulados
-        bots = Bot.query.filter_by(game_type=game_type, is_active=True).all()
-        strategies = []
-        
-        for bot in bots:
-            bot_strategies = Strategy.query.filter_by(bot_id=bot.id, is_active=True).all()
-            strategies.extend([s.to_dict() for s in bot_strategies])
+        strategies = strategy_index.get(game_type, casino_site)
         
-        signals = analyzer.analyze_game_data(game_type, game_data, strategies)
+        signals = feed.analyze(game_data, strategies)
         
         # Enviar sinais detectados
-        sent_signals = []
-        for signal in signals:
-            strategy_id = signal['strategy_id']
-            strategy = Strategy.query.get(strategy_id)
-            
-            if strategy and strategy.bot:
-                telegram = TelegramService(strategy.bot.telegram_token)
-                
-                # Usar mensagem personalizada se disponível
-                if strategy.custom_message and not strategy.use_default_message:
-                    message = strategy.custom_message
-                else:
-                    message = None
-                
-                result = telegram.send_signal_message(
-                    strategy.bot.telegram_chat_id,
-                    game_type,
-                    signal['signal_data'],
-                    message
-                )
-                
-                if result['success']:
-                    # Registrar resultado
-                    game_result = GameResult(
-                        strategy_id=strategy_id,
-                        game_data=json.dumps(game_data),
-                        signal_sent=True,
-                        timestamp=datetime.utcnow()
-                    )
-                    db.session.add(game_result)
-                    
-                    # Atualizar estatísticas da estratégia
-                    strategy.total_signals += 1
-                    
-                    sent_signals.append({
-                        'strategy_id': strategy_id,
-                        'signal': signal,
-                        'telegram_result': result
-                    })
-        
-        db.session.commit()
+        sent_signals = dispatch_signals(game_type, game_data, signals, casino_site)
         
         return jsonify({
             'success': True,
@@ -193,21 +196,13 @@ def start_monitoring(bot_id):
     try:
         bot = Bot.query.get_or_404(bot_id)
         
-        # Verificar se já existe um thread de monitoramento
-        thread_name = f"monitor_bot_{bot_id}"
-        
-        # Iniciar thread de monitoramento
-        monitor_thread = threading.Thread(
-            target=_monitor_bot_signals,
-            args=(bot_id,),
-            name=thread_name,
-            daemon=True
-        )
-        monitor_thread.start()
+        # O registro não duplica o monitor se ele já estiver rodando
+        status = monitors.start(current_app._get_current_object(), bot_id)
         
         return jsonify({
             'success': True,
-            'message': f'Monitoramento iniciado para o robô {bot.name}'
+            'message': f'Monitoramento iniciado para o robô {bot.name}',
+            'data': status
         })
         
     except Exception as e:
@@ -216,63 +211,12 @@ def start_monitoring(bot_id):
             'error': str(e)
         }), 500
 
-def _monitor_bot_signals(bot_id: int):
-    """Função para monitorar sinais de um robô em background"""
-    try:
-        while True:
-            bot = Bot.query.get(bot_id)
-            if not bot or not bot.is_active:
-                break
-            
-            # Simular coleta de dados do jogo (em produção, conectar com API real)
-            game_data = analyzer.simulate_game_data(bot.game_type)
-            
-            # Buscar estratégias ativas do robô
-            strategies = Strategy.query.filter_by(bot_id=bot_id, is_active=True).all()
-            strategy_dicts = [s.to_dict() for s in strategies]
-            
-            # Analisar sinais
-            signals = analyzer.analyze_game_data(bot.game_type, game_data, strategy_dicts)
-            
-            # Enviar sinais detectados
-            for signal in signals:
-                strategy = Strategy.query.get(signal['strategy_id'])
-                if strategy:
-                    telegram = TelegramService(bot.telegram_token)
-                    
-                    message = strategy.custom_message if not strategy.use_default_message else None
-                    
-                    result = telegram.send_signal_message(
-                        bot.telegram_chat_id,
-                        bot.game_type,
-                        signal['signal_data'],
-                        message
-                    )
-                    
-                    if result['success']:
-                        # Registrar resultado
-                        game_result = GameResult(
-                            strategy_id=strategy.id,
-                            game_data=json.dumps(game_data),
-                            signal_sent=True,
-                            timestamp=datetime.utcnow()
-                        )
-                        db.session.add(game_result)
-                        strategy.total_signals += 1
-            
-            db.session.commit()
-            
-            # Aguardar antes da próxima análise (30 segundos)
-            time.sleep(30)
-            
-    except Exception as e:
-        print(f"Erro no monitoramento do robô {bot_id}: {str(e)}")
-
 @signal_bp.route('/signals/game-stats/<game_type>', methods=['GET'])
 def get_game_stats(game_type):
-    """Obter estatísticas de um tipo de jogo"""
+    """Obter estatísticas de um tipo de jogo (por cassino com ?casino_site=)"""
     try:
-        stats = analyzer.get_game_statistics(game_type)
+        feed = feed_router.feed(request.args.get('casino_site'), game_type)
+        stats = feed.game_statistics()
         
         return jsonify({
             'success': True,
@@ -285,3 +229,51 @@ def get_game_stats(game_type):
             'error': str(e)
         }), 500
 
+@signal_bp.route('/signals/history/<game_type>', methods=['GET'])
+def get_game_history(game_type):
+    """
+    Consultar o histórico em camadas de um feed
+
+    ?rounds=N (últimas rodadas completas), ?minutes=N (agregados por
+    minuto) ou ?hours=N (agregados por hora); com ?casino_site=.
+    """
+    try:
+        params = {}
+        for name in ('rounds', 'minutes', 'hours'):
+            if name in request.args:
+                try:
+                    params[name] = int(request.args[name])
+                except ValueError:
+                    params[name] = -1
+                if params[name] <= 0:
+                    return jsonify({
+                        'success': False,
+                        'error': f'{name} deve ser um inteiro positivo'
+                    }), 400
+        if len(params) != 1:
+            return jsonify({
+                'success': False,
+                'error': 'Informe apenas um de rounds, minutes ou hours'
+            }), 400
+        
+        feed = feed_router.feed(request.args.get('casino_site'), game_type)
+        data = feed.history_snapshot(**params)
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@signal_bp.route('/signals/feeds', methods=['GET'])
+def get_feeds():
+    """Throughput, fila e atraso de cada feed (casino_site, game_type)"""
+    return jsonify({
+        'success': True,
+        'data': feed_router.stats()
+    })
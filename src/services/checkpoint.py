@@ -0,0 +1,189 @@
+import atexit
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from src.services.serializer import dumps_bytes, loads
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'database', 'analyzer-state.bin'
+)
+CHECKPOINT_VERSION = 2
+# Cabeçalho do arquivo: assinatura + versão (uint16), seguido do JSON comprimido com zlib
+CHECKPOINT_MAGIC = b'RBCK'
+_HEADER = struct.Struct('>4sH')
+
+
+class AnalyzerCheckpoint:
+    """
+    Checkpoint periódico do estado dos analisadores (reinício a quente)
+
+    Grava num único arquivo (cabeçalho binário + JSON do orjson
+    comprimido com zlib) o histórico, a numeração das rodadas, as
+    métricas acumuladas e o id da última rodada do log aplicada por cada
+    feed. O estado e o id de um feed são lidos sob o mesmo lock, então
+    o snapshot é consistente mesmo com o log aplicando rodadas. No
+    início do processo o arquivo é carregado antes do log: cada feed
+    volta com o histórico completo e o log só aplica as rodadas
+    posteriores à sua posição, sem a janela "cega" em que as estratégias
+    esperam histórico suficiente. A escrita é atômica (arquivo
+    temporário + rename).
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, interval: float = 30.0):
+        self.path = path
+        self.interval = interval
+        self.restored = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._save_lock = threading.Lock()
+        self._last_signature = None
+        self._atexit_registered = False
+
+        # Métricas
+        self.saves = 0
+        self.last_save_ms = 0.0
+        self.last_size = 0
+        self.restored_feeds = 0
+        self.restore_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'AnalyzerCheckpoint':
+        """Criar a partir de CHECKPOINT_PATH e CHECKPOINT_INTERVAL (0 desativa)"""
+        return cls(
+            path=os.environ.get('CHECKPOINT_PATH', DEFAULT_CHECKPOINT_PATH),
+            interval=float(os.environ.get('CHECKPOINT_INTERVAL', 30))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def save(self, router, force: bool = False) -> bool:
+        """
+        Gravar o checkpoint se o estado mudou desde a última gravação
+
+        Returns:
+            True se o arquivo foi gravado
+        """
+        with self._save_lock:
+            feeds = router.feeds()
+            signature = tuple((feed.key, feed.ticks, feed.coalesced, feed.event_id) for feed in feeds)
+            if not force and signature == self._last_signature:
+                return False
+
+            started = time.perf_counter()
+            body = _HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION) + zlib.compress(dumps_bytes({
+                'saved_at': datetime.utcnow().isoformat(),
+                'feeds': [feed.export_state() for feed in feeds]
+            }), 1)
+
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as f:
+                f.write(body)
+            os.replace(temporary, self.path)
+
+            self._last_signature = signature
+            self.saves += 1
+            self.last_size = len(body)
+            self.last_save_ms = round((time.perf_counter() - started) * 1000, 3)
+            return True
+
+    def restore(self, router) -> int:
+        """
+        Carregar o checkpoint nos feeds (uma vez por processo, antes do log)
+
+        O log de rodadas continua de onde cada feed parou na primeira
+        leitura (RoundEventLog._load_recent).
+
+        Returns:
+            Quantidade de feeds restaurados
+        """
+        if self.restored or not self.enabled:
+            return 0
+        self.restored = True
+
+        started = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.error(f"Checkpoint dos analisadores ilegível ({self.path}): {str(e)}")
+            return 0
+
+        if len(data) < _HEADER.size or data[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+            logger.warning(f"Checkpoint dos analisadores ignorado (formato desconhecido: {self.path})")
+            return 0
+        version = _HEADER.unpack_from(data)[1]
+        if version != CHECKPOINT_VERSION:
+            logger.warning(f"Checkpoint dos analisadores ignorado (versão {version})")
+            return 0
+        try:
+            snapshot = loads(zlib.decompress(data[_HEADER.size:]))
+        except (zlib.error, ValueError) as e:
+            logger.error(f"Checkpoint dos analisadores ilegível ({self.path}): {str(e)}")
+            return 0
+
+        for state in snapshot.get('feeds', []):
+            router.feed(state['casino_site'], state['game_type']).load_state(state)
+
+        self.restored_feeds = len(snapshot.get('feeds', []))
+        self.restore_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(f"Checkpoint restaurado: {self.restored_feeds} feeds em {self.restore_ms} ms")
+        return self.restored_feeds
+
+    def start(self, router):
+        """Gravar o checkpoint periodicamente e na saída do processo"""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        if not self._atexit_registered:
+            atexit.register(self._save_quietly, router)
+            self._atexit_registered = True
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop,
+            args=(router,),
+            name='analyzer_checkpoint',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _loop(self, router):
+        while not self._stop_event.wait(self.interval):
+            self._save_quietly(router)
+
+    def _save_quietly(self, router):
+        try:
+            self.save(router)
+        except Exception as e:
+            logger.error(f"Erro ao gravar checkpoint dos analisadores: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'saves': self.saves,
+            'last_save_ms': self.last_save_ms,
+            'last_size': self.last_size,
+            'restored_feeds': self.restored_feeds,
+            'restore_ms': self.restore_ms
+        }
+
+
+checkpoint = AnalyzerCheckpoint.from_env()
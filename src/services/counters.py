@@ -0,0 +1,170 @@
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+from sqlalchemy import bindparam, func, update
+
+from src.models.bot import Strategy
+from src.models.engine import writer_session, worker_context
+from src.services.http_cache import versions, strategies_key
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ('total_signals', 'wins', 'losses', 'wins_no_gale', 'wins_with_gale')
+
+_table = Strategy.__table__
+
+
+def _build_increment_statement():
+    """UPDATE strategies SET campo = campo + :delta ... WHERE id = :sid"""
+    values = {
+        field: func.coalesce(_table.c[field], 0) + bindparam(f'd_{field}')
+        for field in COUNTER_FIELDS
+    }
+    return update(_table).where(_table.c.id == bindparam('sid')).values(**values)
+
+
+class StrategyCounters:
+    """
+    Contadores de métricas das estratégias aplicados no próprio SQL
+
+    Os incrementos são acumulados em memória (um "shard" por worker) e
+    gravados com UPDATE ... SET total_signals = total_signals + :n, sem
+    carregar a linha e sem corrida de leitura-modificação-escrita entre
+    threads ou processos. No modo "tick" o flush acontece ao fim de cada
+    rodada; no modo "buffered" uma thread grava a cada flush_interval.
+    """
+
+    def __init__(self, mode: str = 'tick', flush_interval: float = 2.0):
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._bot_ids: Dict[int, int] = {}
+        self._statement = _build_increment_statement()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.flushes = 0
+        self.flushed_rows = 0
+
+    @classmethod
+    def from_env(cls) -> 'StrategyCounters':
+        """Criar a partir de COUNTER_MODE (tick|buffered) e COUNTER_FLUSH_INTERVAL"""
+        return cls(
+            mode=os.environ.get('COUNTER_MODE', 'tick'),
+            flush_interval=float(os.environ.get('COUNTER_FLUSH_INTERVAL', 2.0))
+        )
+
+    def add(self, strategy_id: int, bot_id: Optional[int] = None, **deltas: int):
+        """
+        Acumular incrementos para uma estratégia
+
+        Args:
+            strategy_id: ID da estratégia
+            bot_id: ID do robô (para invalidar o cache HTTP da listagem)
+            **deltas: Incrementos por campo (ex.: total_signals=1, wins=1)
+        """
+        unknown = set(deltas) - set(COUNTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Contadores desconhecidos: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            pending = self._pending.get(strategy_id)
+            if pending is None:
+                pending = self._pending[strategy_id] = defaultdict(int)
+            for field, delta in deltas.items():
+                pending[field] += delta
+            if bot_id is not None:
+                self._bot_ids[strategy_id] = bot_id
+
+    def discard(self, strategy_id: int):
+        """Descartar incrementos pendentes (ex.: antes de zerar as estatísticas)"""
+        with self._lock:
+            self._pending.pop(strategy_id, None)
+            self._bot_ids.pop(strategy_id, None)
+
+    def end_tick(self):
+        """Fim de uma rodada: grava imediatamente no modo "tick" """
+        if self.mode != 'buffered':
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Gravar todos os incrementos pendentes em um único executemany
+
+        Returns:
+            Quantidade de estratégias atualizadas
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            bot_ids, self._bot_ids = self._bot_ids, {}
+
+        if not pending:
+            return 0
+
+        rows = [
+            {'sid': strategy_id, **{f'd_{field}': deltas.get(field, 0) for field in COUNTER_FIELDS}}
+            for strategy_id, deltas in pending.items()
+        ]
+
+        session = writer_session()
+        try:
+            session.execute(self._statement, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            # Devolver os incrementos ao shard para a próxima tentativa
+            with self._lock:
+                for strategy_id, deltas in pending.items():
+                    merged = self._pending.setdefault(strategy_id, defaultdict(int))
+                    for field, delta in deltas.items():
+                        merged[field] += delta
+                for strategy_id, bot_id in bot_ids.items():
+                    self._bot_ids.setdefault(strategy_id, bot_id)
+            raise
+
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+        if bot_ids:
+            versions.bump(*{strategies_key(bot_id) for bot_id in bot_ids.values()})
+        return len(rows)
+
+    def start(self, app):
+        """Iniciar o flush periódico (apenas no modo "buffered")"""
+        if self.mode != 'buffered' or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop,
+            args=(app,),
+            name='counter_flusher',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _loop(self, app):
+        with worker_context(app):
+            while not self._stop_event.wait(self.flush_interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Erro ao gravar contadores: {str(e)}")
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'pending_strategies': len(self._pending),
+            'flushes': self.flushes,
+            'flushed_rows': self.flushed_rows
+        }
+
+
+counters = StrategyCounters.from_env()
@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+from sqlalchemy import delete, func, select
+
+from src.models.user import db
+from src.models.engine import writer_session, worker_context, env_bool
+from src.models.bot import RoundDataMixin, RoundEvent
+from src.services.signal_analyzer import HISTORY_SIZE
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+_table = RoundEvent.__table__
+
+
+class RoundEventLog:
+    """
+    Log local append-only das rodadas recebidas (tabela round_events)
+
+    Cada processo grava as rodadas que recebe e aplica ao histórico dos
+    seus feeds todas as rodadas do log, na ordem do id. Assim todos os
+    workers têm o mesmo histórico, independentemente de qual atendeu a
+    requisição. As colunas são tipadas (as mesmas de game_rounds), então
+    reconstruir o histórico não decodifica JSON. Na primeira leitura,
+    feeds restaurados do checkpoint recebem só as rodadas posteriores à
+    última que aplicaram; os demais carregam as últimas HISTORY_SIZE.
+    Cada feed guarda o id da última rodada aplicada, então uma rodada
+    nunca entra duas vezes no histórico.
+
+    A leitura incremental (id > last_id) depende de os ids ficarem
+    visíveis em ordem, o que vale para o SQLite (um escritor por vez).
+    Em outros bancos (ex.: PostgreSQL) ids podem ser confirmados fora de
+    ordem e rodadas seriam puladas, então o log é desativado e cada
+    worker mantém o próprio histórico.
+    """
+
+    def __init__(self, enabled: bool = True, poll_interval: float = 0.5,
+                 retention_hours: float = 24, batch_size: int = 5000):
+        self.enabled = enabled
+        self.poll_interval = poll_interval
+        self.retention_hours = retention_hours
+        self.batch_size = batch_size
+        self.last_id: Optional[int] = None
+        self._router = None
+        self._sync_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._trimmed_at = 0.0
+
+        # Métricas
+        self.appended = 0
+        self.applied = 0
+        self.loaded = 0
+        self.load_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'RoundEventLog':
+        """Criar a partir de EVENT_LOG, EVENT_LOG_POLL_INTERVAL e EVENT_LOG_RETENTION_HOURS"""
+        return cls(
+            enabled=env_bool('EVENT_LOG', True),
+            poll_interval=float(os.environ.get('EVENT_LOG_POLL_INTERVAL', 0.5)),
+            retention_hours=float(os.environ.get('EVENT_LOG_RETENTION_HOURS', 24))
+        )
+
+    def attach(self, router):
+        """Passar a registrar as rodadas dos feeds do roteador neste log (requer contexto da app)"""
+        if not self.enabled:
+            return
+        if db.engine.dialect.name != 'sqlite':
+            logger.warning(f"Log de rodadas desativado: leitura por id exige SQLite (banco: {db.engine.dialect.name})")
+            self.enabled = False
+            return
+        self._router = router
+        router.event_log = self
+
+    def append(self, casino_site: str, game_type: str, game_data: Dict[str, Any]) -> int:
+        """Gravar uma rodada no log (commit imediato) e retornar seu id"""
+        session = writer_session()
+        try:
+            event = RoundEvent.from_game_data(game_type, game_data, casino_site)
+            session.add(event)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        self.appended += 1
+        return event.id
+
+    def sync(self) -> int:
+        """
+        Aplicar aos feeds as rodadas gravadas desde a última leitura
+
+        Returns:
+            Quantidade de rodadas aplicadas
+        """
+        with self._sync_lock:
+            if self.last_id is None:
+                return self._load_recent()
+
+            applied = 0
+            session = writer_session()
+            try:
+                while True:
+                    rows = session.execute(
+                        select(_table).where(_table.c.id > self.last_id)
+                        .order_by(_table.c.id).limit(self.batch_size)
+                    ).all()
+                    applied += self._apply(rows)
+                    if len(rows) < self.batch_size:
+                        break
+            finally:
+                session.commit()
+            return applied
+
+    def _load_recent(self) -> int:
+        """
+        Primeira leitura do log (único caminho de partida, com ou sem checkpoint)
+
+        Feeds já restaurados continuam da última rodada que aplicaram;
+        os demais são reconstruídos com as últimas HISTORY_SIZE rodadas.
+        """
+        started = time.perf_counter()
+        restored = {feed.key: feed.event_id for feed in self._router.feeds() if feed.event_id is not None}
+        session = writer_session()
+        try:
+            ranked = select(
+                _table,
+                func.row_number().over(
+                    partition_by=(_table.c.casino_site, _table.c.game_type),
+                    order_by=_table.c.id.desc()
+                ).label('position')
+            ).subquery()
+            rows = [
+                row for row in session.execute(
+                    select(ranked).where(ranked.c.position <= HISTORY_SIZE).order_by(ranked.c.id)
+                ).all()
+                if (row.casino_site, row.game_type) not in restored
+            ]
+            for (casino_site, game_type), event_id in restored.items():
+                rows.extend(session.execute(
+                    select(_table).where(
+                        _table.c.casino_site == casino_site,
+                        _table.c.game_type == game_type,
+                        _table.c.id > event_id
+                    ).order_by(_table.c.id)
+                ).all())
+            last_id = session.execute(select(func.max(_table.c.id))).scalar()
+        finally:
+            session.commit()
+
+        for key in {(row.casino_site, row.game_type) for row in rows} - set(restored):
+            self._router.feed(*key).reset_history()
+        rows.sort(key=lambda row: row.id)
+        self.last_id = 0
+        applied = self._apply(rows)
+        self.last_id = max(self.last_id, last_id or 0)
+
+        self.loaded = applied
+        self.load_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(f"Histórico reconstruído do log de rodadas: {applied} rodadas em {self.load_ms} ms")
+        return applied
+
+    def _apply(self, rows) -> int:
+        applied = 0
+        for row in rows:
+            feed = self._router.feed(row.casino_site, row.game_type)
+            # received_at é UTC sem fuso (utcnow); marcar para não virar hora local
+            received_at = row.received_at.replace(tzinfo=timezone.utc).isoformat()
+            if feed.apply_event(RoundDataMixin.to_game_data(row), received_at, row.id):
+                applied += 1
+            self.last_id = row.id
+        self.applied += applied
+        return applied
+
+    def trim(self) -> int:
+        """Remover rodadas mais antigas que retention_hours"""
+        self._trimmed_at = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        session = writer_session()
+        try:
+            result = session.execute(delete(_table).where(_table.c.received_at < cutoff))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return result.rowcount
+
+    def preload(self, router):
+        """Reconstruir o histórico antes do fork dos workers"""
+        self.attach(router)
+        if self.enabled:
+            self.sync()
+
+    def start(self, app, router):
+        """Acompanhar o log em background (rodadas recebidas por outros workers)"""
+        with app.app_context():
+            self.attach(router)
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, args=(app,), name='round_event_log', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _loop(self, app):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                with worker_context(app):
+                    self.sync()
+                    if self.retention_hours > 0 and time.monotonic() - self._trimmed_at >= 3600:
+                        self.trim()
+            except Exception as e:
+                logger.error(f"Erro ao ler o log de rodadas: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'last_id': self.last_id,
+            'appended': self.appended,
+            'applied': self.applied,
+            'loaded_at_startup': self.loaded,
+            'load_ms': self.load_ms
+        }
+
+
+event_log = RoundEventLog.from_env()
@@ -0,0 +1,354 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from src.models.engine import worker_context
+from src.services.signal_analyzer import SignalAnalyzer
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CASINO = 'default'
+
+FeedKey = Tuple[str, str]
+
+# Prazo padrão para analisar uma rodada, contado da chegada (0 desativa)
+DEFAULT_BUDGET_MS = float(os.environ.get('ANALYSIS_BUDGET_MS', 250))
+
+
+def feed_key(casino_site: Optional[str], game_type: str) -> FeedKey:
+    """Chave normalizada (casino_site, game_type) de um feed"""
+    return ((casino_site or DEFAULT_CASINO).lower(), game_type.lower())
+
+
+class Feed:
+    """
+    Feed de rodadas de um cassino + tipo de jogo
+
+    Cada feed tem seu próprio analisador (histórico independente), seu
+    próprio lock e uma fila com worker dedicado para ingestão assíncrona,
+    de modo que um feed sobrecarregado não atrasa os demais.
+
+    Cada rodada da fila tem um prazo (budget_ms desde a chegada). As
+    estratégias chegam em ordem de prioridade e as que não couberem no
+    prazo não são avaliadas; uma rodada que já chega atrasada só alimenta
+    o histórico. Análises síncronas (sem received_at) não têm prazo.
+    Com coalesce, rodadas acumuladas na fila atualizam o histórico e só
+    a mais recente é avaliada, pois as anteriores já terminaram.
+    """
+
+    def __init__(self, casino_site: str, game_type: str, queue_size: int = 1000,
+                 budget_ms: float = DEFAULT_BUDGET_MS, coalesce: bool = True, router=None):
+        self.casino_site = casino_site
+        self.game_type = game_type
+        self.router = router
+        self.budget_ms = budget_ms
+        self.coalesce = coalesce
+        self.analyzer = SignalAnalyzer()
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._app = None
+        self.event_id: Optional[int] = None  # Última rodada do log de rodadas aplicada ao histórico
+
+        # Métricas
+        self.ticks = 0
+        self.signals = 0
+        self.dropped = 0
+        self.errors = 0
+        self.late_ticks = 0  # Rodadas que chegaram após o prazo (só histórico)
+        self.coalesced = 0  # Rodadas da fila superadas por outra mais recente
+        self.shed_ticks = 0  # Rodadas em que o prazo acabou no meio da avaliação
+        self.strategies_shed = 0
+        self.last_tick_at: Optional[float] = None
+        self.last_lag: float = 0.0
+        self.max_lag: float = 0.0
+        self.analysis_seconds = 0.0
+        self._recent_ticks: deque = deque(maxlen=10000)
+
+    @property
+    def key(self) -> FeedKey:
+        return (self.casino_site, self.game_type)
+
+    def analyze(self, game_data: Dict[str, Any], strategies: List[Dict[str, Any]],
+                received_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Analisar uma rodada deste feed (síncrono)
+
+        Args:
+            game_data: Dados da rodada
+            strategies: Estratégias ativas do feed, em ordem de prioridade
+            received_at: Instante (time.monotonic) em que a rodada chegou na
+                fila; só com ele o prazo budget_ms é aplicado
+
+        Returns:
+            Lista de sinais detectados
+        """
+        started = time.monotonic()
+        from_log = self._log_round(game_data)
+
+        with self._lock:
+            deadline = None
+            if self.budget_ms > 0 and received_at is not None:
+                deadline = received_at + self.budget_ms / 1000
+                if started >= deadline:
+                    # Rodada já atrasada: apenas histórico, nenhuma estratégia avaliada
+                    self.late_ticks += 1
+                    self.strategies_shed += len(strategies)
+                    strategies = []
+            try:
+                signals = self.analyzer.analyze_game_data(
+                    self.game_type, game_data, strategies, deadline, update_history=not from_log
+                )
+            except Exception:
+                self.errors += 1
+                raise
+
+            finished = time.monotonic()
+            if self.analyzer.last_shed:
+                self.shed_ticks += 1
+                self.strategies_shed += self.analyzer.last_shed
+            self.ticks += 1
+            self.signals += len(signals)
+            self.analysis_seconds += finished - started
+            self.last_tick_at = time.time()
+            self.last_lag = finished - (received_at if received_at is not None else started)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            self._recent_ticks.append(finished)
+            return signals
+
+    def submit(self, game_data: Dict[str, Any], handler: Callable[['Feed', Dict[str, Any], float], None],
+               app=None) -> bool:
+        """
+        Enfileirar uma rodada para o worker do feed (assíncrono)
+
+        Args:
+            game_data: Dados da rodada
+            handler: Função chamada no worker com (feed, game_data, received_at)
+            app: Aplicação Flask para o contexto do worker
+
+        Returns:
+            False se a fila do feed estiver cheia (rodada descartada)
+        """
+        if app is not None:
+            self._app = app
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((time.monotonic(), game_data, handler))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run,
+                name=f"feed_{self.casino_site}_{self.game_type}",
+                daemon=True
+            )
+            self._worker.start()
+
+    def record(self, game_data: Dict[str, Any]):
+        """Apenas registrar a rodada no histórico (sem avaliar estratégias)"""
+        if not self._log_round(game_data):
+            with self._lock:
+                self.analyzer.record_round(self.game_type, game_data)
+
+    def apply_event(self, game_data: Dict[str, Any], timestamp: str, event_id: Optional[int] = None) -> bool:
+        """
+        Aplicar ao histórico uma rodada lida do log de eventos
+
+        Returns:
+            False se a rodada já estava no histórico (id já aplicado)
+        """
+        with self._lock:
+            if event_id is not None and self.event_id is not None and event_id <= self.event_id:
+                return False
+            self.analyzer.record_round(self.game_type, game_data, timestamp)
+            if event_id is not None:
+                self.event_id = event_id
+            return True
+
+    def history_snapshot(self, rounds: Optional[int] = None, minutes: Optional[int] = None,
+                         hours: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Consultar o histórico sob o lock do feed
+
+        O worker do feed altera as deques do histórico enquanto as rotas
+        leem; iterá-las fora do lock pode falhar com "deque mutated
+        during iteration".
+        """
+        with self._lock:
+            history = self.analyzer.history(self.game_type)
+            if rounds is not None:
+                data = {'rounds': history.last_rounds(rounds)}
+            else:
+                data = {
+                    'summary': history.summary(minutes=minutes, hours=hours),
+                    'buckets': [bucket.to_dict() for bucket in history.buckets(minutes=minutes, hours=hours)]
+                }
+            data['capacity'] = history.capacity()
+            return data
+
+    def game_statistics(self) -> Dict[str, Any]:
+        """Estatísticas do jogo (lidas sob o lock do feed)"""
+        with self._lock:
+            return self.analyzer.get_game_statistics(self.game_type)
+
+    def reset_history(self):
+        with self._lock:
+            self.analyzer.game_history.pop(self.game_type, None)
+            self.event_id = None
+
+    # Métricas acumuladas preservadas entre reinícios (checkpoint)
+    CHECKPOINT_COUNTERS = ('ticks', 'signals', 'dropped', 'errors', 'late_ticks', 'coalesced',
+                           'shed_ticks', 'strategies_shed', 'analysis_seconds', 'max_lag')
+
+    def export_state(self) -> Dict[str, Any]:
+        """Estado do feed para o checkpoint (analisador + métricas acumuladas)"""
+        with self._lock:
+            return {
+                'casino_site': self.casino_site,
+                'game_type': self.game_type,
+                'analyzer': self.analyzer.export_state(),
+                'event_id': self.event_id,
+                'counters': {name: getattr(self, name) for name in self.CHECKPOINT_COUNTERS}
+            }
+
+    def load_state(self, state: Dict[str, Any]):
+        with self._lock:
+            self.analyzer.load_state(state.get('analyzer', {}))
+            self.event_id = state.get('event_id')
+            for name, value in state.get('counters', {}).items():
+                if name in self.CHECKPOINT_COUNTERS:
+                    setattr(self, name, value)
+
+    def _log_round(self, game_data: Dict[str, Any]) -> bool:
+        """
+        Gravar a rodada no log compartilhado e sincronizar o histórico
+
+        Returns:
+            False se não há log (ou ele falhou): o histórico é local
+        """
+        event_log = self.router.event_log if self.router is not None else None
+        if event_log is None:
+            return False
+        try:
+            event_log.append(self.casino_site, self.game_type, game_data)
+            event_log.sync()
+            return True
+        except Exception as e:
+            logger.error(f"Erro no log de rodadas ({self.casino_site}/{self.game_type}): {str(e)}")
+            return False
+
+    def _run(self):
+        while True:
+            received_at, game_data, handler = self._queue.get()
+            # O contexto cobre também as rodadas coalescidas, que vão para o log de rodadas
+            with worker_context(self._app) if self._app is not None else nullcontext():
+                if self.coalesce:
+                    received_at, game_data, handler = self._coalesce(received_at, game_data, handler)
+                try:
+                    handler(self, game_data, received_at)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Erro no feed {self.casino_site}/{self.game_type}: {str(e)}")
+                finally:
+                    self._queue.task_done()
+
+    def _coalesce(self, received_at, game_data, handler):
+        """Registrar no histórico as rodadas superadas e devolver a mais recente"""
+        while True:
+            try:
+                newer = self._queue.get_nowait()
+            except queue.Empty:
+                return received_at, game_data, handler
+            try:
+                self.record(game_data)
+                self.coalesced += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Erro no feed {self.casino_site}/{self.game_type}: {str(e)}")
+            finally:
+                self._queue.task_done()
+            received_at, game_data, handler = newer
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def ticks_per_minute(self) -> int:
+        cutoff = time.monotonic() - 60
+        return sum(1 for tick in self._recent_ticks if tick >= cutoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'casino_site': self.casino_site,
+            'game_type': self.game_type,
+            'ticks': self.ticks,
+            'ticks_per_minute': self.ticks_per_minute(),
+            'signals': self.signals,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'budget_ms': self.budget_ms,
+            'late_ticks': self.late_ticks,
+            'coalesced': self.coalesced,
+            'shed_ticks': self.shed_ticks,
+            'strategies_shed': self.strategies_shed,
+            'starved_strategies': len(self.analyzer.starved),
+            'shared_hits': self.analyzer.shared_hits,
+            'shared_evaluations': self.analyzer.shared_evaluations,
+            'queue_depth': self.queue_depth(),
+            'last_tick_at': self.last_tick_at,
+            'last_lag_ms': round(self.last_lag * 1000, 3),
+            'max_lag_ms': round(self.max_lag * 1000, 3),
+            'avg_analysis_ms': round(self.analysis_seconds / self.ticks * 1000, 3) if self.ticks else 0,
+            'history_size': len(self.analyzer.game_history.get(self.game_type, []))
+        }
+
+
+class FeedRouter:
+    """Roteia rodadas para feeds independentes por (casino_site, game_type)"""
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._feeds: Dict[FeedKey, Feed] = {}
+        self.event_log = None  # Log de rodadas compartilhado entre workers (opcional)
+
+    def feed(self, casino_site: Optional[str], game_type: str) -> Feed:
+        """Obter (ou criar) o feed de um cassino + tipo de jogo"""
+        key = feed_key(casino_site, game_type)
+        feed = self._feeds.get(key)
+        if feed is None:
+            with self._lock:
+                feed = self._feeds.get(key)
+                if feed is None:
+                    feed = self._feeds[key] = Feed(key[0], key[1], self.queue_size, router=self)
+        return feed
+
+    def feeds(self) -> List[Feed]:
+        return list(self._feeds.values())
+
+    def find(self, game_type: str, casino_site: Optional[str] = None) -> List[Feed]:
+        """Feeds existentes de um tipo de jogo (opcionalmente de um cassino)"""
+        if casino_site:
+            feed = self._feeds.get(feed_key(casino_site, game_type))
+            return [feed] if feed else []
+        game_type = game_type.lower()
+        return [feed for key, feed in self._feeds.items() if key[1] == game_type]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [feed.stats() for feed in self.feeds()]
+
+
+feed_router = FeedRouter()
@@ -0,0 +1,187 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Any, Callable, Optional
+
+from flask import request, current_app, make_response, jsonify
+from sqlalchemy.exc import IntegrityError
+
+from src.models.user import db
+from src.models.cache import CacheVersion
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALL_VERSIONS = '*'  # Versão agregada de todos os recursos (ex.: visão geral dos robôs)
+
+
+class VersionRegistry:
+    """
+    Contadores de versão por recurso (tabela ou robô)
+
+    Cada escrita incrementa a versão no banco (tabela cache_versions) e
+    na memória local. As leituras usam a cópia em memória, sincronizada
+    com o banco no máximo a cada sync_interval segundos, o que mantém
+    vários workers coerentes sem consultar o banco a cada requisição.
+    """
+
+    def __init__(self, sync_interval: float = 1.0):
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._synced_at = 0.0
+
+    def get(self, name: str) -> int:
+        """Versão de um recurso; ALL_VERSIONS soma todas (as versões só crescem)"""
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+        if name == ALL_VERSIONS:
+            return sum(self._versions.values())
+        return self._versions.get(name, 0)
+
+    def sync(self):
+        """Recarregar todas as versões do banco"""
+        try:
+            rows = db.session.query(CacheVersion.name, CacheVersion.version).all()
+        except Exception as e:
+            logger.error(f"Erro ao sincronizar versões de cache: {str(e)}")
+            return
+        with self._lock:
+            self._versions = {name: version for name, version in rows}
+            self._synced_at = time.monotonic()
+
+    def bump(self, *names: str):
+        """Incrementar versões (chamar após o commit da escrita)"""
+        for name in names:
+            updated = CacheVersion.query.filter_by(name=name) \
+                .update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+            if not updated:
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(CacheVersion(name=name, version=1))
+                except IntegrityError:
+                    # Outro worker criou a linha ao mesmo tempo
+                    CacheVersion.query.filter_by(name=name) \
+                        .update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+        db.session.commit()
+
+        rows = db.session.query(CacheVersion.name, CacheVersion.version) \
+            .filter(CacheVersion.name.in_(names)).all()
+        with self._lock:
+            self._versions.update({name: version for name, version in rows})
+
+
+class ResponseCache:
+    """Cache LRU pequeno de corpos de resposta, indexado por (caminho, ETag)"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return body
+
+    def set(self, key, body: bytes):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
+
+
+versions = VersionRegistry()
+response_cache = ResponseCache()
+
+
+def bots_key() -> str:
+    return 'bots'
+
+
+def strategies_key(bot_id: int) -> str:
+    return f'strategies:{bot_id}'
+
+
+def overview_key() -> str:
+    return ALL_VERSIONS
+
+
+def representation_digest() -> str:
+    """Hash curto do caminho e da query normalizada (ordem dos parâmetros não importa)"""
+    query = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+    return hashlib.blake2b(f'{request.path}?{query}'.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def conditional_listing(version_key: Callable[..., str], validate: Optional[Callable[[], Any]] = None):
+    """
+    Decorator de listagens com ETag forte e GET condicional
+
+    Responde 304 a If-None-Match sem executar a view (e sem consultar o
+    banco) e reaproveita o corpo já serializado enquanto a versão do
+    recurso não muda. A ETag inclui a query, pois projeções diferentes
+    (?view=, ?fields=) do mesmo recurso têm corpos diferentes.
+
+    Args:
+        version_key: Função que recebe os argumentos da rota e devolve
+            o nome da versão (ex.: strategies_key)
+        validate: Validação dos parâmetros executada antes do 304; um
+            ValueError vira resposta 400
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if validate is not None:
+                try:
+                    validate()
+                except ValueError as e:
+                    return jsonify({
+                        'success': False,
+                        'error': str(e)
+                    }), 400
+
+            key = version_key(*args, **kwargs)
+            etag = f'{key}-{versions.get(key)}-{representation_digest()}'
+
+            if request.if_none_match.contains(etag):
+                response_cache.not_modified += 1
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            cache_key = (request.full_path, etag)
+            body = response_cache.get(cache_key)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response_cache.set(cache_key, response.get_data())
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,515 @@
+import math
+import os
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import or_, update
+
+from src.models.user import db
+from src.models.engine import worker_context
+from src.models.bot import Bot
+from src.models.monitor import MonitorLease
+from src.services.feed_router import feed_router
+from src.services.strategy_index import strategy_index
+from src.services.signal_dispatcher import dispatch_signals
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+MONITOR_RUNNING = 'running'
+MONITOR_PAUSED = 'paused'
+MONITOR_BACKOFF = 'backoff'
+MONITOR_STOPPING = 'stopping'
+MONITOR_STOPPED = 'stopped'
+
+# Posse sem heartbeat por mais que isso (ou 3 intervalos) pode ser assumida por outro worker
+MONITOR_LEASE_SECONDS = float(os.environ.get('MONITOR_LEASE_SECONDS', 90))
+
+
+def process_owner() -> str:
+    """Identificador do processo atual (calculado na hora: muda após o fork)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def validate_interval(interval) -> Optional[float]:
+    """
+    Intervalo opcional entre rodadas, em segundos
+
+    Raises:
+        ValueError: não é um número positivo (bool também é rejeitado)
+    """
+    if interval is None:
+        return None
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) \
+            or not math.isfinite(interval) or interval <= 0:
+        raise ValueError('interval deve ser um número positivo (segundos)')
+    return float(interval)
+
+
+def lease_expired_before(interval: float) -> datetime:
+    return datetime.utcnow() - timedelta(seconds=max(MONITOR_LEASE_SECONDS, interval * 3))
+
+
+def claim_lease(bot_id: int, interval: float) -> bool:
+    """
+    Assumir (ou renovar) a posse do monitor do robô neste processo
+
+    A troca é um UPDATE condicional: só vence se a posse estiver livre, já
+    for deste processo ou estiver sem heartbeat. Dois workers nunca rodam
+    o mesmo monitor ao mesmo tempo. Não faz commit.
+    """
+    owner = process_owner()
+    claimed = db.session.execute(
+        update(MonitorLease)
+        .where(
+            MonitorLease.bot_id == bot_id,
+            or_(
+                MonitorLease.owner.is_(None),
+                MonitorLease.owner == owner,
+                MonitorLease.heartbeat_at.is_(None),
+                MonitorLease.heartbeat_at < lease_expired_before(interval)
+            )
+        )
+        .values(owner=owner, heartbeat_at=datetime.utcnow())
+        .execution_options(synchronize_session=None)
+    )
+    return claimed.rowcount == 1
+
+
+class BotMonitor:
+    """
+    Monitoramento automático de um robô (uma thread por robô)
+
+    A própria thread se supervisiona: uma exceção na rodada não mata o
+    monitor, que espera um backoff exponencial e reinicia o ciclo. Parar
+    e pausar acordam a thread na hora (sem esperar o intervalo).
+
+    Antes de cada rodada (e a cada intervalo, se pausado) a thread renova
+    a posse em monitor_leases e aplica o estado pedido lá, então parar ou
+    pausar pelo admin vale mesmo se a requisição cair em outro worker.
+    """
+
+    def __init__(self, app, bot_id: int, interval: float = 30.0,
+                 base_backoff: float = 1.0, max_backoff: float = 300.0):
+        self.app = app
+        self.bot_id = bot_id
+        self.interval = interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = MONITOR_STOPPED
+        self.stop_reason: Optional[str] = None
+        self.feed = None
+        self._thread: Optional[threading.Thread] = None
+        self._state_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_requested = False
+        self._paused = False
+        self._next_tick_at = 0.0
+
+        # Métricas
+        self.started_at: Optional[str] = None
+        self.ticks = 0
+        self.signals = 0
+        self.errors = 0  # Rodadas que levantaram exceção
+        self.consecutive_failures = 0
+        self.restarts = 0  # Threads recriadas após morrerem sem stop()
+        self.last_error: Optional[str] = None
+        self.last_tick_at: Optional[str] = None
+        self.last_tick_ms = 0.0
+        self.tick_lag_ms = 0.0
+        self._signal_times: deque = deque(maxlen=10000)
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Iniciar (ou retomar, se pausado ou parando) o monitor"""
+        with self._state_lock:
+            self._paused = False
+            if self.alive and self.state != MONITOR_STOPPED:
+                # Pausado ou ainda parando: a mesma thread segue rodando
+                if self.state in (MONITOR_PAUSED, MONITOR_STOPPING):
+                    self._stop_requested = False
+                    self.stop_reason = None
+                    self.state = MONITOR_RUNNING
+                    self._next_tick_at = time.monotonic()
+                self._wake.set()
+                return
+
+            self._stop_requested = False
+            self.stop_reason = None
+            self.state = MONITOR_RUNNING
+            self.started_at = datetime.utcnow().isoformat()
+            self._next_tick_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name=f"monitor_bot_{self.bot_id}", daemon=True)
+            self._thread.start()
+
+    def stop(self, reason: str = 'Parado manualmente'):
+        with self._state_lock:
+            self._stop_requested = True
+            self.stop_reason = reason
+            self._wake.set()
+            if self.state != MONITOR_STOPPED:
+                self.state = MONITOR_STOPPING if self.alive else MONITOR_STOPPED
+
+    def pause(self):
+        with self._state_lock:
+            self._paused = True
+            if self.alive and not self._stop_requested:
+                self.state = MONITOR_PAUSED
+            self._wake.set()
+
+    def ensure_alive(self) -> bool:
+        """
+        Reiniciar a thread se ela morreu sem ter sido parada
+
+        Chamado ao consultar o estado; após um restart do processo os
+        monitores voltam por MonitorRegistry.resume.
+        """
+        if self.state in (MONITOR_RUNNING, MONITOR_BACKOFF, MONITOR_PAUSED) and not self.alive \
+                and not self._stop_requested:
+            logger.warning(f"Monitor do robô {self.bot_id} morreu; reiniciando")
+            self.restarts += 1
+            paused = self._paused
+            self.start()
+            if paused:
+                self.pause()
+            return True
+        return False
+
+    def _run(self):
+        with worker_context(self.app):
+            while True:
+                self._loop()
+                # start() durante a parada limpa o pedido: a mesma thread continua
+                with self._state_lock:
+                    if self._stop_requested:
+                        self._release_lease()
+                        self.state = MONITOR_STOPPED
+                        return
+
+    def _loop(self):
+        while not self._stop_requested:
+            if self._paused:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                try:
+                    if not self._sync_lease():
+                        return
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Erro ao sincronizar o monitor do robô {self.bot_id}: {str(e)}")
+                continue
+
+            delay = self._next_tick_at - time.monotonic()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue
+
+            started = time.monotonic()
+            self.tick_lag_ms = round((started - self._next_tick_at) * 1000, 3)
+            try:
+                if not self._sync_lease():
+                    return
+                if self._paused:
+                    continue
+                if not self._tick():
+                    return
+                self.consecutive_failures = 0
+                self.state = MONITOR_RUNNING
+                self._next_tick_at = started + self.interval
+            except Exception as e:
+                db.session.rollback()
+                self.errors += 1
+                self.consecutive_failures += 1
+                self.last_error = str(e)
+                self.state = MONITOR_BACKOFF
+                self._next_tick_at = time.monotonic() + self.backoff()
+                logger.error(f"Erro no monitoramento do robô {self.bot_id}: {str(e)}")
+            finally:
+                self.last_tick_ms = round((time.monotonic() - started) * 1000, 3)
+
+    def _sync_lease(self) -> bool:
+        """Renovar a posse e aplicar o estado pedido por qualquer worker; False encerra"""
+        lease = db.session.get(MonitorLease, self.bot_id, populate_existing=True)
+        if lease is None or lease.desired_state == MONITOR_STOPPED:
+            db.session.rollback()
+            self.stop()
+            return False
+        if not claim_lease(self.bot_id, self.interval):
+            db.session.rollback()
+            self.stop('Assumido por outro processo')
+            return False
+        desired, interval = lease.desired_state, lease.interval
+        db.session.commit()
+
+        if interval:
+            self.interval = interval
+        with self._state_lock:
+            if desired == MONITOR_PAUSED and not self._paused:
+                self._paused = True
+                self.state = MONITOR_PAUSED
+            elif desired == MONITOR_RUNNING and self._paused:
+                self._paused = False
+                self.state = MONITOR_RUNNING
+                self._next_tick_at = time.monotonic()
+        return True
+
+    def _release_lease(self):
+        """Liberar a posse ao parar (outro worker pode iniciar o monitor na hora)"""
+        try:
+            db.session.execute(
+                update(MonitorLease)
+                .where(MonitorLease.bot_id == self.bot_id, MonitorLease.owner == process_owner())
+                .values(owner=None, heartbeat_at=None)
+                .execution_options(synchronize_session=None)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Erro ao liberar o monitor do robô {self.bot_id}: {str(e)}")
+
+    def _tick(self) -> bool:
+        """Uma rodada do monitor; False encerra (robô removido ou inativo)"""
+        bot = db.session.get(Bot, self.bot_id)
+        if not bot or not bot.is_active:
+            self._stop_requested = True
+            self.stop_reason = 'Robô removido' if not bot else 'Robô inativo'
+            return False
+
+        feed = self.feed = feed_router.feed(bot.casino_site, bot.game_type)
+
+        # Simular coleta de dados do jogo (em produção, conectar com API real)
+        game_data = feed.analyzer.simulate_game_data(bot.game_type)
+
+        # Estratégias ativas do robô
+        strategies = [
+            strategy for strategy in strategy_index.get(bot.game_type, bot.casino_site)
+            if strategy['bot_id'] == self.bot_id
+        ]
+
+        # Analisar sinais e enviar os detectados
+        signals = feed.analyze(game_data, strategies)
+        sent = dispatch_signals(bot.game_type, game_data, signals, bot.casino_site)
+
+        self.ticks += 1
+        self.signals += len(sent)
+        now = time.monotonic()
+        self._signal_times.extend(now for _ in sent)
+        self.last_tick_at = datetime.utcnow().isoformat()
+        return True
+
+    def backoff(self) -> float:
+        return min(self.max_backoff, self.base_backoff * (2 ** (self.consecutive_failures - 1)))
+
+    def signals_per_minute(self) -> int:
+        cutoff = time.monotonic() - 60
+        return sum(1 for sent_at in self._signal_times if sent_at >= cutoff)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'bot_id': self.bot_id,
+            'state': self.state,
+            'stop_reason': self.stop_reason if self.state == MONITOR_STOPPED else None,
+            'thread_alive': self.alive,
+            'interval': self.interval,
+            'started_at': self.started_at,
+            'last_tick_at': self.last_tick_at,
+            'last_tick_ms': self.last_tick_ms,
+            'tick_lag_ms': self.tick_lag_ms,
+            'next_tick_in': round(max(0.0, self._next_tick_at - time.monotonic()), 3) if self.alive else None,
+            'queue_depth': self.feed.queue_depth() if self.feed is not None else 0,
+            'ticks': self.ticks,
+            'signals': self.signals,
+            'signals_per_minute': self.signals_per_minute(),
+            'errors': self.errors,
+            'consecutive_failures': self.consecutive_failures,
+            'restarts': self.restarts,
+            'last_error': self.last_error
+        }
+
+
+class MonitorRegistry:
+    """
+    Monitores por robô: no máximo uma thread por robô em todos os workers
+
+    O estado pedido (rodando, pausado, parado) e a posse ficam em
+    monitor_leases. Iniciar neste worker só cria a thread se a posse
+    estiver livre; se outro worker já roda o monitor, ele aplica o
+    pedido na próxima sincronização. Parar e pausar gravam o pedido e
+    acordam a thread local, se houver.
+    """
+
+    def __init__(self, interval: float = 30.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._monitors: Dict[int, BotMonitor] = {}
+
+    @classmethod
+    def from_env(cls) -> 'MonitorRegistry':
+        """Criar a partir de MONITOR_INTERVAL (segundos entre rodadas)"""
+        return cls(interval=float(os.environ.get('MONITOR_INTERVAL', 30)))
+
+    def start(self, app, bot_id: int, interval: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Iniciar o monitor do robô (idempotente: não duplica threads entre workers)
+
+        Raises:
+            ValueError: interval não é um número positivo
+        """
+        interval = validate_interval(interval)
+        with self._lock:
+            lease = self._request(bot_id, MONITOR_RUNNING, interval)
+            interval = interval or lease.interval or self.interval
+            owned = claim_lease(bot_id, interval)
+            db.session.commit()
+
+            monitor = self._monitors.get(bot_id)
+            if owned:
+                if monitor is None:
+                    monitor = self._monitors[bot_id] = BotMonitor(app, bot_id, interval)
+                else:
+                    monitor.interval = interval
+                monitor.start()
+            elif monitor is not None:
+                monitor.stop('Assumido por outro processo')
+            return self.status(bot_id)
+
+    def resume(self, app) -> int:
+        """
+        Retomar os monitores pedidos (rodando ou pausados) sem thread viva
+
+        Chamado ao iniciar os serviços do processo: após um restart os
+        monitores voltam sozinhos, sem esperar uma chamada ao admin. Só
+        assume posses livres, deste processo ou sem heartbeat; o estado
+        pedido não é alterado. Retorna quantos monitores foram iniciados.
+        """
+        leases = [
+            (lease.bot_id, lease.desired_state, lease.interval)
+            for lease in MonitorLease.query
+            .filter(MonitorLease.desired_state.in_((MONITOR_RUNNING, MONITOR_PAUSED)))
+            .order_by(MonitorLease.bot_id)
+        ]
+        resumed = 0
+        with self._lock:
+            for bot_id, desired, interval in leases:
+                monitor = self._monitors.get(bot_id)
+                if monitor is not None and monitor.alive:
+                    continue
+                interval = interval or self.interval
+                if not claim_lease(bot_id, interval):
+                    db.session.rollback()
+                    continue
+                db.session.commit()
+
+                if monitor is None:
+                    monitor = self._monitors[bot_id] = BotMonitor(app, bot_id, interval)
+                else:
+                    monitor.interval = interval
+                monitor.start()
+                if desired == MONITOR_PAUSED:
+                    monitor.pause()
+                resumed += 1
+        if resumed:
+            logger.info(f"{resumed} monitores retomados")
+        return resumed
+
+    def stop(self, bot_id: int) -> Optional[Dict[str, Any]]:
+        return self._control(bot_id, MONITOR_STOPPED)
+
+    def pause(self, bot_id: int) -> Optional[Dict[str, Any]]:
+        return self._control(bot_id, MONITOR_PAUSED)
+
+    def _control(self, bot_id: int, desired: str) -> Optional[Dict[str, Any]]:
+        if db.session.get(MonitorLease, bot_id) is None and bot_id not in self._monitors:
+            return None
+        self._request(bot_id, desired)
+        db.session.commit()
+
+        monitor = self._monitors.get(bot_id)
+        if monitor is not None:
+            if desired == MONITOR_STOPPED:
+                monitor.stop()
+            else:
+                monitor.pause()
+        return self.status(bot_id)
+
+    @staticmethod
+    def _request(bot_id: int, desired: str, interval: Optional[float] = None) -> MonitorLease:
+        """Gravar o estado pedido (sem commit)"""
+        lease = db.session.get(MonitorLease, bot_id)
+        if lease is None:
+            lease = MonitorLease(bot_id=bot_id)
+            db.session.add(lease)
+        lease.desired_state = desired
+        if interval:
+            lease.interval = interval
+        db.session.flush()
+        return lease
+
+    def get(self, bot_id: int) -> Optional[BotMonitor]:
+        """Monitor deste processo (None se o robô roda em outro worker)"""
+        monitor = self._monitors.get(bot_id)
+        if monitor is not None:
+            monitor.ensure_alive()
+        return monitor
+
+    def status(self, bot_id: int) -> Optional[Dict[str, Any]]:
+        """Estado pedido e posse (banco) mais as métricas da thread, se for deste processo"""
+        lease = db.session.get(MonitorLease, bot_id, populate_existing=True)
+        monitor = self.get(bot_id)
+        if lease is None and monitor is None:
+            return None
+        return self._merge(lease, monitor)
+
+    def statuses(self) -> List[Dict[str, Any]]:
+        leases = {lease.bot_id: lease for lease in MonitorLease.query.order_by(MonitorLease.bot_id).all()}
+        local = {monitor.bot_id: monitor for monitor in self.monitors()}
+        return [self._merge(leases.get(bot_id), local.get(bot_id))
+                for bot_id in sorted(set(leases) | set(local))]
+
+    @staticmethod
+    def _merge(lease: Optional[MonitorLease], monitor: Optional[BotMonitor]) -> Dict[str, Any]:
+        owner = lease.owner if lease is not None else None
+        data = {
+            'bot_id': lease.bot_id if lease is not None else monitor.bot_id,
+            'desired_state': lease.desired_state if lease is not None else None,
+            'owner': owner,
+            'heartbeat_at': lease.heartbeat_at.isoformat() if lease is not None and lease.heartbeat_at else None,
+            'local': owner == process_owner()
+        }
+        if monitor is not None and (owner is None or data['local']):
+            data.update(monitor.status())
+        else:
+            # Thread em outro worker: as métricas ficam lá, o estado vem do pedido
+            data['state'] = data['desired_state'] if owner else MONITOR_STOPPED
+        return data
+
+    def monitors(self) -> List[BotMonitor]:
+        """Monitores deste processo"""
+        monitors = list(self._monitors.values())
+        for monitor in monitors:
+            monitor.ensure_alive()
+        return monitors
+
+    def stats(self) -> Dict[str, Any]:
+        monitors = self.monitors()
+        by_state: Dict[str, int] = {}
+        for monitor in monitors:
+            by_state[monitor.state] = by_state.get(monitor.state, 0) + 1
+        return {
+            'total': len(monitors),
+            'by_state': by_state,
+            'errors': sum(monitor.errors for monitor in monitors),
+            'restarts': sum(monitor.restarts for monitor in monitors)
+        }
+
+
+monitors = MonitorRegistry.from_env()
@@ -0,0 +1,459 @@
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import func, or_, and_, update
+
+from src.models.user import db
+from src.models.engine import worker_context
+from src.models.bot import Bot, GameResult
+from src.models.outbox import OutboxMessage, OUTBOX_PENDING, OUTBOX_SENDING, OUTBOX_SENT, OUTBOX_FAILED
+from src.services.telegram_service import telegram_registry, MAX_MESSAGE_LENGTH, DIGEST_SEPARATOR
+from src.services.counters import counters
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Erros do Telegram que não adianta repetir (chat/token inválidos, bot bloqueado)
+PERMANENT_STATUS_CODES = (400, 401, 403, 404)
+
+# Maior janela aceita para o modo resumo (segundos)
+MAX_DIGEST_WINDOW = 10.0
+
+
+def parse_digest_window(value) -> float:
+    """Janela do modo resumo em segundos (0 desativa); ValueError se inválida"""
+    try:
+        window = float(value or 0)
+    except (TypeError, ValueError):
+        raise ValueError('digest_window deve ser um número de segundos')
+    if window < 0 or window > MAX_DIGEST_WINDOW:
+        raise ValueError(f'digest_window deve estar entre 0 e {MAX_DIGEST_WINDOW:g} segundos')
+    return window
+
+
+class TelegramOutbox:
+    """
+    Fila persistente de mensagens do Telegram (padrão outbox)
+
+    A mensagem é gravada na mesma transação do resultado que a gerou e
+    enviada depois por uma thread de background, com backoff exponencial
+    entre as tentativas. Cada mensagem tem uma chave de idempotência, de
+    modo que reprocessar a mesma rodada não duplica o envio. As linhas
+    são reservadas com um token antes do envio, o que permite vários
+    processos drenando a mesma tabela; reservas expiradas (processo que
+    caiu no meio do envio) voltam para a fila. O estado de cada envio é
+    gravado logo após o envio, junto com a renovação da reserva das
+    mensagens restantes do lote, e só vale para quem ainda detém o token:
+    um lote lento não perde a reserva e um processo cuja reserva expirou
+    não sobrescreve o novo dono. O total_signals da estratégia só conta
+    mensagens efetivamente entregues.
+
+    Robôs em modo resumo (digest_window > 0) não enviam cada sinal na
+    hora: a primeira mensagem do chat abre um timer de digest_window
+    segundos e as seguintes herdam o mesmo horário de envio, de modo que
+    todas vencem juntas e saem em uma única mensagem (respeitando o
+    limite de caracteres do Telegram). O timer é o next_attempt_at da
+    mensagem pendente mais antiga do chat, lido do banco, então vale
+    para todos os processos. O enviador acorda no vencimento do timer
+    mais próximo deste processo (os de outros processos são vistos a
+    cada poll_interval), então a latência fica limitada pela janela.
+    """
+
+    def __init__(self, batch_size: int = 100, max_attempts: int = 8, base_delay: float = 2.0,
+                 max_delay: float = 600.0, lease_seconds: float = 60.0, poll_interval: float = 1.0,
+                 keep_days: int = 7):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.keep_days = keep_days
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._sent_times: deque = deque(maxlen=10000)
+        self._purged_at = 0.0
+        self._next_flush: Optional[datetime] = None  # Resumo mais próximo agendado neste processo
+        self._timers_lock = threading.Lock()
+
+        # Métricas do processo
+        self.enqueued = 0
+        self.duplicates = 0
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+        self.digests = 0
+        self.digested = 0
+
+    @classmethod
+    def from_env(cls) -> 'TelegramOutbox':
+        """Criar a partir de OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, OUTBOX_POLL_INTERVAL e OUTBOX_KEEP_DAYS"""
+        return cls(
+            batch_size=int(os.environ.get('OUTBOX_BATCH_SIZE', 100)),
+            max_attempts=int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8)),
+            poll_interval=float(os.environ.get('OUTBOX_POLL_INTERVAL', 1.0)),
+            keep_days=int(os.environ.get('OUTBOX_KEEP_DAYS', 7))
+        )
+
+    def enqueue(self, messages: List[Dict[str, Any]]) -> List[OutboxMessage]:
+        """
+        Adicionar mensagens ao outbox na sessão atual (sem commit)
+
+        Args:
+            messages: Dicts com idempotency_key, bot_id, chat_id, text e,
+                opcionalmente, parse_mode, result_id e digest_window
+
+        Returns:
+            Linhas adicionadas (chaves já existentes são ignoradas)
+        """
+        existing = self.existing_keys(message['idempotency_key'] for message in messages)
+
+        rows = []
+        flush_times = {}  # (bot_id, chat_id) -> envio do resumo, uma consulta por chat
+        for message in messages:
+            key = message['idempotency_key']
+            if key in existing:
+                self.duplicates += 1
+                continue
+            existing.add(key)
+            row = OutboxMessage(
+                idempotency_key=key,
+                bot_id=message['bot_id'],
+                chat_id=message['chat_id'],
+                text=message['text'],
+                parse_mode=message.get('parse_mode', 'HTML'),
+                result_id=message.get('result_id'),
+                status=OUTBOX_PENDING,
+                attempts=0,
+                next_attempt_at=self._flush_time(flush_times, message)
+            )
+            db.session.add(row)
+            rows.append(row)
+
+        self.enqueued += len(rows)
+        return rows
+
+    def _flush_time(self, flush_times: Dict[tuple, datetime], message: Dict[str, Any]) -> datetime:
+        key = (message['bot_id'], message['chat_id'])
+        if key not in flush_times:
+            flush_times[key] = self.flush_time(message['bot_id'], message['chat_id'], message.get('digest_window'))
+        return flush_times[key]
+
+    def flush_time(self, bot_id: int, chat_id: str, digest_window: Optional[float] = None) -> datetime:
+        """
+        Horário de envio de uma nova mensagem (timer do resumo do chat, se ativo)
+
+        O timer aberto é o next_attempt_at futuro mais antigo entre as
+        mensagens ainda não tentadas do mesmo robô e chat, gravadas por
+        qualquer processo; sem nenhuma, abre um novo de digest_window.
+        """
+        now = datetime.utcnow()
+        if not digest_window or digest_window <= 0:
+            return now
+
+        flush_at = db.session.query(func.min(OutboxMessage.next_attempt_at)).filter(
+            OutboxMessage.bot_id == bot_id,
+            OutboxMessage.chat_id == chat_id,
+            OutboxMessage.status == OUTBOX_PENDING,
+            OutboxMessage.attempts == 0,
+            OutboxMessage.next_attempt_at > now
+        ).scalar()
+        if flush_at is None:
+            flush_at = now + timedelta(seconds=min(digest_window, MAX_DIGEST_WINDOW))
+
+        with self._timers_lock:
+            if self._next_flush is None or flush_at < self._next_flush:
+                self._next_flush = flush_at
+        return flush_at
+
+    def _next_wait(self) -> float:
+        """Espera até o próximo resumo agendado neste processo (no máximo poll_interval)"""
+        with self._timers_lock:
+            if self._next_flush is None:
+                return self.poll_interval
+            remaining = (self._next_flush - datetime.utcnow()).total_seconds()
+            if remaining <= 0:
+                self._next_flush = None
+                return 0
+            return min(self.poll_interval, remaining)
+
+    def existing_keys(self, keys) -> set:
+        """Chaves de idempotência que já estão no outbox"""
+        keys = set(keys)
+        if not keys:
+            return set()
+        existing = {
+            key for (key,) in db.session.query(OutboxMessage.idempotency_key)
+            .filter(OutboxMessage.idempotency_key.in_(keys))
+        }
+        self.duplicates += len(existing)
+        return existing
+
+    def notify(self):
+        """Acordar o enviador (chamar após o commit das mensagens)"""
+        self._wake.set()
+
+    def start(self, app):
+        """Iniciar o enviador em background"""
+        self._app = app
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name='telegram_outbox', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            wait = self._next_wait()
+            if wait > 0:
+                self._wake.wait(wait)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                with worker_context(self._app):
+                    self.drain()
+                    if time.monotonic() - self._purged_at >= 3600:
+                        self.purge_sent()
+            except Exception as e:
+                logger.error(f"Erro ao drenar outbox do Telegram: {str(e)}")
+
+    def drain(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Enviar as mensagens vencidas, em lotes, até esvaziar a fila
+
+        Returns:
+            Quantidade de mensagens enviadas, reagendadas e descartadas
+        """
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        with self._drain_lock:
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                token, batch = self._claim()
+                if token is None:
+                    break
+                if not batch:
+                    # Outro processo reservou as mesmas linhas antes: tentar o próximo lote vencido
+                    continue
+                for name, count in self._deliver(token, batch).items():
+                    totals[name] += count
+                batches += 1
+        return totals
+
+    def _claim(self) -> Tuple[Optional[str], List[OutboxMessage]]:
+        """Reservar um lote de mensagens vencidas (ou com reserva expirada)"""
+        now = datetime.utcnow()
+        due = or_(
+            and_(OutboxMessage.status == OUTBOX_PENDING, OutboxMessage.next_attempt_at <= now),
+            and_(OutboxMessage.status == OUTBOX_SENDING, OutboxMessage.locked_until < now)
+        )
+        ids = [
+            message_id for (message_id,) in db.session.query(OutboxMessage.id)
+            .filter(due).order_by(OutboxMessage.id).limit(self.batch_size)
+        ]
+        if not ids:
+            db.session.commit()
+            return None, []
+
+        token = uuid.uuid4().hex
+        db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids), due)
+            .values(status=OUTBOX_SENDING, claim_token=token,
+                    locked_until=now + timedelta(seconds=self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return token, OutboxMessage.query.filter_by(claim_token=token).order_by(OutboxMessage.id).all()
+
+    def _deliver(self, claim_token: str, batch: List[OutboxMessage]) -> Dict[str, int]:
+        """Enviar um lote reservado, gravando o estado de cada envio assim que ele termina"""
+        bots = {
+            bot_id: (bot_token, digest_window)
+            for bot_id, bot_token, digest_window in db.session.query(Bot.id, Bot.telegram_token, Bot.digest_window)
+            .filter(Bot.id.in_({message.bot_id for message in batch}))
+        }
+        result_ids = {message.result_id for message in batch if message.result_id is not None}
+        strategy_ids = dict(
+            db.session.query(GameResult.id, GameResult.strategy_id).filter(GameResult.id.in_(result_ids))
+        ) if result_ids else {}
+        counts = {'sent': 0, 'retried': 0, 'failed': 0}
+        for group in self._group(batch, bots):
+            first = group[0]
+            bot_token = bots.get(first.bot_id, (None, None))[0]
+            if bot_token is None:
+                result = {'success': False, 'error': 'Robô não encontrado', 'status_code': 404}
+            else:
+                service = telegram_registry.get(bot_token)
+                text = service.format_digest_message([message.text for message in group])
+                result = service.send_message(first.chat_id, text, first.parse_mode or 'HTML')
+                if len(group) > 1:
+                    self.digests += 1
+                    self.digested += len(group)
+
+            # Um resumo que falhou é reagendado inteiro (mesmo horário para todas as mensagens)
+            now = datetime.utcnow()
+            updates = []
+            delivered_results = []
+            delay = None
+            for message in group:
+                attempts = message.attempts + 1
+                row = {'id': message.id, 'attempts': attempts, 'claim_token': None, 'locked_until': None}
+                if result['success']:
+                    row.update(status=OUTBOX_SENT, sent_at=now, last_error=None)
+                    if message.result_id is not None:
+                        delivered_results.append({'id': message.result_id, 'signal_sent': True})
+                    counts['sent'] += 1
+                elif result.get('status_code') in PERMANENT_STATUS_CODES or attempts >= self.max_attempts:
+                    row.update(status=OUTBOX_FAILED, last_error=result.get('error'))
+                    counts['failed'] += 1
+                else:
+                    if delay is None:
+                        delay = max(self.backoff(attempts), float(result.get('retry_after') or 0))
+                    row.update(status=OUTBOX_PENDING, last_error=result.get('error'),
+                               next_attempt_at=now + timedelta(seconds=delay))
+                    counts['retried'] += 1
+                updates.append(row)
+
+            self._record(claim_token, updates, delivered_results)
+            for delivered in delivered_results:
+                strategy_id = strategy_ids.get(delivered['id'])
+                if strategy_id is not None:
+                    counters.add(strategy_id, first.bot_id, total_signals=1)
+        counters.end_tick()
+
+        self.sent += counts['sent']
+        self.retries += counts['retried']
+        self.failed += counts['failed']
+        sent_at = time.monotonic()
+        self._sent_times.extend(sent_at for _ in range(counts['sent']))
+        return counts
+
+    def _record(self, claim_token: str, updates: List[Dict[str, Any]], delivered_results: List[Dict[str, Any]]):
+        """Gravar o resultado de um envio e renovar a reserva do restante do lote"""
+        try:
+            # Só altera as linhas ainda reservadas com este token
+            db.session.execute(
+                update(OutboxMessage).where(OutboxMessage.claim_token == claim_token)
+                .execution_options(synchronize_session=None),
+                updates
+            )
+            if delivered_results:
+                db.session.execute(update(GameResult), delivered_results)
+            db.session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.claim_token == claim_token, OutboxMessage.status == OUTBOX_SENDING)
+                .values(locked_until=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def _group(batch: List[OutboxMessage], bots: Dict[int, tuple]) -> List[List[OutboxMessage]]:
+        """
+        Envios do lote: uma mensagem por envio, ou resumos por chat para
+        robôs em modo resumo (cada resumo cabe em uma mensagem do Telegram)
+        """
+        groups = []
+        open_groups: Dict[tuple, List[OutboxMessage]] = {}
+        for message in batch:
+            digest_window = bots.get(message.bot_id, (None, None))[1]
+            if not digest_window:
+                groups.append([message])
+                continue
+
+            key = (message.bot_id, message.chat_id, message.parse_mode)
+            group = open_groups.get(key)
+            if group is not None:
+                length = sum(len(item.text) for item in group) + len(message.text) + \
+                    len(DIGEST_SEPARATOR) * (len(group) + 1) + 32  # + cabeçalho
+                if length <= MAX_MESSAGE_LENGTH:
+                    group.append(message)
+                    continue
+            group = open_groups[key] = [message]
+            groups.append(group)
+        return groups
+
+    def backoff(self, attempts: int) -> float:
+        """Espera antes da próxima tentativa (exponencial com jitter)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.75, 1.25)
+
+    def retry_failed(self) -> int:
+        """Recolocar na fila as mensagens que esgotaram as tentativas"""
+        count = OutboxMessage.query.filter_by(status=OUTBOX_FAILED).update({
+            'status': OUTBOX_PENDING,
+            'attempts': 0,
+            'next_attempt_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        if count:
+            self.notify()
+        return count
+
+    def purge_sent(self) -> int:
+        """Remover mensagens entregues há mais de keep_days dias"""
+        self._purged_at = time.monotonic()
+        if self.keep_days <= 0:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=self.keep_days)
+        count = OutboxMessage.query.filter(
+            OutboxMessage.status == OUTBOX_SENT,
+            OutboxMessage.sent_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return count
+
+    def sent_per_minute(self) -> int:
+        cutoff = time.monotonic() - 60
+        return sum(1 for sent_at in self._sent_times if sent_at >= cutoff)
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho da fila por estado, idade da mensagem pendente mais antiga e taxa de envio"""
+        by_status = dict(
+            db.session.query(OutboxMessage.status, func.count(OutboxMessage.id))
+            .group_by(OutboxMessage.status)
+        )
+        oldest = db.session.query(func.min(OutboxMessage.created_at)).filter(
+            OutboxMessage.status.in_((OUTBOX_PENDING, OUTBOX_SENDING))
+        ).scalar()
+
+        return {
+            'pending': by_status.get(OUTBOX_PENDING, 0),
+            'sending': by_status.get(OUTBOX_SENDING, 0),
+            'sent': by_status.get(OUTBOX_SENT, 0),
+            'failed': by_status.get(OUTBOX_FAILED, 0),
+            'oldest_pending_seconds': round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else 0,
+            'sent_per_minute': self.sent_per_minute(),
+            'process': {
+                'enqueued': self.enqueued,
+                'duplicates': self.duplicates,
+                'sent': self.sent,
+                'retries': self.retries,
+                'failed': self.failed,
+                'digests': self.digests,
+                'digested_messages': self.digested
+            }
+        }
+
+
+outbox = TelegramOutbox.from_env()
@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Optional, List
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Diretório do pacote da aplicação (src/), usado para filtrar pilhas relevantes
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAX_DURATION = 300  # segundos
+MIN_INTERVAL_MS = 1
+
+
+class SamplingProfiler:
+    """Profiler por amostragem de pilhas de todas as threads do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._duration = 0.0
+        self._interval = 0.005
+        self._only_app = True
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = 10, interval_ms: float = 5, only_app: bool = True) -> Dict[str, Any]:
+        """
+        Iniciar uma sessão de amostragem
+
+        Args:
+            duration: Duração da sessão em segundos (máx. MAX_DURATION)
+            interval_ms: Intervalo entre amostras em milissegundos
+            only_app: Manter apenas pilhas que passam pelo código de src/
+
+        Returns:
+            Dict com o estado da sessão iniciada
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError('Profiler já está em execução')
+
+            self._duration = max(0.1, min(float(duration), MAX_DURATION))
+            self._interval = max(MIN_INTERVAL_MS, float(interval_ms)) / 1000.0
+            self._only_app = only_app
+            self._stacks = Counter()
+            self._samples = 0
+            self._started_at = time.time()
+            self._finished_at = None
+            self._stop_event.clear()
+
+            self._thread = threading.Thread(
+                target=self._run,
+                name='sampling_profiler',
+                daemon=True
+            )
+            self._thread.start()
+
+        logger.info(f"Profiler iniciado por {self._duration}s (intervalo {self._interval * 1000:.1f}ms)")
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        """Interromper a sessão atual (os dados coletados são mantidos)"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Obter estado da sessão atual ou da última sessão"""
+        return {
+            'running': self.running,
+            'started_at': self._started_at,
+            'finished_at': self._finished_at,
+            'duration': self._duration,
+            'interval_ms': round(self._interval * 1000, 3),
+            'only_app': self._only_app,
+            'samples': self._samples,
+            'unique_stacks': len(self._stacks)
+        }
+
+    def collapsed(self) -> str:
+        """
+        Exportar pilhas no formato "collapsed" (flamegraph.pl / speedscope)
+
+        Returns:
+            Uma linha por pilha: "thread;frame;frame contagem"
+        """
+        with self._lock:
+            items = sorted(self._stacks.items(), key=lambda item: item[1], reverse=True)
+        return '\n'.join(f"{stack} {count}" for stack, count in items)
+
+    def top_stacks(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Obter as pilhas mais frequentes"""
+        with self._lock:
+            items = self._stacks.most_common(limit)
+        return [{'stack': stack.split(';'), 'samples': count} for stack, count in items]
+
+    def _run(self):
+        """Loop de amostragem executado na thread do profiler"""
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self._duration
+
+        try:
+            while not self._stop_event.is_set() and time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                frames = sys._current_frames()
+                collected = []
+
+                for ident, frame in frames.items():
+                    if ident == own_ident:
+                        continue
+                    stack = self._collapse_frame(frame)
+                    if stack is None:
+                        continue
+                    collected.append(f"{names.get(ident, ident)};{stack}")
+
+                with self._lock:
+                    self._stacks.update(collected)
+                    self._samples += 1
+
+                self._stop_event.wait(self._interval)
+        except Exception as e:
+            logger.error(f"Erro no profiler: {str(e)}")
+        finally:
+            self._finished_at = time.time()
+
+    def _collapse_frame(self, frame) -> Optional[str]:
+        """Converter uma pilha de frames em "raiz;...;folha" """
+        parts = []
+        in_app = False
+
+        while frame is not None:
+            code = frame.f_code
+            filename = code.co_filename
+            if filename.startswith(APP_ROOT):
+                in_app = True
+            parts.append(f"{code.co_name} ({os.path.basename(filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        if self._only_app and not in_app:
+            return None
+
+        parts.reverse()
+        return ';'.join(parts)
+
+
+profiler = SamplingProfiler()
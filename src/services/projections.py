@@ -0,0 +1,136 @@
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+from sqlalchemy import case, func, select
+
+from src.models.user import db
+from src.models.bot import Bot, Strategy
+from src.services.counters import COUNTER_FIELDS
+
+# Colunas que podem ser pedidas em ?fields= (telegram_token nunca é projetado)
+BOT_FIELDS = ('id', 'name', 'game_type', 'casino_site', 'telegram_chat_id', 'digest_window',
+              'is_active', 'created_at', 'updated_at')
+BOT_SUMMARY_FIELDS = ('id', 'name', 'game_type', 'casino_site', 'is_active')
+
+STRATEGY_FIELDS = ('id', 'name', 'bot_id', 'pattern', 'action', 'start_time', 'end_time',
+                   'custom_message', 'use_default_message', 'is_active') + COUNTER_FIELDS + \
+                  ('win_rate', 'win_rate_no_gale', 'win_rate_with_gale', 'created_at', 'updated_at')
+STRATEGY_SUMMARY_FIELDS = ('id', 'name', 'bot_id', 'is_active', 'total_signals', 'win_rate')
+
+# Taxas calculadas no SQL: campo -> contador do numerador
+STRATEGY_RATES = {
+    'win_rate': 'wins',
+    'win_rate_no_gale': 'wins_no_gale',
+    'win_rate_with_gale': 'wins_with_gale'
+}
+
+VIEWS = ('full', 'summary')
+
+
+class ProjectionError(ValueError):
+    """Parâmetros view/fields inválidos"""
+
+
+def wants_projection(args) -> bool:
+    """A listagem pediu uma projeção (?view=summary ou ?fields=)?"""
+    return bool(args.get('fields')) or args.get('view', 'full') != 'full'
+
+
+def parse_fields(args, allowed: Sequence[str], summary: Sequence[str]) -> List[str]:
+    """
+    Colunas pedidas em ?fields=a,b,c ou pela visão ?view=summary
+
+    Raises:
+        ProjectionError: visão ou campo desconhecido
+    """
+    raw = args.get('fields')
+    if raw:
+        fields = [field.strip() for field in raw.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ProjectionError(f"Campos inválidos: {', '.join(unknown)} (permitidos: {', '.join(allowed)})")
+        return list(dict.fromkeys(fields))
+
+    view = args.get('view', 'full')
+    if view not in VIEWS:
+        raise ProjectionError(f"view inválida: {view} (use {' ou '.join(VIEWS)})")
+    return list(summary if view == 'summary' else allowed)
+
+
+def validate_bot_projection(args):
+    """Validar ?view=/?fields= de listagens de robôs (antes do GET condicional)"""
+    if wants_projection(args):
+        parse_fields(args, BOT_FIELDS, BOT_SUMMARY_FIELDS)
+
+
+def validate_strategy_projection(args):
+    """Validar ?view=/?fields= de listagens de estratégias"""
+    if wants_projection(args):
+        parse_fields(args, STRATEGY_FIELDS, STRATEGY_SUMMARY_FIELDS)
+
+
+def validate_overview_fields(args):
+    """Validar ?fields= da visão geral dos robôs"""
+    if args.get('fields'):
+        parse_fields(args, BOT_FIELDS, BOT_SUMMARY_FIELDS)
+
+
+def rate(numerator, denominator):
+    """Percentual arredondado (0 quando não há sinais), calculado no banco"""
+    return case(
+        (func.coalesce(denominator, 0) > 0, func.round(numerator * 100.0 / denominator, 2)),
+        else_=0.0
+    )
+
+
+def _strategy_column(field: str):
+    if field in STRATEGY_RATES:
+        return rate(getattr(Strategy, STRATEGY_RATES[field]), Strategy.total_signals).label(field)
+    return getattr(Strategy, field)
+
+
+def _rows(statement) -> List[Dict[str, Any]]:
+    """Linhas como dicts, sem instanciar objetos ORM"""
+    rows = []
+    for row in db.session.execute(statement).mappings():
+        item = dict(row)
+        for key, value in item.items():
+            if isinstance(value, datetime):
+                item[key] = value.isoformat()
+        rows.append(item)
+    return rows
+
+
+def list_bots(fields: Sequence[str]) -> List[Dict[str, Any]]:
+    return _rows(select(*(getattr(Bot, field) for field in fields)).order_by(Bot.id))
+
+
+def list_strategies(bot_id: int, fields: Sequence[str]) -> List[Dict[str, Any]]:
+    return _rows(
+        select(*(_strategy_column(field) for field in fields))
+        .where(Strategy.bot_id == bot_id)
+        .order_by(Strategy.id)
+    )
+
+
+def bots_overview(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Robôs com totais agregados das estratégias em um único GROUP BY
+
+    Substitui uma chamada de listagem de estratégias por robô no painel.
+    """
+    fields = fields or BOT_SUMMARY_FIELDS
+    wins = func.coalesce(func.sum(Strategy.wins), 0)
+    total_signals = func.coalesce(func.sum(Strategy.total_signals), 0)
+
+    statement = select(
+        *(getattr(Bot, field) for field in fields),
+        func.count(Strategy.id).label('strategies'),
+        func.coalesce(func.sum(case((Strategy.is_active == True, 1), else_=0)), 0).label('active_strategies'),
+        total_signals.label('total_signals'),
+        wins.label('wins'),
+        func.coalesce(func.sum(Strategy.losses), 0).label('losses'),
+        rate(wins, total_signals).label('win_rate')
+    ).outerjoin(Strategy, Strategy.bot_id == Bot.id).group_by(Bot.id).order_by(Bot.id)
+
+    return _rows(statement)
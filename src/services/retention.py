@@ -0,0 +1,285 @@
+import glob
+import gzip
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, text
+
+from src.models.user import db
+from src.models.engine import worker_context
+from src.models.bot import GameResult, GameRound, ResultArchive
+from src.services.serializer import dumps_bytes, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (servidor de desenvolvimento)
+    fcntl = None
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 1000  # Linhas lidas por vez ao exportar um dia (sem carregar o dia inteiro)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'archive')
+
+
+class RetentionService:
+    """
+    Retenção de game_results particionada por dia
+
+    Dias mais antigos que retention_days são exportados para arquivos
+    NDJSON comprimidos (um por dia) e removidos do banco ativo. Os
+    contadores das estratégias já são cumulativos, então continuam
+    refletindo os resultados arquivados. Depois de cada compactação o
+    SQLite libera páginas com incremental_vacuum.
+
+    Cada worker do gunicorn tem seu próprio serviço, então a execução é
+    protegida por uma trava de arquivo (flock) no diretório de arquivos:
+    só um processo arquiva por vez e os demais pulam a rodada.
+    """
+
+    def __init__(self, retention_days: int = 30, archive_dir: str = DEFAULT_ARCHIVE_DIR,
+                 interval: float = 3600, vacuum_pages: int = 2000):
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self.vacuum_pages = vacuum_pages
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_env(cls) -> 'RetentionService':
+        """Criar a partir de RETENTION_DAYS, RETENTION_ARCHIVE_DIR e RETENTION_INTERVAL"""
+        return cls(
+            retention_days=int(os.environ.get('RETENTION_DAYS', 30)),
+            archive_dir=os.environ.get('RETENTION_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR),
+            interval=float(os.environ.get('RETENTION_INTERVAL', 3600))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def start(self, app):
+        """Iniciar a compactação periódica em background"""
+        self._app = app
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name='retention_worker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                with worker_context(self._app):
+                    self.run_once()
+            except Exception as e:
+                logger.error(f"Erro na retenção de resultados: {str(e)}")
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Arquivar todos os dias anteriores ao corte e compactar o banco
+
+        Args:
+            now: Referência de tempo (padrão: agora, UTC)
+
+        Returns:
+            Dict com os dias arquivados e linhas removidas
+        """
+        if not self.enabled:
+            return {'archived_days': [], 'archived_rows': 0}
+
+        with self._run_lock, self._process_lock() as acquired:
+            if not acquired:
+                return {'archived_days': [], 'archived_rows': 0,
+                        'skipped': 'Retenção em execução em outro processo'}
+
+            now = now or datetime.utcnow()
+            cutoff = datetime.combine((now - timedelta(days=self.retention_days)).date(), datetime.min.time())
+
+            archived_days = []
+            archived_rows = 0
+            last_round_id = None
+            while True:
+                oldest = db.session.query(db.func.min(GameResult.timestamp)) \
+                    .filter(GameResult.timestamp < cutoff).scalar()
+                if oldest is None:
+                    break
+
+                day = oldest.date()
+                rows, day_round_id = self._archive_day(day)
+                archived_rows += rows
+                if day_round_id is not None:
+                    last_round_id = max(last_round_id or 0, day_round_id)
+                archived_days.append(day.isoformat())
+
+            if archived_rows:
+                self._delete_orphan_rounds(cutoff, last_round_id)
+                self.incremental_vacuum()
+
+            self.last_run = {
+                'finished_at': datetime.utcnow().isoformat(),
+                'cutoff': cutoff.isoformat(),
+                'archived_days': archived_days,
+                'archived_rows': archived_rows
+            }
+            return self.last_run
+
+    @contextmanager
+    def _process_lock(self):
+        """Trava exclusiva entre processos (não bloqueante); produz True se obtida"""
+        if fcntl is None:
+            yield True
+            return
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with open(os.path.join(self.archive_dir, '.retention.lock'), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _archive_day(self, day: date) -> Tuple[int, Optional[int]]:
+        """
+        Exportar uma partição diária para o arquivo e removê-la do banco
+
+        As linhas são lidas em lotes (yield_per) direto para o gzip, então
+        a memória não cresce com o tamanho do dia.
+
+        Returns:
+            Linhas arquivadas e o maior round_id entre elas
+        """
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+
+        results = GameResult.query \
+            .filter(GameResult.timestamp >= start, GameResult.timestamp < end) \
+            .order_by(GameResult.id) \
+            .yield_per(ARCHIVE_BATCH_SIZE)
+
+        path = self._next_archive_path(day)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        count = 0
+        last_round_id = None
+        try:
+            with gzip.open(tmp_path, 'wb') as f:
+                for result in results:
+                    f.write(dumps_bytes(result.to_dict(as_string=False)))
+                    f.write(b'\n')
+                    count += 1
+                    if result.round_id is not None:
+                        last_round_id = max(last_round_id or 0, result.round_id)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+
+        try:
+            GameResult.query \
+                .filter(GameResult.timestamp >= start, GameResult.timestamp < end) \
+                .delete(synchronize_session=False)
+            db.session.add(ResultArchive(day=day, path=path, row_count=count))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            os.remove(path)
+            raise
+
+        logger.info(f"{count} resultados de {day.isoformat()} arquivados em {path}")
+        return count, last_round_id
+
+    def _next_archive_path(self, day: date) -> str:
+        base = os.path.join(self.archive_dir, f"game_results-{day.isoformat()}")
+        path = f"{base}.ndjson.gz"
+        part = 1
+        while os.path.exists(path):
+            path = f"{base}.{part}.ndjson.gz"
+            part += 1
+        return path
+
+    def _delete_orphan_rounds(self, cutoff: datetime, last_round_id: Optional[int] = None):
+        """
+        Remover rodadas antigas que não são mais referenciadas
+
+        Rodadas sem played_at (feed sem timestamp) usam a ordem do id: são
+        antigas se não passam da última rodada dos resultados arquivados.
+        """
+        old = GameRound.played_at < cutoff
+        if last_round_id is not None:
+            old = or_(old, and_(GameRound.played_at.is_(None), GameRound.id <= last_round_id))
+        referenced = db.session.query(GameResult.round_id).filter(GameResult.round_id.isnot(None))
+        GameRound.query \
+            .filter(old, GameRound.id.notin_(referenced)) \
+            .delete(synchronize_session=False)
+        db.session.commit()
+
+    def incremental_vacuum(self):
+        """Devolver páginas livres ao sistema de arquivos (somente SQLite)"""
+        if db.engine.dialect.name != 'sqlite':
+            return
+
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            mode = conn.execute(text('PRAGMA auto_vacuum')).scalar()
+            if mode != 2:
+                # Habilitar o modo incremental exige um VACUUM completo (uma única vez)
+                conn.execute(text('PRAGMA auto_vacuum = INCREMENTAL'))
+                conn.execute(text('VACUUM'))
+            conn.execute(text(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)})'))
+
+    def archives(self) -> List[Dict[str, Any]]:
+        return [archive.to_dict() for archive in ResultArchive.query.order_by(ResultArchive.day).all()]
+
+    def iter_archived_results(self, start_day: date, end_day: date,
+                              strategy_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Ler resultados arquivados (ex.: para backtests)
+
+        Args:
+            start_day: Primeiro dia (inclusive)
+            end_day: Último dia (inclusive)
+            strategy_id: Filtrar por estratégia (opcional)
+
+        Yields:
+            Resultados no mesmo formato de GameResult.to_dict()
+        """
+        day = start_day
+        while day <= end_day:
+            pattern = os.path.join(self.archive_dir, f"game_results-{day.isoformat()}*.ndjson.gz")
+            for path in sorted(glob.glob(pattern)):
+                with gzip.open(path, 'rb') as f:
+                    for line in f:
+                        row = loads(line)
+                        if strategy_id is None or row.get('strategy_id') == strategy_id:
+                            yield row
+            day += timedelta(days=1)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'retention_days': self.retention_days,
+            'archive_dir': self.archive_dir,
+            'interval': self.interval,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'last_run': self.last_run
+        }
+
+
+retention = RetentionService.from_env()
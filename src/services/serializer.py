@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson>=3.9 (Fragment) está em requirements.txt; sem ele usamos o json da stdlib
+    orjson = None
+
+
+class RawJSON:
+    """JSON já codificado, incluído na resposta sem ser tratado como string"""
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: Any):
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        self.raw = raw if raw else 'null'
+
+    def __repr__(self):
+        return f'RawJSON({self.raw!r})'
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, RawJSON):
+        return orjson.Fragment(obj.raw)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f'Objeto do tipo {type(obj).__name__} não é serializável em JSON')
+
+
+def _stdlib_default(obj: Any) -> Any:
+    if isinstance(obj, RawJSON):
+        return json.loads(obj.raw)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f'Objeto do tipo {type(obj).__name__} não é serializável em JSON')
+
+
+def use_orjson() -> bool:
+    """Verificar se o backend rápido está disponível e habilitado (JSON_PROVIDER)"""
+    return orjson is not None and os.environ.get('JSON_PROVIDER', 'orjson') != 'stdlib'
+
+
+def game_data_as_string() -> bool:
+    """
+    game_data dos resultados como string JSON (formato da API, padrão);
+    GAME_DATA_AS_STRING=0 devolve objetos, repassando o JSON armazenado
+    """
+    return os.environ.get('GAME_DATA_AS_STRING', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializar para bytes UTF-8 usando o backend mais rápido disponível"""
+    if use_orjson():
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_stdlib_default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    """Desserializar JSON (str ou bytes)"""
+    if use_orjson():
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Provider JSON do Flask com backend plugável (orjson quando instalado)
+
+    Entende RawJSON, de modo que payloads armazenados já como JSON
+    (ex.: GameResult.game_data) são repassados sem re-codificação.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+class RowDictCache:
+    """
+    Cache LRU de to_dict() por linha, invalidado pela coluna updated_at
+
+    Evita refazer isoformat() e cálculos de taxa de acerto para linhas
+    que não mudaram desde a última serialização.
+    """
+
+    def __init__(self, maxsize: int = 20000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, obj: Any) -> Dict[str, Any]:
+        version = getattr(obj, 'updated_at', None)
+        if version is None or obj.id is None:
+            return obj.to_dict()
+
+        key = (obj.__tablename__, obj.id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+
+        data = obj.to_dict()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return dict(data)
+
+    def invalidate(self, table: str, row_id: int):
+        with self._lock:
+            self._entries.pop((table, row_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+row_cache = RowDictCache()
+
+
+def cached_dict(obj: Any) -> Dict[str, Any]:
+    """to_dict() com cache por (tabela, id, updated_at)"""
+    return row_cache.get(obj)
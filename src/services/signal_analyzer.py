@@ -1,44 +1,76 @@
 import json
 import random
+import time as clock
 from datetime import datetime, time
 from typing import Dict, List, Any, Optional, Tuple
 import logging
-from collections import deque
+
+from src.services.tiered_history import TieredHistory
 
 logger = logging.getLogger(__name__)
 
+HISTORY_SIZE = 100  # Rodadas completas mantidas no histórico de cada jogo (além dos agregados)
+
 class SignalAnalyzer:
     """Analisador de sinais para jogos de cassino"""
     
     def __init__(self):
         self.game_history = {}  # Histórico por tipo de jogo
-        self.pattern_cache = {}  # Cache de padrões detectados
+        self.pattern_cache = {}  # Subexpressões da rodada atual por jogo: {'tick': n, 'values': {...}}
+        self.tick_ids = {}  # Rodadas analisadas por jogo (chave do pattern_cache)
+        self.last_shed = 0  # Estratégias não avaliadas na última análise (prazo esgotado)
+        self.starved = {}  # strategy_id -> rodadas seguidas descartadas pelo prazo (envelhecimento)
+        self.shared_hits = 0  # Subexpressões reaproveitadas entre estratégias
+        self.shared_evaluations = 0  # Subexpressões efetivamente calculadas
         
     def analyze_game_data(self, game_type: str, game_data: Dict[str, Any], 
-                         strategies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                         strategies: List[Dict[str, Any]],
+                         deadline: Optional[float] = None,
+                         update_history: bool = True) -> List[Dict[str, Any]]:
         """
         Analisar dados do jogo e detectar sinais baseados nas estratégias
         
         Args:
             game_type: Tipo do jogo (mines, aviator, etc)
             game_data: Dados atuais do jogo
-            strategies: Lista de estratégias ativas
+            strategies: Lista de estratégias ativas, em ordem de prioridade
+            deadline: Prazo (time.monotonic) para avaliar as estratégias; as
+                restantes são descartadas e contadas em last_shed, e passam
+                à frente na próxima rodada (as mais atrasadas primeiro)
+            update_history: False quando a rodada já foi registrada com
+                record_round (ex.: aplicada a partir do log de eventos)
             
         Returns:
             Lista de sinais detectados
         """
         signals = []
+        self.last_shed = 0
         
-        # Atualizar histórico
-        self._update_game_history(game_type, game_data)
+        # Atualizar histórico (sempre, mesmo sem prazo para avaliar)
+        if update_history:
+            self._update_game_history(game_type, game_data)
+        
+        # Nova rodada: subexpressões compartilhadas recalculadas sob demanda
+        tick = self.tick_ids[game_type] = self.tick_ids.get(game_type, 0) + 1
+        self.pattern_cache[game_type] = {'tick': tick, 'values': {}}
         
         # Analisar cada estratégia
-        for strategy in strategies:
+        strategies = self._fair_order(strategies)
+        for position, strategy in enumerate(strategies):
+            if deadline is not None and clock.monotonic() >= deadline:
+                self.last_shed = len(strategies) - position
+                for skipped in strategies[position:]:
+                    self.starved[skipped['id']] = self.starved.get(skipped['id'], 0) + 1
+                break
+            
+            if self.starved:
+                self.starved.pop(strategy['id'], None)
+            
             if not strategy.get('is_active', True):
                 continue
                 
             # Verificar horário de funcionamento
-            if not self._is_strategy_active_time(strategy):
+            if not self._is_strategy_active_time(game_type, strategy):
                 continue
             
             # Detectar padrão
@@ -48,17 +80,101 @@ class SignalAnalyzer:
         
         return signals
     
-    def _update_game_history(self, game_type: str, game_data: Dict[str, Any]):
-        """Atualizar histórico do jogo"""
-        if game_type not in self.game_history:
-            self.game_history[game_type] = deque(maxlen=100)  # Manter últimos 100 resultados
+    def _fair_order(self, strategies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ordem de avaliação: estratégias descartadas em rodadas anteriores
+        primeiro (mais rodadas sem avaliação antes), depois a prioridade
+
+        Sem isso, sob sobrecarga as mesmas estratégias do fim da lista
+        seriam descartadas sempre e nunca gerariam sinais.
+        """
+        if not self.starved:
+            return strategies
         
-        self.game_history[game_type].append({
-            'timestamp': datetime.now().isoformat(),
-            'data': game_data
-        })
+        present = {strategy['id'] for strategy in strategies}
+        if len(self.starved) > len(present):
+            self.starved = {strategy_id: ticks for strategy_id, ticks in self.starved.items() if strategy_id in present}
+        
+        starved = sorted(
+            (strategy for strategy in strategies if strategy['id'] in self.starved),
+            key=lambda strategy: -self.starved[strategy['id']]
+        )
+        if not starved:
+            return strategies
+        return starved + [strategy for strategy in strategies if strategy['id'] not in self.starved]
+    
+    def record_round(self, game_type: str, game_data: Dict[str, Any], timestamp: Optional[str] = None):
+        """Registrar uma rodada no histórico sem avaliar estratégias"""
+        self._update_game_history(game_type, game_data, timestamp)
+    
+    def _update_game_history(self, game_type: str, game_data: Dict[str, Any], timestamp: Optional[str] = None):
+        """Atualizar histórico do jogo (rodadas e agregados por minuto/hora)"""
+        self.history(game_type).append(game_data, timestamp)
+    
+    def history(self, game_type: str) -> TieredHistory:
+        """Histórico em camadas do jogo (criado vazio se ainda não existe)"""
+        history = self.game_history.get(game_type)
+        if history is None:
+            history = self.game_history[game_type] = TieredHistory(HISTORY_SIZE)
+        return history
+    
+    def export_state(self) -> Dict[str, Any]:
+        """Estado serializável do analisador (o pattern_cache vale só para uma rodada)"""
+        return {
+            'game_history': {game_type: history.export_state() for game_type, history in self.game_history.items()},
+            'tick_ids': dict(self.tick_ids)
+        }
     
-    def _is_strategy_active_time(self, strategy: Dict[str, Any]) -> bool:
+    def load_state(self, state: Dict[str, Any]):
+        """Restaurar o estado exportado por export_state"""
+        for game_type, history in state.get('game_history', {}).items():
+            self.history(game_type).load_state(history)
+        self.tick_ids.update(state.get('tick_ids', {}))
+    
+    def _shared(self, game_type: str, key: str, compute):
+        """
+        Subexpressão memorizada na rodada atual (compartilhada entre estratégias)
+        
+        As subexpressões formam um DAG (janela -> resultados/multiplicadores
+        -> contagens/correspondências): cada nó é calculado uma vez por
+        rodada e os valores devolvidos não devem ser alterados.
+        """
+        cache = self.pattern_cache.get(game_type)
+        if cache is None or cache['tick'] != self.tick_ids.get(game_type):
+            cache = self.pattern_cache[game_type] = {'tick': self.tick_ids.get(game_type), 'values': {}}
+        
+        values = cache['values']
+        if key in values:
+            self.shared_hits += 1
+            return values[key]
+        
+        self.shared_evaluations += 1
+        value = values[key] = compute()
+        return value
+    
+    def _window(self, game_type: str, size: int) -> List[Dict[str, Any]]:
+        """Últimas `size` rodadas do histórico"""
+        def compute():
+            history = self.game_history.get(game_type)
+            return history.last_rounds(size) if history is not None else []
+        return self._shared(game_type, f'window:{size}', compute)
+    
+    def _last_results(self, game_type: str, size: int) -> List[str]:
+        return self._shared(game_type, f'results:{size}', lambda: [
+            item['data'].get('result', 'unknown') for item in self._window(game_type, size)
+        ])
+    
+    def _last_multipliers(self, game_type: str, size: int) -> List[float]:
+        return self._shared(game_type, f'multipliers:{size}', lambda: [
+            float(item['data'].get('multiplier', 1.0)) for item in self._window(game_type, size)
+        ])
+    
+    def _count_below(self, game_type: str, size: int, threshold: float) -> int:
+        return self._shared(game_type, f'below:{size}:{threshold}', lambda: sum(
+            1 for multiplier in self._last_multipliers(game_type, size) if multiplier < threshold
+        ))
+    
+    def _is_strategy_active_time(self, game_type: str, strategy: Dict[str, Any]) -> bool:
         """Verificar se a estratégia está ativa no horário atual"""
         start_time = strategy.get('start_time')
         end_time = strategy.get('end_time')
@@ -67,9 +183,10 @@ class SignalAnalyzer:
             return True  # Sem restrição de horário
         
         try:
-            current_time = datetime.now().time()
-            start = time.fromisoformat(start_time)
-            end = time.fromisoformat(end_time)
+            # Hora atual e horários convertidos uma vez por rodada
+            current_time = self._shared(game_type, 'now', lambda: datetime.now().time())
+            start = self._shared(game_type, f'time:{start_time}', lambda: time.fromisoformat(start_time))
+            end = self._shared(game_type, f'time:{end_time}', lambda: time.fromisoformat(end_time))
             
             if start <= end:
                 return start <= current_time <= end
@@ -87,26 +204,26 @@ class SignalAnalyzer:
         action = strategy.get('action', '')
         
         if game_type.lower() == 'mines':
-            return self._analyze_mines_pattern(pattern, action, strategy, current_data)
+            return self._analyze_mines_pattern(game_type, pattern, action, strategy, current_data)
         elif game_type.lower() == 'aviator':
-            return self._analyze_aviator_pattern(pattern, action, strategy, current_data)
+            return self._analyze_aviator_pattern(game_type, pattern, action, strategy, current_data)
         else:
             return self._analyze_generic_pattern(pattern, action, strategy, current_data)
     
-    def _analyze_mines_pattern(self, pattern: str, action: str, strategy: Dict[str, Any], 
-                              current_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _analyze_mines_pattern(self, game_type: str, pattern: str, action: str, 
+                              strategy: Dict[str, Any], current_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Analisar padrão para o jogo Mines"""
-        history = self.game_history.get('mines', [])
+        history = self.game_history.get(game_type, [])
         
         if len(history) < 3:
             return None  # Histórico insuficiente
         
         # Exemplo de análise de padrão: "red-red-black" = apostar no vermelho
         # Simulação de detecção de padrão baseada nos últimos resultados
-        last_results = [item['data'].get('result', 'unknown') for item in list(history)[-3:]]
+        last_results = self._last_results(game_type, 3)
         
-        # Lógica simplificada de detecção de padrão
-        if self._matches_pattern(pattern, last_results):
+        # Lógica simplificada de detecção de padrão (estratégias com o mesmo padrão compartilham)
+        if self._shared(game_type, f'match:3:{pattern.lower()}', lambda: self._matches_pattern(pattern, last_results)):
             confidence = self._calculate_confidence(pattern, history)
             
             return {
@@ -125,27 +242,27 @@ class SignalAnalyzer:
         
         return None
     
-    def _analyze_aviator_pattern(self, pattern: str, action: str, strategy: Dict[str, Any], 
-                                current_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _analyze_aviator_pattern(self, game_type: str, pattern: str, action: str, 
+                                strategy: Dict[str, Any], current_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Analisar padrão para o jogo Aviator"""
-        history = self.game_history.get('aviator', [])
+        history = self.game_history.get(game_type, [])
         
         if len(history) < 5:
             return None
         
         # Análise de multiplicadores baixos consecutivos
-        last_multipliers = [float(item['data'].get('multiplier', 1.0)) for item in list(history)[-5:]]
+        last_multipliers = self._last_multipliers(game_type, 5)
         
         # Detectar sequência de multiplicadores baixos (possível sinal para multiplicador alto)
-        low_multipliers = [m for m in last_multipliers if m < 2.0]
+        low_count = self._count_below(game_type, 5, 2.0)
         
-        if len(low_multipliers) >= 3:  # 3 ou mais multiplicadores baixos consecutivos
-            confidence = min(85, 50 + len(low_multipliers) * 10)
+        if low_count >= 3:  # 3 ou mais multiplicadores baixos consecutivos
+            confidence = min(85, 50 + low_count * 10)
             
             return {
                 'strategy_id': strategy['id'],
                 'game_type': 'aviator',
-                'pattern': f"Sequência de {len(low_multipliers)} multiplicadores baixos",
+                'pattern': f"Sequência de {low_count} multiplicadores baixos",
                 'action': action,
                 'confidence': confidence,
                 'timestamp': datetime.now().isoformat(),
@@ -243,8 +360,10 @@ class SignalAnalyzer:
             return {'total_games': 0, 'recent_results': []}
         
         return {
-            'total_games': len(history),
-            'recent_results': [item['data'] for item in list(history)[-10:]],
-            'last_update': history[-1]['timestamp'] if history else None
+            'total_games': history.total_rounds,
+            'recent_results': [item['data'] for item in history.last_rounds(10)],
+            'last_update': history[-1]['timestamp'] if history else None,
+            'last_hour': history.summary(minutes=60),
+            'last_24_hours': history.summary(hours=24)
         }
 
@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.orm import joinedload
+
+from src.models.user import db
+from src.models.bot import Strategy, GameResult, GameRound
+from src.services.telegram_service import telegram_registry
+from src.services.outbox import outbox
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def signal_key(strategy_id: int, game_type: str, casino_site: Optional[str],
+               game_data: Dict[str, Any], round_id: int) -> str:
+    """
+    Chave de idempotência de um sinal
+
+    Usa o identificador da rodada informado pelo feed (round_id ou
+    timestamp) para que reenviar a mesma rodada não duplique a mensagem;
+    sem ele, usa o id da rodada gravada.
+    """
+    reference = (game_data or {}).get('round_id') or (game_data or {}).get('timestamp') or f'#{round_id}'
+    return f"{strategy_id}:{casino_site or ''}:{game_type}:{reference}"[:120]
+
+
+def dispatch_signals(game_type: str, game_data: Dict[str, Any], signals: List[Dict[str, Any]],
+                     casino_site: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Registrar sinais detectados e enfileirar as mensagens no outbox
+
+    A rodada é gravada uma única vez e compartilhada pelos resultados;
+    resultados e mensagens entram na mesma transação, e o envio ao
+    Telegram fica com o enviador do outbox (não bloqueia a análise).
+
+    Args:
+        game_type: Tipo do jogo
+        game_data: Dados da rodada que gerou os sinais
+        signals: Sinais detectados pelo analisador
+        casino_site: Cassino de origem da rodada (opcional)
+
+    Returns:
+        Lista de sinais enfileirados com o id da mensagem no outbox
+    """
+    if not signals:
+        return []
+
+    strategy_ids = {signal['strategy_id'] for signal in signals}
+    strategies = {
+        strategy.id: strategy
+        for strategy in Strategy.query.options(joinedload(Strategy.bot))
+        .filter(Strategy.id.in_(strategy_ids))
+    }
+
+    game_round = GameRound.from_game_data(game_type, game_data, casino_site)
+    db.session.add(game_round)
+    db.session.flush()
+
+    pending = []
+    for signal in signals:
+        strategy = strategies.get(signal['strategy_id'])
+        if not strategy or not strategy.bot:
+            continue
+
+        # Usar mensagem personalizada se disponível
+        if strategy.custom_message and not strategy.use_default_message:
+            message = strategy.custom_message
+        else:
+            message = None
+
+        text = telegram_registry.get(strategy.bot.telegram_token).format_signal_message(
+            game_type,
+            signal['signal_data'],
+            message
+        )
+        pending.append((strategy, signal, {
+            'idempotency_key': signal_key(strategy.id, game_type, casino_site, game_data, game_round.id),
+            'bot_id': strategy.bot_id,
+            'chat_id': strategy.bot.telegram_chat_id,
+            'text': text,
+            'digest_window': strategy.bot.digest_window
+        }))
+
+    duplicates = outbox.existing_keys(message['idempotency_key'] for _, _, message in pending)
+    pending = [item for item in pending if item[2]['idempotency_key'] not in duplicates]
+
+    # Registrar resultados (marcados como enviados quando o outbox entregar)
+    results = []
+    for strategy, signal, message in pending:
+        result = GameResult(
+            strategy_id=strategy.id,
+            round=game_round,
+            signal_sent=False,
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(result)
+        results.append(result)
+    db.session.flush()
+
+    for (_, _, message), result in zip(pending, results):
+        message['result_id'] = result.id
+    rows = outbox.enqueue([message for _, _, message in pending])
+    db.session.flush()
+
+    # total_signals é contado pelo outbox na entrega (não no enfileiramento)
+    sent_signals = []
+    for (strategy, signal, _), row in zip(pending, rows):
+        sent_signals.append({
+            'strategy_id': strategy.id,
+            'bot_id': strategy.bot_id,
+            'signal': signal,
+            'outbox_id': row.id
+        })
+
+    if not sent_signals:
+        db.session.delete(game_round)
+
+    db.session.commit()
+    if sent_signals:
+        outbox.notify()
+    return sent_signals
@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele servimos apenas gzip
+    brotli = None
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 512
+
+
+class StaticAsset:
+    """Arquivo estático carregado em memória com variantes comprimidas"""
+
+    __slots__ = ('name', 'body', 'variants', 'mimetype', 'digest', 'cache_control')
+
+    def __init__(self, name: str, body: bytes, cache_control: str = REVALIDATE_CACHE):
+        self.name = name
+        self.body = body
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.cache_control = cache_control
+        self.variants: Dict[str, bytes] = {}
+
+        if len(body) >= MIN_COMPRESS_SIZE and self.mimetype.startswith(COMPRESSIBLE_TYPES):
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = compressed
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = compressed
+
+    def hashed_name(self) -> str:
+        root, ext = os.path.splitext(self.name)
+        return f"{root}.{self.digest}{ext}"
+
+    def alias(self, name: str, cache_control: str) -> 'StaticAsset':
+        """Mesmo conteúdo publicado com outro nome, reaproveitando as variantes já comprimidas"""
+        asset = StaticAsset.__new__(StaticAsset)
+        asset.name = name
+        asset.body = self.body
+        asset.mimetype = self.mimetype
+        asset.digest = self.digest
+        asset.cache_control = cache_control
+        asset.variants = self.variants
+        return asset
+
+
+class StaticManifest:
+    """
+    Manifesto em memória da pasta estática
+
+    Construído uma única vez: cada arquivo é lido, comprimido (gzip e,
+    se disponível, brotli) e publicado também com nome versionado por
+    hash (ex.: app.3f2a9c1b7d4e.js) com cache imutável. O index.html é
+    reescrito para apontar para os nomes versionados. As requisições
+    não fazem chamadas ao sistema de arquivos; com auto_reload (fora de
+    produção) as datas dos arquivos são conferidas no máximo uma vez a
+    cada reload_interval segundos.
+    """
+
+    def __init__(self, folder: Optional[str], auto_reload: bool = False, reload_interval: float = 1.0):
+        self.folder = folder
+        self.auto_reload = auto_reload
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._assets: Dict[str, StaticAsset] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self.index: Optional[StaticAsset] = None
+        self.build()
+
+    def build(self):
+        """Ler a pasta estática e montar o manifesto"""
+        assets: Dict[str, StaticAsset] = {}
+        mtimes: Dict[str, float] = {}
+        index_body = None
+
+        if self.folder and os.path.isdir(self.folder):
+            for root, _, files in os.walk(self.folder):
+                for filename in files:
+                    full_path = os.path.join(root, filename)
+                    name = os.path.relpath(full_path, self.folder).replace(os.sep, '/')
+                    with open(full_path, 'rb') as f:
+                        body = f.read()
+                    mtimes[full_path] = os.path.getmtime(full_path)
+
+                    if name == 'index.html':
+                        index_body = body
+                        continue
+
+                    asset = StaticAsset(name, body)
+                    assets[name] = asset
+                    assets[asset.hashed_name()] = asset.alias(asset.hashed_name(), IMMUTABLE_CACHE)
+
+        index = None
+        if index_body is not None:
+            index = StaticAsset('index.html', self._rewrite_references(index_body, assets))
+            assets['index.html'] = index
+
+        with self._lock:
+            self._assets = assets
+            self._mtimes = mtimes
+            self.index = index
+            self._checked_at = time.monotonic()
+
+        logger.info(f"Manifesto estático: {len(assets)} entradas")
+
+    def _rewrite_references(self, html: bytes, assets: Dict[str, StaticAsset]) -> bytes:
+        """Trocar src="app.js" por src="/app.<hash>.js" no HTML"""
+        def replace(match):
+            name = match.group(2).decode('utf-8')
+            asset = assets.get(name)
+            if asset is None or asset.cache_control == IMMUTABLE_CACHE:
+                return match.group(0)
+            return match.group(1) + b'="/' + asset.hashed_name().encode('utf-8') + b'"'
+
+        return re.sub(rb'(src|href)="/?([^"?#:]+)"', replace, html)
+
+    def _changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = now
+
+        for path, mtime in self._mtimes.items():
+            try:
+                if os.path.getmtime(path) != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """Arquivo correspondente ao caminho ou, no fallback do SPA, o index.html"""
+        if self.auto_reload and self._changed():
+            self.build()
+        return self._assets.get(path) or self.index
+
+    def respond(self, asset: StaticAsset):
+        """Montar a resposta escolhendo a melhor codificação aceita"""
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        etag = f"{asset.digest}-{encoding}" if encoding else asset.digest
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            body = asset.variants[encoding] if encoding else asset.body
+            response = current_app.response_class(body, mimetype=asset.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = asset.cache_control
+        if asset.variants:
+            response.headers['Vary'] = 'Accept-Encoding'
+        return response
@@ -0,0 +1,173 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from src.models.bot import Bot, Strategy
+from src.models.engine import read_session
+from src.services.serializer import cached_dict
+from src.services.feed_router import FeedKey, feed_key
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sobreposição da atualização parcial: transações que gravaram updated_at
+# antes do último máximo visto, mas fizeram commit depois, ainda são lidas
+REFRESH_OVERLAP = timedelta(seconds=10)
+
+
+def strategy_priority(strategy: Dict[str, Any]) -> Tuple:
+    """
+    Chave de ordenação: maior taxa de acerto primeiro, depois mais sinais
+
+    Enquanto não há resultados registrados (wins) a ordem vem de
+    total_signals; estratégias descartadas pelo prazo não ficam sempre
+    no fim, pois o analisador as adianta na rodada seguinte.
+    """
+    return (-(strategy.get('win_rate') or 0), -(strategy.get('total_signals') or 0), strategy['id'])
+
+
+class StrategyIndex:
+    """
+    Índice em memória das estratégias ativas por (casino_site, game_type)
+
+    Evita recarregar bots e estratégias a cada rodada analisada. A
+    validade é conferida no banco por uma impressão digital barata
+    (contagem + último updated_at) no máximo a cada check_interval
+    segundos, o que mantém vários processos coerentes entre si.
+
+    As listas publicadas já vêm ordenadas por strategy_priority, para
+    que sob sobrecarga o analisador descarte as estratégias menos
+    relevantes primeiro.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._by_feed: Dict[FeedKey, Dict[int, Dict[str, Any]]] = {}
+        self._lists: Dict[FeedKey, List[Dict[str, Any]]] = {}
+        self._game_lists: Dict[str, List[Dict[str, Any]]] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self.rebuilds = 0
+        self.partial_refreshes = 0
+
+    def get(self, game_type: str, casino_site: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Estratégias ativas (de robôs ativos) de um feed
+
+        Args:
+            game_type: Tipo do jogo
+            casino_site: Cassino; se omitido, estratégias de todos os cassinos
+        """
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        if casino_site:
+            return self._lists.get(feed_key(casino_site, game_type), [])
+        return self._game_lists.get(game_type.lower(), [])
+
+    def refresh(self, force: bool = False):
+        """
+        Atualizar o índice se o banco mudou desde a última carga
+
+        Se apenas linhas de estratégias foram alteradas (ex.: contadores),
+        recarrega somente as linhas com updated_at dentro da janela de
+        sobreposição; inclusões, exclusões ou mudanças em robôs reconstroem
+        o índice inteiro. Enquanto a última alteração vista for mais recente
+        que REFRESH_OVERLAP, a janela é relida mesmo sem mudança na
+        impressão digital (um commit atrasado pode não alterar o máximo).
+        """
+        with self._lock:
+            with read_session() as session:
+                fingerprint = self._read_fingerprint(session)
+                previous = self._fingerprint
+                if force or previous is None or fingerprint[0] != previous[0] or fingerprint[2:] != previous[2:]:
+                    self._rebuild(session)
+                elif fingerprint[1] != previous[1] or self._within_overlap(previous[1]):
+                    self._refresh_updated(session, previous[1] - REFRESH_OVERLAP if previous[1] else None)
+                self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Forçar verificação na próxima consulta (após escritas locais)"""
+        self._checked_at = 0.0
+
+    def preload(self):
+        """Carregar o índice antecipadamente (ex.: antes do fork dos workers)"""
+        self.refresh(force=True)
+        logger.info(f"Índice de estratégias pré-carregado: {self.size()} estratégias")
+
+    def size(self) -> int:
+        return sum(len(items) for items in self._lists.values())
+
+    @staticmethod
+    def _within_overlap(since: Optional[datetime]) -> bool:
+        return since is not None and datetime.utcnow() - since < REFRESH_OVERLAP
+
+    def _read_fingerprint(self, session) -> Tuple:
+        strategies = session.query(func.count(Strategy.id), func.max(Strategy.updated_at)).one()
+        bots = session.query(func.count(Bot.id), func.max(Bot.updated_at)).one()
+        return tuple(strategies) + tuple(bots)
+
+    def _rebuild(self, session):
+        rows = session.query(Strategy, Bot.casino_site, Bot.game_type).join(Bot).filter(
+            Bot.is_active == True,
+            Strategy.is_active == True
+        ).all()
+
+        by_feed: Dict[FeedKey, Dict[int, Dict[str, Any]]] = {}
+        for strategy, casino_site, game_type in rows:
+            by_feed.setdefault(feed_key(casino_site, game_type), {})[strategy.id] = cached_dict(strategy)
+
+        self._by_feed = by_feed
+        self._publish(by_feed.keys(), reset=True)
+        self.rebuilds += 1
+
+    def _publish(self, keys, reset: bool = False):
+        """
+        Atualizar as listas prontas dos feeds alterados (e de seus jogos)
+
+        Os dicionários novos são montados à parte e trocados em uma única
+        atribuição cada: leitores sem a trava nunca veem listas vazias ou
+        pela metade durante a reconstrução.
+        """
+        lists = {} if reset else dict(self._lists)
+        game_lists = {} if reset else dict(self._game_lists)
+
+        games = set()
+        for key in keys:
+            lists[key] = sorted(self._by_feed.get(key, {}).values(), key=strategy_priority)
+            games.add(key[1])
+        for game_type in games:
+            game_lists[game_type] = sorted((
+                strategy
+                for key, items in self._by_feed.items() if key[1] == game_type
+                for strategy in items.values()
+            ), key=strategy_priority)
+
+        self._lists = lists
+        self._game_lists = game_lists
+
+    def _refresh_updated(self, session, since):
+        rows = session.query(Strategy, Bot.casino_site, Bot.game_type, Bot.is_active).join(Bot).filter(
+            Strategy.updated_at > since
+        ).all() if since is not None else []
+
+        touched = set()
+        for strategy, casino_site, game_type, bot_active in rows:
+            for key, items in self._by_feed.items():
+                if items.pop(strategy.id, None) is not None:
+                    touched.add(key)
+            if strategy.is_active and bot_active:
+                key = feed_key(casino_site, game_type)
+                self._by_feed.setdefault(key, {})[strategy.id] = cached_dict(strategy)
+                touched.add(key)
+
+        self._publish(touched)
+        self.partial_refreshes += 1
+
+
+strategy_index = StrategyIndex()
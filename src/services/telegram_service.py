@@ -1,16 +1,51 @@
-import requests
 import json
-from typing import Optional, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Limite de caracteres de uma mensagem do Telegram
+MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+_requests = None
+_session = None
+_session_lock = threading.Lock()
+
+def load_requests():
+    """Importar requests sob demanda (fora do caminho de inicialização)"""
+    global _requests
+    if _requests is None:
+        import requests
+        _requests = requests
+    return _requests
+
+def shared_session():
+    """Sessão HTTP compartilhada (keep-alive com api.telegram.org entre envios)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                requests = load_requests()
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
 class TelegramService:
     """Serviço para envio de mensagens via Telegram Bot API"""
     
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, session=None):
         self.bot_token = bot_token
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.session = session
+    
+    def _http(self):
+        return self.session if self.session is not None else shared_session()
     
     def send_message(self, chat_id: str, text: str, parse_mode: str = "HTML") -> Dict[str, Any]:
         """
@@ -32,8 +67,10 @@ class TelegramService:
             "parse_mode": parse_mode
         }
         
+        requests = load_requests()
+        
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._http().post(url, json=payload, timeout=10)
             response.raise_for_status()
             
             result = response.json()
@@ -45,10 +82,7 @@ class TelegramService:
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Erro ao enviar mensagem para chat {chat_id}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            return self._request_error(e)
         except Exception as e:
             logger.error(f"Erro inesperado ao enviar mensagem: {str(e)}")
             return {
@@ -70,12 +104,38 @@ class TelegramService:
         Returns:
             Dict com resposta do envio
         """
+        return self.send_message(chat_id, self.format_signal_message(game_type, signal_data, custom_message))
+    
+    def format_signal_message(self, game_type: str, signal_data: Dict[str, Any],
+                              custom_message: Optional[str] = None) -> str:
+        """Texto da mensagem de sinal (personalizada ou padrão do jogo)"""
         if custom_message:
-            message = custom_message
-        else:
-            message = self._format_default_message(game_type, signal_data)
-        
-        return self.send_message(chat_id, message)
+            return custom_message
+        return self._format_default_message(game_type, signal_data)
+    
+    def format_digest_message(self, texts: List[str]) -> str:
+        """Resumo com vários sinais do mesmo chat em uma única mensagem"""
+        if len(texts) == 1:
+            return texts[0]
+        header = f"📦 <b>{len(texts)} SINAIS</b> 📦"
+        return DIGEST_SEPARATOR.join([header] + list(texts))
+    
+    def _request_error(self, error) -> Dict[str, Any]:
+        """Resultado de falha com o status HTTP e o retry_after do Telegram, se houver"""
+        result = {
+            "success": False,
+            "error": str(error)
+        }
+        response = getattr(error, 'response', None)
+        if response is not None:
+            result["status_code"] = response.status_code
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after')
+            except ValueError:
+                retry_after = None
+            if retry_after:
+                result["retry_after"] = retry_after
+        return result
     
     def _format_default_message(self, game_type: str, signal_data: Dict[str, Any]) -> str:
         """
@@ -174,8 +234,10 @@ class TelegramService:
         """
         url = f"{self.base_url}/getMe"
         
+        requests = load_requests()
+        
         try:
-            response = requests.get(url, timeout=10)
+            response = self._http().get(url, timeout=10)
             response.raise_for_status()
             
             result = response.json()
@@ -186,14 +248,154 @@ class TelegramService:
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Erro ao obter informações do bot: {str(e)}")
+            return self._request_error(e)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao obter informações do bot: {str(e)}")
             return {
                 "success": False,
                 "error": str(e)
             }
+    
+    def get_chat(self, chat_id: str) -> Dict[str, Any]:
+        """
+        Obter informações de um chat (valida se o bot tem acesso a ele)
+        
+        Args:
+            chat_id: ID do chat ou canal
+            
+        Returns:
+            Dict com informações do chat
+        """
+        url = f"{self.base_url}/getChat"
+        
+        requests = load_requests()
+        
+        try:
+            response = self._http().get(url, params={"chat_id": chat_id}, timeout=10)
+            response.raise_for_status()
+            
+            return {
+                "success": True,
+                "data": response.json()
+            }
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao validar chat {chat_id}: {str(e)}")
+            return self._request_error(e)
         except Exception as e:
-            logger.error(f"Erro inesperado ao obter informações do bot: {str(e)}")
+            logger.error(f"Erro inesperado ao validar chat: {str(e)}")
             return {
                 "success": False,
                 "error": str(e)
             }
 
+class TelegramRegistry:
+    """
+    Clientes do Telegram reaproveitados por token
+    
+    Um TelegramService por token (LRU limitado a max_clients), todos com
+    a sessão HTTP compartilhada, e cache dos resultados de getMe e
+    getChat: LRU limitado a max_lookups entradas, com TTL para descartar
+    respostas velhas. Falhas ficam em cache por menos tempo (failure_ttl)
+    para não martelar a API com um token inválido, sem prender um erro
+    transitório por muito tempo.
+    """
+    
+    def __init__(self, max_clients: int = 1024, ttl: float = 300.0, failure_ttl: float = 30.0,
+                 max_lookups: int = 2048):
+        self.max_clients = max_clients
+        self.max_lookups = max_lookups
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[str, TelegramService]" = OrderedDict()
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, bot_token: str) -> TelegramService:
+        """Cliente do token (criado na primeira vez)"""
+        with self._lock:
+            client = self._clients.get(bot_token)
+            if client is not None:
+                self._clients.move_to_end(bot_token)
+                return client
+            client = self._clients[bot_token] = TelegramService(bot_token)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return client
+    
+    def get_bot_info(self, bot_token: str) -> Dict[str, Any]:
+        """getMe com cache (valida o token)"""
+        return self._cached(('me', bot_token), lambda: self.get(bot_token).get_bot_info())
+    
+    def validate_chat(self, bot_token: str, chat_id: str) -> Dict[str, Any]:
+        """getChat com cache (valida se o bot acessa o chat)"""
+        return self._cached(('chat', bot_token, str(chat_id)), lambda: self.get(bot_token).get_chat(chat_id))
+    
+    def validate(self, bot_token: str, chat_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Validar token e, opcionalmente, o chat
+        
+        Returns:
+            Dict com success, bot (getMe) e chat (getChat), ou o erro
+        """
+        bot_info = self.get_bot_info(bot_token)
+        if not bot_info['success']:
+            return {
+                "success": False,
+                "error": f"Token do Telegram inválido: {bot_info.get('error')}"
+            }
+        
+        result = {"success": True, "bot": bot_info['data'].get('result')}
+        if chat_id is not None:
+            chat = self.validate_chat(bot_token, chat_id)
+            if not chat['success']:
+                return {
+                    "success": False,
+                    "error": f"Chat do Telegram inválido: {chat.get('error')}"
+                }
+            result["chat"] = chat['data'].get('result')
+        return result
+    
+    def forget(self, bot_token: str):
+        """Descartar cliente e cache de um token (ex.: token alterado)"""
+        with self._lock:
+            self._clients.pop(bot_token, None)
+            for key in [key for key in self._cache if key[1] == bot_token]:
+                del self._cache[key]
+    
+    def _cached(self, key: Tuple, fetch) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._cache[key]  # Vencida: consultar de novo
+            self.misses += 1
+        
+        result = fetch()
+        ttl = self.ttl if result.get('success') else self.failure_ttl
+        with self._lock:
+            self._cache[key] = (now + ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_lookups:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'clients': len(self._clients),
+            'cached_lookups': len(self._cache),
+            'max_lookups': self.max_lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+telegram_registry = TelegramRegistry()
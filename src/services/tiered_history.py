@@ -0,0 +1,263 @@
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+# Capacidade das camadas agregadas (buckets por jogo, memória fixa)
+HISTORY_MINUTES = int(os.environ.get('HISTORY_MINUTES', 360))  # 6 horas por minuto
+HISTORY_HOURS = int(os.environ.get('HISTORY_HOURS', 168))  # 7 dias por hora
+
+# Multiplicador abaixo do qual a rodada conta como "baixa" (mesmo limite da análise do aviator)
+LOW_MULTIPLIER = 2.0
+
+
+class Bucket:
+    """Agregado de um minuto ou de uma hora (tamanho fixo, sem guardar as rodadas)"""
+
+    __slots__ = ('start', 'rounds', 'multipliers', 'multiplier_sum', 'multiplier_min',
+                 'multiplier_max', 'low', 'results')
+
+    def __init__(self, start: int):
+        self.start = start  # Início do período (minutos desde a época)
+        self.rounds = 0
+        self.multipliers = 0
+        self.multiplier_sum = 0.0
+        self.multiplier_min: Optional[float] = None
+        self.multiplier_max: Optional[float] = None
+        self.low = 0
+        self.results: Dict[str, int] = {}
+
+    def add(self, game_data: Dict[str, Any]):
+        self.rounds += 1
+
+        multiplier = game_data.get('multiplier')
+        if multiplier is not None:
+            try:
+                multiplier = float(multiplier)
+            except (TypeError, ValueError):
+                multiplier = None
+        if multiplier is not None:
+            self.multipliers += 1
+            self.multiplier_sum += multiplier
+            self.multiplier_min = multiplier if self.multiplier_min is None else min(self.multiplier_min, multiplier)
+            self.multiplier_max = multiplier if self.multiplier_max is None else max(self.multiplier_max, multiplier)
+            if multiplier < LOW_MULTIPLIER:
+                self.low += 1
+
+        result = game_data.get('result')
+        if result is not None:
+            result = str(result)
+            self.results[result] = self.results.get(result, 0) + 1
+
+    def to_list(self) -> list:
+        return [self.start, self.rounds, self.multipliers, self.multiplier_sum,
+                self.multiplier_min, self.multiplier_max, self.low, self.results]
+
+    @classmethod
+    def from_list(cls, values: list) -> 'Bucket':
+        bucket = cls(values[0])
+        (bucket.rounds, bucket.multipliers, bucket.multiplier_sum, bucket.multiplier_min,
+         bucket.multiplier_max, bucket.low, bucket.results) = values[1:]
+        return bucket
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'start': _isoformat(self.start),
+            'rounds': self.rounds,
+            'avg_multiplier': round(self.multiplier_sum / self.multipliers, 2) if self.multipliers else None,
+            'min_multiplier': self.multiplier_min,
+            'max_multiplier': self.multiplier_max,
+            'low_multipliers': self.low,
+            'results': dict(self.results)
+        }
+
+
+def _isoformat(minute: int) -> str:
+    return datetime.fromtimestamp(minute * 60, timezone.utc).isoformat()
+
+
+def _minute_of(timestamp: Optional[str]) -> int:
+    """
+    Minuto (desde a época) do timestamp ISO da rodada; agora se ausente/inválido
+
+    Timestamps sem fuso são UTC (utcnow do banco), nunca hora local.
+    """
+    if timestamp:
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp() // 60)
+        except (TypeError, ValueError):
+            pass
+    return int(time.time() // 60)
+
+
+class TieredHistory:
+    """
+    Histórico de um jogo em camadas, com memória fixa
+
+    - rodadas: as últimas `size` rodadas completas (as estratégias usam esta camada)
+    - minutos: agregados por minuto das últimas `minutes` janelas
+    - horas: agregados por hora das últimas `hours` janelas
+
+    Cada rodada entra nas três camadas ao ser registrada (O(1)) e as mais
+    antigas saem sozinhas pelos limites das deques, então a memória não
+    cresce com o volume de rodadas. As consultas por período percorrem
+    no máximo a capacidade da camada, independentemente de quantas
+    rodadas houve. Rodadas fora de ordem entram no agregado mais recente
+    que não seja posterior a elas (ficam fora dos agregados se forem
+    anteriores a todos).
+
+    Também se comporta como a deque de rodadas (len, iteração, índice),
+    que era o formato anterior do histórico.
+    """
+
+    def __init__(self, size: int, minutes: int = HISTORY_MINUTES, hours: int = HISTORY_HOURS):
+        self.rounds: deque = deque(maxlen=size)
+        self.minutes: deque = deque(maxlen=max(1, minutes))
+        self.hours: deque = deque(maxlen=max(1, hours))
+        self.total_rounds = 0
+
+    def append(self, game_data: Dict[str, Any], timestamp: Optional[str] = None):
+        """Registrar uma rodada nas três camadas"""
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).isoformat()
+        self.rounds.append({'timestamp': timestamp, 'data': game_data})
+        self.total_rounds += 1
+
+        minute = _minute_of(timestamp)
+        self._aggregate(self.minutes, minute, game_data)
+        self._aggregate(self.hours, minute - minute % 60, game_data)
+
+    @staticmethod
+    def _aggregate(tier: deque, start: int, game_data: Dict[str, Any]):
+        if not tier or tier[-1].start < start:
+            tier.append(Bucket(start))
+            tier[-1].add(game_data)
+            return
+
+        for bucket in reversed(tier):
+            if bucket.start <= start:
+                bucket.add(game_data)
+                return
+
+    # Consultas
+
+    def last_rounds(self, count: int) -> List[Dict[str, Any]]:
+        """Últimas `count` rodadas completas, em ordem cronológica"""
+        if count <= 0:
+            return []
+        rounds = []
+        for item in reversed(self.rounds):
+            if len(rounds) >= count:
+                break
+            rounds.append(item)
+        rounds.reverse()
+        return rounds
+
+    def _window(self, minutes: Optional[int], hours: Optional[int], now: Optional[float]):
+        """Camada e minuto inicial da janela que termina no período atual do relógio"""
+        current = int((time.time() if now is None else now) // 60)
+        if minutes is not None:
+            return self.minutes, current + 1 - minutes
+        if hours is not None:
+            return self.hours, current - current % 60 + 60 - hours * 60
+        raise ValueError('Informe minutes ou hours')
+
+    def buckets(self, minutes: Optional[int] = None, hours: Optional[int] = None,
+                now: Optional[float] = None) -> List[Bucket]:
+        """
+        Agregados dos últimos `minutes` minutos ou `hours` horas até agora
+
+        A janela é ancorada no relógio (ou em `now`, segundos desde a
+        época), não na última rodada: um feed parado fica com a janela vazia.
+        """
+        tier, cutoff = self._window(minutes, hours, now)
+        if (minutes if minutes is not None else hours) <= 0:
+            return []
+        selected = []
+        for bucket in reversed(tier):
+            if bucket.start < cutoff:
+                break
+            selected.append(bucket)
+        selected.reverse()
+        return selected
+
+    def summary(self, minutes: Optional[int] = None, hours: Optional[int] = None,
+                now: Optional[float] = None) -> Dict[str, Any]:
+        """Totais do período até agora (rodadas, multiplicadores e resultados)"""
+        buckets = self.buckets(minutes=minutes, hours=hours, now=now)
+        start = self._window(minutes, hours, now)[1]
+        rounds = sum(bucket.rounds for bucket in buckets)
+        multipliers = sum(bucket.multipliers for bucket in buckets)
+        minimums = [bucket.multiplier_min for bucket in buckets if bucket.multiplier_min is not None]
+        maximums = [bucket.multiplier_max for bucket in buckets if bucket.multiplier_max is not None]
+        low = sum(bucket.low for bucket in buckets)
+
+        results: Dict[str, int] = {}
+        for bucket in buckets:
+            for result, count in bucket.results.items():
+                results[result] = results.get(result, 0) + count
+
+        return {
+            'tier': 'minute' if minutes is not None else 'hour',
+            'from': _isoformat(start),
+            'rounds': rounds,
+            'avg_multiplier': round(sum(bucket.multiplier_sum for bucket in buckets) / multipliers, 2)
+            if multipliers else None,
+            'min_multiplier': min(minimums) if minimums else None,
+            'max_multiplier': max(maximums) if maximums else None,
+            'low_multiplier_rate': round(low / multipliers * 100, 2) if multipliers else 0,
+            'results': results
+        }
+
+    def capacity(self) -> Dict[str, int]:
+        return {
+            'rounds': self.rounds.maxlen,
+            'minutes': self.minutes.maxlen,
+            'hours': self.hours.maxlen
+        }
+
+    # Estado (checkpoint)
+
+    def export_state(self) -> Dict[str, Any]:
+        return {
+            'rounds': list(self.rounds),
+            'minutes': [bucket.to_list() for bucket in self.minutes],
+            'hours': [bucket.to_list() for bucket in self.hours],
+            'total_rounds': self.total_rounds
+        }
+
+    def load_state(self, state):
+        """Restaurar export_state (ou a lista de rodadas do formato antigo)"""
+        self.rounds.clear()
+        self.minutes.clear()
+        self.hours.clear()
+        self.total_rounds = 0
+
+        if isinstance(state, list):
+            # Checkpoint anterior às camadas: reconstruir os agregados pelas rodadas
+            for item in state:
+                self.append(item.get('data', {}), item.get('timestamp'))
+            return
+
+        self.rounds.extend(state.get('rounds', []))
+        self.minutes.extend(Bucket.from_list(values) for values in state.get('minutes', []))
+        self.hours.extend(Bucket.from_list(values) for values in state.get('hours', []))
+        self.total_rounds = state.get('total_rounds', len(self.rounds))
+
+    # Interface de deque (rodadas completas)
+
+    def __len__(self) -> int:
+        return len(self.rounds)
+
+    def __iter__(self):
+        return iter(self.rounds)
+
+    def __reversed__(self):
+        return reversed(self.rounds)
+
+    def __getitem__(self, index):
+        return self.rounds[index]
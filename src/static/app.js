@@ -4,7 +4,8 @@ const API_BASE = '/api';
 // Estado global da aplicação
 let appState = {
     bots: [],
-    strategies: [],
+    overview: [],  // Robôs com totais das estratégias (/bots/overview)
+    strategiesByBot: {},  // Estratégias dos robôs expandidos, por id do robô
     signals: [],
     stats: {
         totalBots: 0,
@@ -26,9 +27,8 @@ function initializeApp() {
     document.getElementById('createBotForm').addEventListener('submit', handleCreateBot);
     document.getElementById('createStrategyForm').addEventListener('submit', handleCreateStrategy);
     
-    // Carregar dados iniciais
+    // Carregar dados iniciais (o dashboard carrega o resumo por robô)
     loadBots();
-    loadStrategies();
 }
 
 // Navegação entre abas
@@ -85,12 +85,8 @@ function hideModal(modalId) {
 // Carregar dados do dashboard
 async function loadDashboardData() {
     try {
-        // Carregar estatísticas
-        await Promise.all([
-            loadBots(),
-            loadStrategies(),
-            updateStats()
-        ]);
+        // Estatísticas a partir do resumo agregado (uma requisição para todos os robôs)
+        await loadOverview();
         
         // Atualizar atividade recente
         updateRecentActivity();
@@ -101,6 +97,19 @@ async function loadDashboardData() {
     }
 }
 
+// Carregar resumo dos robôs com os totais das estratégias
+async function loadOverview() {
+    const response = await fetch(`${API_BASE}/bots/overview`);
+    const data = await response.json();
+    
+    if (!data.success) {
+        throw new Error(data.error);
+    }
+    
+    appState.overview = data.data;
+    updateStats();
+}
+
 // Carregar robôs
 async function loadBots() {
     try {
@@ -112,7 +121,6 @@ async function loadBots() {
         if (data.success) {
             appState.bots = data.data;
             renderBots();
-            updateStats();
         } else {
             throw new Error(data.error);
         }
@@ -178,27 +186,15 @@ function renderBots() {
     container.innerHTML = html;
 }
 
-// Carregar estratégias
+// Carregar estratégias: totais por robô; as estratégias de um robô só ao expandi-lo
 async function loadStrategies() {
     try {
         showLoading('strategiesList');
         
-        // Como não temos endpoint específico para todas as estratégias,
-        // vamos carregar as estratégias de cada bot
-        const strategies = [];
-        
-        for (const bot of appState.bots) {
-            const response = await fetch(`${API_BASE}/bots/${bot.id}/strategies`);
-            const data = await response.json();
-            
-            if (data.success) {
-                strategies.push(...data.data.map(s => ({...s, bot_name: bot.name})));
-            }
-        }
-        
-        appState.strategies = strategies;
+        await loadOverview();
+        // Recarregar apenas os robôs que já estão expandidos
+        await Promise.all(Object.keys(appState.strategiesByBot).map(botId => fetchBotStrategies(Number(botId))));
         renderStrategies();
-        updateStats();
         
     } catch (error) {
         console.error('Erro ao carregar estratégias:', error);
@@ -208,11 +204,41 @@ async function loadStrategies() {
     }
 }
 
-// Renderizar lista de estratégias
+// Estratégias de um robô, apenas com as colunas exibidas
+async function fetchBotStrategies(botId) {
+    const fields = 'id,name,bot_id,pattern,is_active,total_signals,wins,win_rate';
+    const response = await fetch(`${API_BASE}/bots/${botId}/strategies?fields=${fields}`);
+    const data = await response.json();
+    
+    if (!data.success) {
+        throw new Error(data.error);
+    }
+    
+    appState.strategiesByBot[botId] = data.data;
+}
+
+// Expandir/recolher as estratégias de um robô
+async function toggleBotStrategies(botId) {
+    if (appState.strategiesByBot[botId]) {
+        delete appState.strategiesByBot[botId];
+    } else {
+        try {
+            await fetchBotStrategies(botId);
+        } catch (error) {
+            console.error('Erro ao carregar estratégias:', error);
+            showAlert('Erro ao carregar estratégias: ' + error.message, 'error');
+            return;
+        }
+    }
+    renderStrategies();
+}
+
+// Renderizar lista de estratégias (agrupada por robô)
 function renderStrategies() {
     const container = document.getElementById('strategiesList');
+    const bots = appState.overview.filter(bot => bot.strategies > 0);
     
-    if (appState.strategies.length === 0) {
+    if (bots.length === 0) {
         container.innerHTML = '<p>Nenhuma estratégia cadastrada ainda.</p>';
         return;
     }
@@ -231,10 +257,39 @@ function renderStrategies() {
                 </tr>
             </thead>
             <tbody>
-                ${appState.strategies.map(strategy => `
+                ${bots.map(bot => `
+                    <tr>
+                        <td colspan="3">
+                            <strong>${bot.name}</strong>
+                            (${bot.active_strategies} de ${bot.strategies} estratégias ativas)
+                        </td>
+                        <td>${bot.win_rate}%</td>
+                        <td>${bot.total_signals}</td>
+                        <td>
+                            <span class="status-badge ${bot.is_active ? 'status-active' : 'status-inactive'}">
+                                ${bot.is_active ? 'Ativo' : 'Inativo'}
+                            </span>
+                        </td>
+                        <td>
+                            <button class="btn btn-info" onclick="toggleBotStrategies(${bot.id})">
+                                <i class="fas fa-list"></i> ${appState.strategiesByBot[bot.id] ? 'Ocultar' : 'Ver estratégias'}
+                            </button>
+                        </td>
+                    </tr>
+                    ${(appState.strategiesByBot[bot.id] || []).map(strategy => renderStrategyRow(strategy, bot)).join('')}
+                `).join('')}
+            </tbody>
+        </table>
+    `;
+    
+    container.innerHTML = html;
+}
+
+function renderStrategyRow(strategy, bot) {
+    return `
                     <tr>
                         <td><strong>${strategy.name}</strong></td>
-                        <td>${strategy.bot_name}</td>
+                        <td>${bot.name}</td>
                         <td>${strategy.pattern}</td>
                         <td>${strategy.win_rate}%</td>
                         <td>${strategy.total_signals}</td>
@@ -252,12 +307,7 @@ function renderStrategies() {
                             </button>
                         </td>
                     </tr>
-                `).join('')}
-            </tbody>
-        </table>
     `;
-    
-    container.innerHTML = html;
 }
 
 // Carregar sinais
@@ -311,6 +361,7 @@ async function handleCreateBot(event) {
             showAlert('Robô criado com sucesso!', 'success');
             hideModal('createBotModal');
             loadBots();
+            loadOverview();
         } else {
             throw new Error(data.error);
         }
@@ -486,7 +537,9 @@ async function deleteBot(botId) {
         
         if (data.success) {
             showAlert('Robô deletado com sucesso!', 'success');
+            delete appState.strategiesByBot[botId];
             loadBots();
+            loadOverview();
         } else {
             throw new Error(data.error);
         }
@@ -499,10 +552,10 @@ async function deleteBot(botId) {
 
 // Atualizar estatísticas
 function updateStats() {
-    const activeBots = appState.bots.filter(bot => bot.is_active).length;
-    const activeStrategies = appState.strategies.filter(s => s.is_active).length;
-    const totalSignals = appState.strategies.reduce((sum, s) => sum + s.total_signals, 0);
-    const totalWins = appState.strategies.reduce((sum, s) => sum + s.wins, 0);
+    const activeBots = appState.overview.filter(bot => bot.is_active).length;
+    const activeStrategies = appState.overview.reduce((sum, bot) => sum + bot.active_strategies, 0);
+    const totalSignals = appState.overview.reduce((sum, bot) => sum + bot.total_signals, 0);
+    const totalWins = appState.overview.reduce((sum, bot) => sum + bot.wins, 0);
     const winRate = totalSignals > 0 ? Math.round((totalWins / totalSignals) * 100) : 0;
     
     document.getElementById('totalBots').textContent = activeBots;
@@ -517,8 +570,8 @@ function updateRecentActivity() {
     
     const activities = [
         'Sistema iniciado com sucesso',
-        `${appState.bots.length} robôs carregados`,
-        `${appState.strategies.length} estratégias ativas`,
+        `${appState.overview.length} robôs carregados`,
+        `${appState.overview.reduce((sum, bot) => sum + bot.active_strategies, 0)} estratégias ativas`,
         'Monitoramento em tempo real ativo'
     ];
     
@@ -0,0 +1,138 @@
+"""
+Microbenchmarks dos caminhos quentes (pytest-benchmark)
+
+Rodar e comparar com a linha de base gravada em tests/benchmarks/baselines:
+
+    pip install -r requirements-dev.txt
+    pytest --benchmark-compare=0001 --benchmark-compare-fail=mean:20%
+
+Gravar uma nova linha de base (após uma mudança intencional de desempenho):
+
+    pytest --benchmark-save=baseline
+
+As linhas de base dependem da máquina; compare sempre no mesmo ambiente.
+"""
+import json
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Sem log de rodadas nem checkpoint em disco durante os benchmarks
+os.environ.setdefault('EVENT_LOG', '0')
+os.environ.setdefault('CHECKPOINT_INTERVAL', '0')
+
+import pytest
+
+from src.main import create_app, ensure_schema
+from src.models.user import db
+from src.models.bot import Bot, Strategy
+from src.services.signal_analyzer import SignalAnalyzer, HISTORY_SIZE
+from src.services.strategy_index import strategy_index
+
+STRATEGY_COUNTS = (10, 100, 1000, 10000)
+PATTERNS = ('red-red-black', 'black-black-red', 'green-red-black', 'red-black-red')
+MINES_TAIL = ('red', 'red', 'black')
+AVIATOR_TAIL = (1.2, 3.5, 1.5, 1.1, 1.8)
+
+
+def make_strategies(count, game_type='mines', schedule=True):
+    """Estratégias no formato do índice (dicts), com e sem horário"""
+    return [
+        {
+            'id': index + 1,
+            'bot_id': 1,
+            'name': f'Estratégia {index}',
+            'pattern': PATTERNS[index % len(PATTERNS)],
+            'action': 'bet_red',
+            'start_time': '00:00' if schedule and index % 2 else None,
+            'end_time': '23:59' if schedule and index % 2 else None,
+            'is_active': True
+        }
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def analyzer():
+    """Analisador com o histórico cheio para mines e aviator (dados determinísticos)"""
+    random.seed(42)
+    analyzer = SignalAnalyzer()
+    for game_type in ('mines', 'aviator'):
+        for _ in range(HISTORY_SIZE):
+            analyzer.record_round(game_type, analyzer.simulate_game_data(game_type))
+    # Final conhecido, para que as duas análises gerem sinais: red-red-black no mines
+    # e 4 multiplicadores baixos nas últimas 5 rodadas do aviator
+    for result in MINES_TAIL:
+        analyzer.record_round('mines', {'result': result, 'multiplier': 2.0})
+    for multiplier in AVIATOR_TAIL:
+        analyzer.record_round('aviator', {'multiplier': multiplier, 'crashed': True})
+    return analyzer
+
+
+class _TelegramHandler(BaseHTTPRequestHandler):
+    """Responde como a Bot API (sendMessage/getMe) sem sair da máquina"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self._reply({'ok': True, 'result': {'message_id': 1}})
+
+    def do_GET(self):
+        self._reply({'ok': True, 'result': {'id': 1, 'username': 'bench_bot'}})
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='session')
+def fake_telegram():
+    """URL base de um servidor HTTP local que imita a API do Telegram"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _TelegramHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='module')
+def app():
+    """Aplicação com SQLite em memória e sem threads de background"""
+    app = create_app('sqlite://')
+    app.config['TESTING'] = True
+    ensure_schema(app)
+    app.extensions['roasbot']['services_pid'] = os.getpid()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+    strategy_index.invalidate()
+
+
+@pytest.fixture(scope='module')
+def seeded(app):
+    """100 robôs com 50 estratégias cada (5.000 linhas de estratégia)"""
+    bots = [
+        Bot(name=f'Robô {index}', game_type='mines', casino_site=f'casino{index % 5}',
+            telegram_token=f'{index}:token', telegram_chat_id=str(1000 + index))
+        for index in range(100)
+    ]
+    db.session.add_all(bots)
+    db.session.flush()
+    db.session.add_all(
+        Strategy(bot_id=bot.id, name=f'Estratégia {index}', pattern=PATTERNS[index % len(PATTERNS)],
+                 action='bet_red', total_signals=index * 3, wins=index * 2, losses=index)
+        for bot in bots for index in range(50)
+    )
+    db.session.commit()
+    strategy_index.invalidate()
+    return bots
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.fixture(scope='module')
+def client(app, seeded):
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', [
+    '/api/bots',
+    '/api/bots?view=summary',
+    '/api/bots/overview',
+    '/api/bots/1/strategies',
+    '/api/bots/1/strategies?fields=id,name,win_rate'
+])
+def test_listing(benchmark, client, path):
+    response = benchmark(client.get, path)
+    assert response.status_code == 200
+
+
+def test_analyze(benchmark, client):
+    payload = {
+        'game_type': 'mines',
+        'casino_site': 'casino1',
+        'game_data': {'result': 'red', 'multiplier': 1.5}
+    }
+    response = benchmark(client.post, '/api/signals/analyze', json=payload)
+    assert response.status_code == 200
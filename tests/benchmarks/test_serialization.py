@@ -0,0 +1,29 @@
+import pytest
+
+from src.models.bot import Bot, Strategy
+from src.services.serializer import dumps_bytes
+
+
+@pytest.fixture(scope='module')
+def strategies(seeded):
+    return Strategy.query.order_by(Strategy.id).all()
+
+
+@pytest.fixture(scope='module')
+def bots(seeded):
+    return Bot.query.order_by(Bot.id).all()
+
+
+def test_strategy_to_dict(benchmark, strategies):
+    rows = benchmark(lambda: [strategy.to_dict() for strategy in strategies])
+    assert len(rows) == 5000
+
+
+def test_bot_to_dict(benchmark, bots):
+    rows = benchmark(lambda: [bot.to_dict() for bot in bots])
+    assert len(rows) == 100
+
+
+def test_strategy_listing_json(benchmark, strategies):
+    body = benchmark(lambda: dumps_bytes({'success': True, 'data': [strategy.to_dict() for strategy in strategies]}))
+    assert body.startswith(b'{')
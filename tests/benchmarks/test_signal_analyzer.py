@@ -0,0 +1,49 @@
+import pytest
+
+from tests.benchmarks.conftest import STRATEGY_COUNTS, MINES_TAIL, AVIATOR_TAIL, make_strategies
+
+
+@pytest.mark.parametrize('game_type', ['mines', 'aviator', 'crash'])
+@pytest.mark.parametrize('count', STRATEGY_COUNTS)
+def test_analyze_game_data(benchmark, analyzer, game_type, count):
+    strategies = make_strategies(count, game_type)
+    game_data = analyzer.simulate_game_data(game_type)
+
+    signals = benchmark(analyzer.analyze_game_data, game_type, game_data, strategies, update_history=False)
+
+    if game_type == 'mines':
+        # Só as estratégias cujo padrão casa com o final do histórico
+        expected = {strategy['id'] for strategy in strategies if strategy['pattern'] == '-'.join(MINES_TAIL)}
+        assert all(signal['signal_data']['last_results'] == list(MINES_TAIL) for signal in signals)
+    elif game_type == 'aviator':
+        # O aviator ignora o padrão: todas sinalizam a sequência de baixos
+        expected = {strategy['id'] for strategy in strategies}
+        assert all(signal['signal_data']['last_multipliers'] == list(AVIATOR_TAIL) for signal in signals)
+        assert all(signal['confidence'] == 85 for signal in signals)
+    else:
+        expected = {strategy['id'] for strategy in strategies}
+    assert len(signals) == len(expected)
+    assert {signal['strategy_id'] for signal in signals} == expected
+
+
+def test_matches_pattern(benchmark, analyzer):
+    results = ['red', 'red', 'black']
+
+    def run():
+        for pattern in ('red-red-black', 'black-red-red', 'red-red', 'green-red-black'):
+            analyzer._matches_pattern(pattern, results)
+
+    benchmark(run)
+    assert analyzer._matches_pattern('red-red-black', results)
+
+
+@pytest.mark.parametrize('schedule', ['none', 'daytime', 'overnight'])
+def test_is_strategy_active_time(benchmark, analyzer, schedule):
+    times = {'none': (None, None), 'daytime': ('00:00', '23:59'), 'overnight': ('22:00', '06:00')}[schedule]
+    strategy = {'id': 1, 'start_time': times[0], 'end_time': times[1]}
+    analyzer.analyze_game_data('mines', analyzer.simulate_game_data('mines'), [], update_history=False)
+
+    active = benchmark(analyzer._is_strategy_active_time, 'mines', strategy)
+
+    if schedule != 'overnight':
+        assert active
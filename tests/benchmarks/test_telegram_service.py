@@ -0,0 +1,36 @@
+import pytest
+
+from src.services.telegram_service import TelegramService, load_requests
+
+SIGNAL_DATA = {
+    'pattern': 'red-red-black',
+    'action': 'bet_red',
+    'confidence': 82,
+    'target_multiplier': '2.0x',
+    'timestamp': '2026-01-01T12:00:00'
+}
+
+
+@pytest.fixture
+def service(fake_telegram):
+    service = TelegramService('123:bench', session=load_requests().Session())
+    service.base_url = f'{fake_telegram}/bot123:bench'
+    yield service
+    service.session.close()
+
+
+@pytest.mark.parametrize('method', ['_format_mines_message', '_format_aviator_message', '_format_generic_message'])
+def test_format_message(benchmark, service, method):
+    text = benchmark(getattr(service, method), SIGNAL_DATA)
+    assert 'Confiança: 82%' in text
+
+
+def test_format_digest_message(benchmark, service):
+    texts = [service._format_mines_message(SIGNAL_DATA)] * 10
+    text = benchmark(service.format_digest_message, texts)
+    assert text.count('SINAL MINES') == 10
+
+
+def test_send_signal_message(benchmark, service):
+    result = benchmark(service.send_signal_message, '1000', 'mines', SIGNAL_DATA)
+    assert result['success']
@@ -0,0 +1,62 @@
+"""
+Fixtures dos testes de comportamento
+
+Cada teste recebe uma aplicação com um SQLite próprio em arquivo
+temporário (threads de background enxergam as mesmas tabelas) e os
+singletons de serviço voltam ao estado inicial ao final.
+"""
+import os
+
+# Sem log de rodadas nem checkpoint em disco por padrão (os testes ligam o que usam)
+os.environ.setdefault('EVENT_LOG', '0')
+os.environ.setdefault('CHECKPOINT_INTERVAL', '0')
+
+import pytest
+
+from src.main import create_app, ensure_schema
+from src.models.user import db
+from src.models.bot import Bot, Strategy
+from src.services.feed_router import feed_router
+from src.services.http_cache import versions, response_cache
+from src.services.strategy_index import strategy_index
+
+
+def make_bot(strategies=1, **fields):
+    """Robô gravado no banco com `strategies` estratégias ativas"""
+    values = {
+        'name': 'Robô', 'game_type': 'mines', 'casino_site': 'casino',
+        'telegram_token': '1:token', 'telegram_chat_id': '1000'
+    }
+    values.update(fields)
+    bot = Bot(**values)
+    db.session.add(bot)
+    db.session.flush()
+    for index in range(strategies):
+        db.session.add(Strategy(bot_id=bot.id, name=f'Estratégia {index}', pattern='red-red-black',
+                                action='bet_red'))
+    db.session.commit()
+    return bot
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação com SQLite em arquivo temporário e sem threads de background"""
+    # Versões e corpos em cache de outro banco não valem para este
+    versions._versions.clear()
+    versions._synced_at = 0.0
+    response_cache._entries.clear()
+    app = create_app(f"sqlite:///{tmp_path / 'app.db'}")
+    app.config['TESTING'] = True
+    ensure_schema(app)
+    app.extensions['roasbot']['services_pid'] = os.getpid()
+    with app.app_context():
+        yield app
+        db.session.remove()
+    feed_router._feeds.clear()
+    feed_router.event_log = None
+    strategy_index.invalidate()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
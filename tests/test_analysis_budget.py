@@ -0,0 +1,102 @@
+"""Prazo de análise: prioridade, envelhecimento das descartadas e análise síncrona"""
+import time
+
+import pytest
+
+from src.services import signal_analyzer as analyzer_module
+from src.services.feed_router import Feed
+from src.services.signal_analyzer import SignalAnalyzer
+
+GAME_DATA = {'mines_positions': [1, 2, 3], 'safe_positions': [4, 5]}
+
+
+class Calls(list):
+    """Ids avaliados, com o relógio que os acompanha"""
+
+
+class FakeClock:
+    """Relógio que avança 1s a cada estratégia avaliada"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def evaluated(monkeypatch):
+    """Ids das estratégias avaliadas, em ordem, com o relógio falso"""
+    clock = FakeClock()
+    calls = Calls()
+
+    def detect(self, game_type, strategy, game_data):
+        calls.append(strategy['id'])
+        clock.now += 1.0
+        return None
+
+    monkeypatch.setattr(analyzer_module, 'clock', clock)
+    monkeypatch.setattr(SignalAnalyzer, '_detect_pattern_signal', detect)
+    calls.clock = clock
+    return calls
+
+
+@pytest.fixture
+def strategies():
+    return [{'id': strategy_id, 'is_active': True} for strategy_id in range(1, 6)]
+
+
+def analyze_round(analyzer, strategies, evaluated, budget=2.0):
+    evaluated.clear()
+    evaluated.clock.now = 0.0
+    analyzer.analyze_game_data('mines', GAME_DATA, strategies, deadline=budget)
+    return list(evaluated)
+
+
+def test_priority_order_and_starvation_aging(evaluated, strategies):
+    analyzer = SignalAnalyzer()
+
+    # Cabem duas estratégias por rodada: as primeiras em prioridade
+    assert analyze_round(analyzer, strategies, evaluated) == [1, 2]
+    assert analyzer.last_shed == 3
+    assert analyzer.starved == {3: 1, 4: 1, 5: 1}
+
+    # As descartadas passam à frente na rodada seguinte
+    assert analyze_round(analyzer, strategies, evaluated) == [3, 4]
+    assert analyzer.starved == {5: 2, 1: 1, 2: 1}
+
+    # A mais atrasada primeiro: nenhuma fica sem avaliação indefinidamente
+    assert analyze_round(analyzer, strategies, evaluated) == [5, 1]
+    assert analyzer.starved == {2: 2, 3: 1, 4: 1}
+
+    # Sem prazo todas são avaliadas e o envelhecimento zera
+    evaluated.clear()
+    analyzer.analyze_game_data('mines', GAME_DATA, strategies)
+    assert sorted(evaluated) == [1, 2, 3, 4, 5]
+    assert analyzer.last_shed == 0
+    assert analyzer.starved == {}
+
+
+def test_sync_analysis_has_no_deadline(monkeypatch, strategies):
+    calls = []
+    monkeypatch.setattr(SignalAnalyzer, '_detect_pattern_signal',
+                        lambda self, game_type, strategy, game_data: calls.append(strategy['id']) or time.sleep(0.002))
+    feed = Feed('casino', 'mines', budget_ms=0.001)
+
+    feed.analyze(GAME_DATA, strategies)
+    assert calls == [1, 2, 3, 4, 5]
+    assert feed.late_ticks == 0
+    assert feed.strategies_shed == 0
+
+
+def test_queued_round_past_its_deadline_only_feeds_history(monkeypatch, strategies):
+    calls = []
+    monkeypatch.setattr(SignalAnalyzer, '_detect_pattern_signal',
+                        lambda self, game_type, strategy, game_data: calls.append(strategy['id']))
+    feed = Feed('casino', 'mines', budget_ms=1)
+
+    assert feed.analyze(GAME_DATA, strategies, received_at=time.monotonic() - 1) == []
+    assert calls == []
+    assert feed.late_ticks == 1
+    assert feed.strategies_shed == len(strategies)
+    assert len(feed.analyzer.game_history['mines']) == 1
@@ -0,0 +1,99 @@
+"""Importação, atualização e exportação em lote"""
+import pytest
+from sqlalchemy import event
+
+from src.models.user import db
+from src.models.bot import Bot, Strategy
+from src.services.serializer import loads
+from tests.conftest import make_bot
+
+
+def export_lines(client):
+    response = client.get('/api/export')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [loads(line) for line in response.get_data().splitlines()]
+
+
+def test_export_import_round_trip(client):
+    make_bot(strategies=2, name='Primeiro', digest_window=2.5)
+    make_bot(strategies=0, name='Vazio', is_active=False)
+    make_bot(strategies=1, name='Terceiro')
+    exported = export_lines(client)
+    assert [len(bot['strategies']) for bot in exported] == [2, 0, 1]
+
+    body = client.get('/api/export').get_data()
+    response = client.post('/api/bots/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 201
+    data = response.get_json()['data']
+    assert (data['bots_created'], data['strategies_created']) == (3, 3)
+
+    imported = {bot.id: bot for bot in Bot.query.filter(Bot.id.in_(data['bot_ids']))}
+    for original, bot_id in zip(exported, data['bot_ids']):
+        bot = imported[bot_id]
+        assert (bot.name, bot.digest_window, bot.is_active) == \
+            (original['name'], original['digest_window'], original['is_active'])
+        names = [strategy.name for strategy in Strategy.query.filter_by(bot_id=bot_id).order_by(Strategy.id)]
+        assert names == [strategy['name'] for strategy in original['strategies']]
+
+
+def test_import_is_all_or_nothing(client):
+    response = client.post('/api/bots/bulk', json=[
+        {'name': 'Ok', 'game_type': 'mines', 'casino_site': 'c', 'telegram_token': 't', 'telegram_chat_id': '1'},
+        {'name': 'Sem chat', 'game_type': 'mines', 'casino_site': 'c', 'telegram_token': 't'}
+    ])
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'index': 1, 'error': 'Campo obrigatório: telegram_chat_id'}]
+    assert Bot.query.count() == 0
+
+
+@pytest.mark.parametrize('bot_id', [True, False, '1', 1.0])
+def test_create_rejects_non_integer_bot_id(client, bot_id):
+    make_bot(strategies=0)
+
+    response = client.post('/api/strategies/bulk', json=[
+        {'bot_id': bot_id, 'name': 'E', 'pattern': 'red', 'action': 'bet_red'}
+    ])
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['error'] == 'Campo obrigatório: bot_id'
+    assert Strategy.query.count() == 0
+
+
+def test_update_rejects_bool_id(client):
+    make_bot(strategies=1)
+
+    response = client.put('/api/strategies/bulk', json=[{'id': True, 'name': 'Renomeada'}])
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'index': 0, 'error': 'Campo obrigatório: id'}]
+    assert Strategy.query.one().name == 'Estratégia 0'
+
+
+def test_update_batches_rows_by_column_set(app, client):
+    bot = make_bot(strategies=4)
+    ids = [strategy.id for strategy in Strategy.query.filter_by(bot_id=bot.id).order_by(Strategy.id)]
+
+    updates = []
+
+    def count_updates(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE strategies'):
+            updates.append(executemany)
+
+    event.listen(db.engine, 'before_cursor_execute', count_updates)
+    try:
+        response = client.put('/api/strategies/bulk', json=[
+            {'id': ids[0], 'name': 'A'},
+            {'id': ids[1], 'is_active': False},
+            {'id': ids[2], 'name': 'C'},
+            {'id': ids[3], 'is_active': False}
+        ])
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_updates)
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'updated': 4}
+    # Duas formas de linha, dois executemany (não um UPDATE por linha)
+    assert updates == [True, True]
+
+    strategies = {strategy.id: strategy for strategy in Strategy.query.populate_existing()}
+    assert [strategies[strategy_id].name for strategy_id in ids] == ['A', 'Estratégia 1', 'C', 'Estratégia 3']
+    assert [strategies[strategy_id].is_active for strategy_id in ids] == [True, False, True, False]
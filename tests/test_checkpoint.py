@@ -0,0 +1,94 @@
+import zlib
+
+from src.models.bot import RoundEvent
+from src.models.user import db
+from src.services.checkpoint import AnalyzerCheckpoint, CHECKPOINT_MAGIC
+from src.services.event_log import RoundEventLog
+from src.services.feed_router import FeedRouter
+
+
+def _worker():
+    """Roteador + log de rodadas de um "processo" novo"""
+    router = FeedRouter()
+    log = RoundEventLog(enabled=True)
+    log.attach(router)
+    return router, log
+
+
+def _multipliers(router):
+    return [item['data']['multiplier'] for item in router.feed('casino', 'aviator').analyzer.history('aviator')]
+
+
+def test_warm_restart_round_trip(app, tmp_path):
+    path = str(tmp_path / 'state.bin')
+    router, log = _worker()
+    feed = router.feed('casino', 'aviator')
+    for index in range(10):
+        feed.record({'multiplier': 1.0 + index})
+    assert AnalyzerCheckpoint(path=path).save(router)
+
+    # Rodadas depois do checkpoint ficam só no log
+    for index in range(10, 13):
+        feed.record({'multiplier': 1.0 + index})
+
+    restarted, restarted_log = _worker()
+    assert AnalyzerCheckpoint(path=path).restore(restarted) == 1
+    assert restarted.feed('casino', 'aviator').event_id == 10
+    assert len(_multipliers(restarted)) == 10
+
+    assert restarted_log.sync() == 3
+    assert _multipliers(restarted) == _multipliers(router)
+    history = restarted.feed('casino', 'aviator').analyzer.history('aviator')
+    assert history.summary(minutes=5)['rounds'] == 13
+
+
+def test_rounds_in_snapshot_are_not_replayed(app, tmp_path):
+    path = str(tmp_path / 'state.bin')
+    router, log = _worker()
+    feed = router.feed('casino', 'aviator')
+    for index in range(5):
+        feed.record({'multiplier': 1.0 + index})
+    AnalyzerCheckpoint(path=path).save(router)
+
+    restarted, restarted_log = _worker()
+    AnalyzerCheckpoint(path=path).restore(restarted)
+    # Mesmo relendo o log desde o início, rodadas já aplicadas são ignoradas
+    restarted_log.last_id = 0
+    assert restarted_log.sync() == 0
+    assert _multipliers(restarted) == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_restore_keeps_tiers_beyond_the_log(app, tmp_path):
+    path = str(tmp_path / 'state.bin')
+    router, log = _worker()
+    feed = router.feed('casino', 'aviator')
+    for index in range(5):
+        feed.record({'multiplier': 1.0 + index})
+    AnalyzerCheckpoint(path=path).save(router)
+
+    # Log aparado: as primeiras rodadas só existem no checkpoint
+    RoundEvent.query.filter(RoundEvent.id <= 3).delete()
+    db.session.commit()
+
+    restarted, restarted_log = _worker()
+    AnalyzerCheckpoint(path=path).restore(restarted)
+    restarted_log.sync()
+    history = restarted.feed('casino', 'aviator').analyzer.history('aviator')
+    assert history.total_rounds == 5
+    assert history.summary(hours=1)['rounds'] == 5
+
+
+def test_checkpoint_file_format(app, tmp_path):
+    path = tmp_path / 'state.bin'
+    router, log = _worker()
+    router.feed('casino', 'aviator').record({'multiplier': 1.5})
+    checkpoint = AnalyzerCheckpoint(path=str(path))
+    assert checkpoint.save(router)
+    assert not checkpoint.save(router)  # Nada mudou
+
+    data = path.read_bytes()
+    assert data.startswith(CHECKPOINT_MAGIC)
+    assert zlib.decompress(data[6:]).startswith(b'{')
+
+    path.write_bytes(b'{"version": 1, "feeds": []}')
+    assert AnalyzerCheckpoint(path=str(path)).restore(FeedRouter()) == 0
@@ -0,0 +1,115 @@
+"""Contadores das estratégias aplicados com UPDATE incremental no SQL"""
+import threading
+
+import pytest
+
+from src.models.user import db
+from src.models.bot import Strategy
+from src.models.engine import writer_session
+from src.services.counters import StrategyCounters
+from src.services.http_cache import versions, strategies_key
+from tests.conftest import make_bot
+
+
+def strategy_of(bot):
+    return Strategy.query.filter_by(bot_id=bot.id).one()
+
+
+def reload(strategy):
+    return db.session.get(Strategy, strategy.id, populate_existing=True)
+
+
+def test_tick_mode_flushes_at_end_of_round(app):
+    bot = make_bot()
+    strategy = strategy_of(bot)
+    counters = StrategyCounters(mode='tick')
+    version = versions.get(strategies_key(bot.id))
+
+    counters.add(strategy.id, bot.id, total_signals=1, wins=1)
+    counters.add(strategy.id, bot.id, total_signals=1, losses=1)
+    assert reload(strategy).total_signals == 0
+
+    counters.end_tick()
+    strategy = reload(strategy)
+    assert (strategy.total_signals, strategy.wins, strategy.losses) == (2, 1, 1)
+    assert counters.stats()['flushes'] == 1
+    # Listagem das estratégias do robô invalidada
+    assert versions.get(strategies_key(bot.id)) == version + 1
+
+
+def test_increments_are_relative_to_the_stored_value(app):
+    strategy = strategy_of(make_bot())
+    counters = StrategyCounters()
+
+    counters.add(strategy.id, total_signals=1)
+    # Escrita concorrente de outro processo entre o add e o flush
+    Strategy.query.filter_by(id=strategy.id).update({'total_signals': 10})
+    db.session.commit()
+    counters.flush()
+
+    assert reload(strategy).total_signals == 11
+
+
+def test_buffered_mode_waits_for_flush(app):
+    strategy = strategy_of(make_bot())
+    counters = StrategyCounters(mode='buffered')
+
+    counters.add(strategy.id, wins=1)
+    counters.end_tick()
+    assert reload(strategy).wins == 0
+    assert counters.stats()['pending_strategies'] == 1
+
+    assert counters.flush() == 1
+    assert reload(strategy).wins == 1
+
+
+def test_concurrent_adds_are_not_lost(app):
+    strategy = strategy_of(make_bot())
+    counters = StrategyCounters(mode='buffered')
+
+    def add_many():
+        for _ in range(500):
+            counters.add(strategy.id, total_signals=1)
+
+    threads = [threading.Thread(target=add_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters.flush()
+
+    assert reload(strategy).total_signals == 2000
+
+
+def test_failed_flush_keeps_increments(app, monkeypatch):
+    strategy = strategy_of(make_bot())
+    counters = StrategyCounters()
+    counters.add(strategy.id, strategy.bot_id, total_signals=3)
+
+    session = writer_session()
+    execute = session.execute
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('banco travado')
+
+    monkeypatch.setattr(session, 'execute', broken)
+    with pytest.raises(RuntimeError):
+        counters.flush()
+    monkeypatch.setattr(session, 'execute', execute)
+
+    counters.add(strategy.id, total_signals=1)
+    counters.flush()
+    assert reload(strategy).total_signals == 4
+
+
+def test_unknown_counter_and_discard(app):
+    strategy = strategy_of(make_bot())
+    counters = StrategyCounters()
+
+    with pytest.raises(ValueError):
+        counters.add(strategy.id, total=1)
+
+    counters.add(strategy.id, wins=5)
+    counters.discard(strategy.id)
+    assert counters.flush() == 0
+    assert reload(strategy).wins == 0
@@ -0,0 +1,112 @@
+"""Modo resumo: sinais do mesmo chat agrupados em uma mensagem"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.bot import Bot, Strategy
+from src.models.outbox import OutboxMessage, OUTBOX_PENDING, OUTBOX_SENT
+from src.services.outbox import outbox, parse_digest_window, TelegramOutbox
+from src.services.signal_dispatcher import dispatch_signals
+from src.services.telegram_service import TelegramService, MAX_MESSAGE_LENGTH
+from tests.conftest import make_bot
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Mensagens enviadas ao Telegram (chat_id, texto)"""
+    messages = []
+    monkeypatch.setattr(TelegramService, 'send_message',
+                        lambda self, chat_id, text, parse_mode='HTML': messages.append((chat_id, text)) or
+                        {'success': True})
+    return messages
+
+
+def dispatch(bot, round_id, text=None):
+    strategies = Strategy.query.filter_by(bot_id=bot.id).order_by(Strategy.id).all()
+    signals = [{'strategy_id': strategy.id, 'signal_data': {'pattern': text or strategy.name}}
+               for strategy in strategies]
+    return dispatch_signals('mines', {'round_id': round_id}, signals, 'casino')
+
+
+def make_due():
+    """Vencer os timers abertos (equivale a esperar a janela)"""
+    OutboxMessage.query.update({'next_attempt_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+
+def test_parse_digest_window():
+    assert parse_digest_window(None) == 0
+    assert parse_digest_window('2.5') == 2.5
+    assert parse_digest_window(10) == 10
+    for value in (-1, 10.5, 'rápido', [1]):
+        with pytest.raises(ValueError):
+            parse_digest_window(value)
+
+
+def test_update_rejects_invalid_window(client):
+    bot = make_bot()
+    response = client.put(f'/api/bots/{bot.id}', json={'digest_window': 60})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+    assert client.put(f'/api/bots/{bot.id}', json={'digest_window': 3}).status_code == 200
+    assert db.session.get(Bot, bot.id, populate_existing=True).digest_window == 3
+
+
+def test_signals_of_a_chat_are_sent_as_one_digest(app, sent):
+    bot = make_bot(strategies=3, digest_window=5)
+    digests = outbox.digests
+
+    dispatch(bot, 'r1')
+    dispatch(bot, 'r2')
+    rows = OutboxMessage.query.all()
+    assert len(rows) == 6
+    # Todas herdam o timer aberto pela primeira mensagem do chat
+    assert len({row.next_attempt_at for row in rows}) == 1
+    assert rows[0].next_attempt_at > datetime.utcnow()
+    assert outbox.drain() == {'sent': 0, 'retried': 0, 'failed': 0}
+
+    make_due()
+    assert outbox.drain()['sent'] == 6
+    assert len(sent) == 1
+    assert sent[0][1].startswith('📦 <b>6 SINAIS</b>')
+    assert outbox.digests == digests + 1
+    assert {row.status for row in OutboxMessage.query.populate_existing()} == {OUTBOX_SENT}
+
+
+def test_bots_without_window_send_each_signal(app, sent):
+    digest_bot = make_bot(strategies=2, digest_window=5, telegram_chat_id='1')
+    plain_bot = make_bot(strategies=2, telegram_chat_id='2')
+
+    dispatch(digest_bot, 'r1')
+    dispatch(plain_bot, 'r1')
+    assert outbox.drain()['sent'] == 2
+    assert [chat_id for chat_id, _ in sent] == ['2', '2']
+
+    make_due()
+    assert outbox.drain()['sent'] == 2
+    assert [chat_id for chat_id, _ in sent] == ['2', '2', '1']
+
+
+def test_digest_is_split_to_fit_telegram_limit(app, sent):
+    bot = make_bot(strategies=3, digest_window=5)
+    dispatch(bot, 'r1', text='x' * (MAX_MESSAGE_LENGTH // 2))
+
+    make_due()
+    assert outbox.drain()['sent'] == 3
+    assert len(sent) > 1
+    assert all(len(text) <= MAX_MESSAGE_LENGTH for _, text in sent)
+
+
+def test_timer_is_shared_between_processes(app):
+    bot = make_bot(digest_window=5)
+    first = TelegramOutbox().flush_time(bot.id, '1000', 5)
+    db.session.add(OutboxMessage(idempotency_key='k1', bot_id=bot.id, chat_id='1000', text='sinal',
+                                 status=OUTBOX_PENDING, attempts=0, next_attempt_at=first))
+    db.session.commit()
+
+    # Outro processo (outra instância) encontra o timer aberto no banco
+    assert TelegramOutbox().flush_time(bot.id, '1000', 5) == first
+    assert TelegramOutbox().flush_time(bot.id, '2000', 5) != first
+    assert TelegramOutbox().flush_time(bot.id, '1000', 0) <= datetime.utcnow()
@@ -0,0 +1,81 @@
+"""Configuração do banco: URL, pool, WAL e engine de leitura"""
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from src.models.user import db
+from src.models.engine import (engine_options, normalize_database_url, configure_database,
+                               read_engine, read_session, READ_BIND)
+
+
+def test_normalize_database_url():
+    assert normalize_database_url('postgres://u:s@host/db') == 'postgresql://u:s@host/db'
+    assert normalize_database_url('postgresql://u:s@host/db') == 'postgresql://u:s@host/db'
+    assert normalize_database_url('sqlite:///app.db') == 'sqlite:///app.db'
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '20')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+    monkeypatch.setenv('DB_POOL_RECYCLE', '60')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'off')
+
+    options = engine_options('postgresql://u:s@host/db')
+    assert options == {'pool_pre_ping': False, 'pool_size': 20, 'max_overflow': 0,
+                       'pool_timeout': 30.0, 'pool_recycle': 60}
+
+
+def test_sqlite_options():
+    memory = engine_options('sqlite://')
+    assert memory['connect_args']['check_same_thread'] is False
+    assert 'pool_size' not in memory  # Pool padrão para o banco em memória
+
+    file_options = engine_options('sqlite:////tmp/app.db')
+    assert file_options['connect_args']['timeout'] == 30.0
+    assert file_options['pool_size'] == 5
+
+
+@pytest.fixture
+def configured(tmp_path, monkeypatch):
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('DATABASE_READ_URL', raising=False)
+    app = Flask(__name__)
+    had_read_metadata = READ_BIND in db.metadatas
+    yield app, tmp_path
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # A réplica registra um MetaData no db compartilhado: os outros apps dos testes não têm esse bind
+    if not had_read_metadata:
+        db.metadatas.pop(READ_BIND, None)
+
+
+def test_sqlite_file_uses_wal_and_read_bind(configured):
+    app, tmp_path = configured
+    configure_database(app, f"sqlite:///{tmp_path / 'principal.db'}", f"sqlite:///{tmp_path / 'replica.db'}")
+
+    assert app.config['SQLALCHEMY_BINDS'][READ_BIND]['url'].endswith('replica.db')
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert read_engine() is db.engines[READ_BIND]
+        with read_session() as session:
+            assert session.get_bind().url.database.endswith('replica.db')
+
+
+def test_read_engine_falls_back_to_primary(configured):
+    app, tmp_path = configured
+    configure_database(app, f"sqlite:///{tmp_path / 'principal.db'}")
+
+    assert not app.config.get('SQLALCHEMY_BINDS')
+    with app.app_context():
+        assert read_engine() is db.engine
+
+
+def test_database_url_from_env(configured, monkeypatch):
+    app, tmp_path = configured
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'env.db'}")
+    configure_database(app)
+
+    assert app.config['SQLALCHEMY_DATABASE_URI'].endswith('env.db')
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == 5
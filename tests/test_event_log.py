@@ -0,0 +1,71 @@
+import threading
+
+from src.models.bot import RoundEvent
+from src.services.event_log import RoundEventLog
+from src.services.feed_router import FeedRouter, feed_router
+
+
+def _attached_router(app):
+    log = RoundEventLog(enabled=True)
+    router = FeedRouter()
+    log.attach(router)
+    return router, log
+
+
+def test_coalesced_rounds_reach_the_log(app):
+    router, log = _attached_router(app)
+    feed = router.feed('casino', 'aviator')
+    entered, release = threading.Event(), threading.Event()
+    handled = []
+
+    def handler(feed, game_data, received_at):
+        entered.set()
+        release.wait(5)
+        handled.append(game_data['multiplier'])
+        feed.analyze(game_data, [], received_at)
+
+    # O worker fica preso na primeira rodada enquanto as demais se acumulam na fila
+    rounds = 50
+    assert feed.submit({'multiplier': 1.0}, handler, app)
+    assert entered.wait(5)
+    for index in range(1, rounds):
+        assert feed.submit({'multiplier': 1.0 + index}, handler, app)
+    release.set()
+    feed._queue.join()
+
+    # Só a primeira e a última rodada são avaliadas; as do meio apenas entram no histórico
+    assert feed.coalesced == rounds - 2
+    assert handled == [1.0, float(rounds)]
+    assert feed.errors == 0
+    assert RoundEvent.query.count() == rounds
+    assert len(feed.analyzer.history('aviator')) == rounds
+
+
+def test_other_worker_sees_every_round(app):
+    router, log = _attached_router(app)
+    feed = router.feed('casino', 'aviator')
+    for index in range(10):
+        feed.record({'multiplier': 1.0 + index})
+
+    other_router, other_log = _attached_router(app)
+    assert other_log.sync() == 10
+    other = other_router.feed('casino', 'aviator').analyzer.history('aviator')
+    assert [item['data']['multiplier'] for item in other] == [1.0 + index for index in range(10)]
+
+    feed.record({'multiplier': 99.0})
+    assert other_log.sync() == 1
+    assert other[-1]['data']['multiplier'] == 99.0
+
+
+def test_ingest_burst_is_logged(app, client):
+    RoundEventLog(enabled=True).attach(feed_router)
+
+    for index in range(30):
+        response = client.post('/api/signals/ingest', json={
+            'game_type': 'aviator', 'casino_site': 'casino',
+            'game_data': {'multiplier': 1.5, 'crashed': True}
+        })
+        assert response.status_code == 202
+    feed_router.feed('casino', 'aviator')._queue.join()
+
+    assert RoundEvent.query.count() == 30
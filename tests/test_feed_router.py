@@ -0,0 +1,94 @@
+"""Feeds independentes por (casino_site, game_type) e suas rotas"""
+import threading
+
+from src.services.feed_router import Feed, FeedRouter, feed_router, feed_key
+from src.services.telegram_service import TelegramService
+from tests.conftest import make_bot
+
+GAME_DATA = {'mines_positions': [1, 2, 3], 'safe_positions': [4, 5]}
+
+
+def test_feeds_are_separate_per_casino_and_game():
+    router = FeedRouter()
+    first = router.feed('Casino', 'Mines')
+    assert router.feed('casino', 'mines') is first
+    assert first.key == feed_key('CASINO', 'MINES') == ('casino', 'mines')
+    assert router.feed(None, 'mines').key == ('default', 'mines')
+
+    other = router.feed('outro', 'mines')
+    first.analyze(GAME_DATA, [])
+    assert first.stats()['history_size'] == 1
+    assert other.stats()['history_size'] == 0
+    assert {feed.key for feed in router.find('mines')} == {('casino', 'mines'), ('default', 'mines'),
+                                                          ('outro', 'mines')}
+    assert router.find('mines', 'outro') == [other]
+    assert router.find('aviator') == []
+
+
+def test_analyze_route_uses_the_casino_feed(client):
+    make_bot(casino_site='casino')
+    response = client.post('/api/signals/analyze', json={'game_type': 'mines', 'casino_site': 'casino',
+                                                         'game_data': GAME_DATA})
+    assert response.status_code == 200
+    assert response.get_json()['data']['casino_site'] == 'casino'
+    assert feed_router.feed('casino', 'mines').ticks == 1
+    assert feed_router.feed('outro', 'mines').ticks == 0
+
+    response = client.post('/api/signals/analyze', json={'game_data': GAME_DATA})
+    assert response.status_code == 400
+
+
+def test_ingest_requires_game_and_casino(client):
+    response = client.post('/api/signals/ingest', json={'game_type': 'mines', 'game_data': GAME_DATA})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_ingest_is_processed_by_the_feed_worker(client):
+    done = threading.Event()
+    feed = feed_router.feed('casino', 'mines')
+    analyze = feed.analyze
+
+    def tracked(*args, **kwargs):
+        try:
+            return analyze(*args, **kwargs)
+        finally:
+            done.set()
+
+    feed.analyze = tracked
+    response = client.post('/api/signals/ingest', json={'game_type': 'mines', 'casino_site': 'casino',
+                                                        'game_data': GAME_DATA})
+    assert response.status_code == 202
+    assert response.get_json()['data']['queued'] is True
+    assert done.wait(5)
+    feed._queue.join()
+    assert feed.ticks == 1
+
+
+def test_full_queue_drops_the_round(client, monkeypatch):
+    # Sem worker, a fila de uma posição enche na segunda rodada
+    monkeypatch.setattr(Feed, '_ensure_worker', lambda self: None)
+    monkeypatch.setattr(feed_router, 'queue_size', 1)
+    payload = {'game_type': 'mines', 'casino_site': 'cheio', 'game_data': GAME_DATA}
+
+    assert client.post('/api/signals/ingest', json=payload).status_code == 202
+    response = client.post('/api/signals/ingest', json=payload)
+    assert response.status_code == 503
+
+    stats = client.get('/api/signals/feeds').get_json()['data']
+    assert [(feed['casino_site'], feed['dropped'], feed['queue_depth']) for feed in stats] == [('cheio', 1, 1)]
+
+
+def test_send_manual_signal(client, monkeypatch):
+    sent = []
+    monkeypatch.setattr(TelegramService, 'send_message',
+                        lambda self, chat_id, text, parse_mode='HTML': sent.append((chat_id, text)) or
+                        {'success': True})
+    bot = make_bot(telegram_chat_id='42')
+
+    response = client.post('/api/signals/send-manual', json={'bot_id': bot.id, 'message': 'Olá'})
+    assert response.get_json() == {'success': True}
+    assert sent == [('42', 'Olá')]
+
+    response = client.post('/api/signals/send-manual', json={'bot_id': 9999, 'message': 'Olá'})
+    assert response.status_code == 404
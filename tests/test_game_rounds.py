@@ -0,0 +1,83 @@
+"""Rodadas tipadas (game_rounds) e migração do game_data legado"""
+import sqlite3
+
+from src.main import create_app, ensure_schema
+from src.models.user import db
+from src.models.bot import Strategy, GameResult, GameRound
+from src.models.migrations import migrate_game_data_to_rounds
+from tests.conftest import make_bot
+
+
+def test_round_trip_keeps_original_game_data():
+    game_data = {
+        'result': 'red', 'multiplier': 2.5, 'crashed': False, 'value': 7,
+        'timestamp': '2026-01-02T03:04:05', 'mines_positions': [1, 2]
+    }
+    game_round = GameRound.from_game_data('double', game_data, 'casino')
+
+    assert (game_round.result_code, game_round.multiplier, game_round.crashed, game_round.value) == (1, 2.5, False, 7)
+    assert game_round.played_at.isoformat() == '2026-01-02T03:04:05'
+    # Só o que não tem coluna vai para extra
+    assert game_round.extra == '{"mines_positions": [1, 2]}'
+    assert game_round.to_game_data() == game_data
+
+
+def test_values_without_a_typed_column_stay_in_extra():
+    game_data = {'result': 'azul', 'multiplier': 'alto', 'value': True, 'timestamp': 'ontem'}
+    game_round = GameRound.from_game_data('double', game_data)
+
+    assert (game_round.result_code, game_round.multiplier, game_round.value, game_round.played_at) == \
+        (None, None, None, None)
+    assert game_round.to_game_data() == game_data
+
+
+def test_migration_shares_rounds_and_clears_legacy_json(app):
+    bot = make_bot(strategies=2, game_type='double')
+    first, second = Strategy.query.filter_by(bot_id=bot.id).order_by(Strategy.id).all()
+    same_round = '{"result": "black", "multiplier": 1.5}'
+    db.session.add_all([
+        GameResult(strategy_id=first.id, game_data=same_round, result='win'),
+        GameResult(strategy_id=second.id, game_data=same_round, result='loss'),
+        GameResult(strategy_id=first.id, game_data='não é json'),
+        GameResult(strategy_id=first.id, game_data='[1, 2]')
+    ])
+    db.session.commit()
+
+    assert migrate_game_data_to_rounds(batch_size=2) == 4
+    assert migrate_game_data_to_rounds() == 0  # Idempotente
+
+    results = GameResult.query.order_by(GameResult.id).all()
+    assert all(result.game_data is None and result.round_id for result in results)
+    assert results[0].round_id == results[1].round_id
+    assert GameRound.query.count() == 3
+    assert results[0].round.game_type == 'double'
+    assert [result.to_dict(as_string=False)['game_data'] for result in results] == [
+        {'result': 'black', 'multiplier': 1.5},
+        {'result': 'black', 'multiplier': 1.5},
+        {'raw': 'não é json'},
+        {'value': [1, 2]}
+    ]
+
+
+def test_schema_upgrade_from_legacy_game_results(tmp_path):
+    path = tmp_path / 'legado.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            'CREATE TABLE game_results (id INTEGER PRIMARY KEY, strategy_id INTEGER NOT NULL, '
+            'game_data TEXT NOT NULL, signal_sent BOOLEAN, result VARCHAR(20), used_gale BOOLEAN, '
+            'timestamp DATETIME)'
+        )
+        conn.execute(
+            "INSERT INTO game_results (strategy_id, game_data, result, timestamp) "
+            "VALUES (99, '{\"multiplier\": 3.0}', 'win', '2026-01-01 00:00:00')"
+        )
+
+    app = create_app(f'sqlite:///{path}')
+    ensure_schema(app)
+    with app.app_context():
+        result = GameResult.query.one()
+        assert result.game_data is None
+        assert result.round.game_type == 'unknown'  # Estratégia inexistente
+        assert result.to_dict(as_string=False)['game_data'] == {'multiplier': 3.0}
+        assert result.result == 'win'
+        db.session.remove()
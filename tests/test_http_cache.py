@@ -0,0 +1,85 @@
+"""ETag e GET condicional das listagens de robôs e estratégias"""
+from src.services.http_cache import response_cache, versions, VersionRegistry, bots_key
+from src.models.user import db
+from src.models.cache import CacheVersion
+from tests.conftest import make_bot
+
+NEW_BOT = {'name': 'Novo', 'game_type': 'mines', 'casino_site': 'casino',
+           'telegram_token': '1:token', 'telegram_chat_id': '1000'}
+
+
+def test_not_modified_until_a_write(client):
+    make_bot()
+    first = client.get('/api/bots')
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    not_modified = response_cache.not_modified
+    response = client.get('/api/bots', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response_cache.not_modified == not_modified + 1
+
+    assert client.post('/api/bots', json=NEW_BOT).status_code == 201
+    response = client.get('/api/bots', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(response.get_json()['data']) == 2
+
+
+def test_projections_have_their_own_etag_and_body(client):
+    make_bot()
+    full = client.get('/api/bots')
+    summary = client.get('/api/bots?view=summary')
+    assert full.headers['ETag'] != summary.headers['ETag']
+    assert 'telegram_chat_id' in full.get_json()['data'][0]
+    assert 'telegram_chat_id' not in summary.get_json()['data'][0]
+
+    # Ordem dos parâmetros não muda a representação
+    first = client.get('/api/bots?view=summary&fields=id,name')
+    second = client.get('/api/bots?fields=id,name&view=summary')
+    assert first.headers['ETag'] == second.headers['ETag']
+
+
+def test_cached_body_is_reused_while_version_is_unchanged(client):
+    make_bot()
+    client.get('/api/bots')
+    hits = response_cache.hits
+    client.get('/api/bots')
+    assert response_cache.hits == hits + 1
+
+
+def test_strategy_listing_is_versioned_per_bot(client):
+    first = make_bot(strategies=1)
+    second = make_bot(strategies=1)
+    etag_first = client.get(f'/api/bots/{first.id}/strategies').headers['ETag']
+    etag_second = client.get(f'/api/bots/{second.id}/strategies').headers['ETag']
+
+    response = client.post('/api/strategies', json={'bot_id': first.id, 'name': 'Nova',
+                                                    'pattern': 'red-red', 'action': 'bet_black'})
+    assert response.status_code == 201
+
+    assert client.get(f'/api/bots/{first.id}/strategies',
+                      headers={'If-None-Match': etag_first}).status_code == 200
+    assert client.get(f'/api/bots/{second.id}/strategies',
+                      headers={'If-None-Match': etag_second}).status_code == 304
+
+
+def test_invalid_projection_is_rejected_before_the_304(client):
+    make_bot()
+    etag = client.get('/api/bots').headers['ETag']
+    response = client.get('/api/bots?view=nenhuma', headers={'If-None-Match': etag})
+    assert response.status_code == 400
+
+
+def test_versions_from_other_workers_are_seen_after_sync(app):
+    worker = VersionRegistry(sync_interval=3600)
+    worker.sync()
+    before = worker.get(bots_key())
+
+    # Outro worker grava (registro próprio): este só vê após sincronizar
+    versions.bump(bots_key())
+    assert worker.get(bots_key()) == before
+    worker.sync()
+    assert worker.get(bots_key()) == before + 1
+    assert db.session.get(CacheVersion, bots_key()).version == before + 1
@@ -0,0 +1,159 @@
+"""Monitores por robô: controle pelo admin, posse entre workers e retomada"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.monitor import MonitorLease
+from src.services import monitors as monitors_module
+from src.services.monitors import monitors, process_owner, MONITOR_RUNNING, MONITOR_PAUSED
+from tests.conftest import make_bot
+
+ADMIN = {'X-Admin-Token': 'segredo'}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'segredo')
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(app):
+    yield
+    for monitor in list(monitors._monitors.values()):
+        monitor.stop()
+        if monitor._thread is not None:
+            monitor._thread.join(5)
+    monitors._monitors.clear()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def lease(bot_id):
+    return db.session.get(MonitorLease, bot_id, populate_existing=True)
+
+
+def test_start_pause_stop(client):
+    bot = make_bot()
+
+    response = client.post(f'/api/admin/monitors/{bot.id}/start', json={'interval': 0.05}, headers=ADMIN)
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['state'] == MONITOR_RUNNING
+    assert data['local'] is True
+    assert lease(bot.id).owner == process_owner()
+
+    monitor = monitors._monitors[bot.id]
+    assert wait_for(lambda: monitor.ticks >= 2)
+
+    response = client.post(f'/api/admin/monitors/{bot.id}/pause', headers=ADMIN)
+    assert response.get_json()['data']['state'] == MONITOR_PAUSED
+    assert lease(bot.id).desired_state == MONITOR_PAUSED
+    ticks = monitor.ticks
+    time.sleep(0.2)
+    assert monitor.ticks == ticks
+    assert monitor.alive
+
+    response = client.post(f'/api/admin/monitors/{bot.id}/start', headers=ADMIN)
+    assert response.get_json()['data']['state'] == MONITOR_RUNNING
+    assert wait_for(lambda: monitor.ticks > ticks)
+
+    response = client.post(f'/api/admin/monitors/{bot.id}/stop', headers=ADMIN)
+    assert response.status_code == 200
+    monitor._thread.join(5)
+    assert not monitor.alive
+    assert lease(bot.id).desired_state == 'stopped'
+    assert lease(bot.id).owner is None
+    assert client.get(f'/api/admin/monitors/{bot.id}', headers=ADMIN).get_json()['data']['state'] == 'stopped'
+
+
+@pytest.mark.parametrize('interval', [0, -5, 'rápido', True])
+def test_start_rejects_invalid_interval(client, interval):
+    bot = make_bot()
+
+    response = client.post(f'/api/admin/monitors/{bot.id}/start', json={'interval': interval}, headers=ADMIN)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert lease(bot.id) is None
+    assert bot.id not in monitors._monitors
+
+
+@pytest.mark.parametrize('interval', [float('nan'), float('inf'), '30'])
+def test_registry_rejects_invalid_interval(app, interval):
+    bot = make_bot()
+    with pytest.raises(ValueError):
+        monitors.start(app, bot.id, interval)
+    assert lease(bot.id) is None
+
+
+def test_start_does_not_take_a_live_lease_from_another_worker(app, monkeypatch):
+    bot = make_bot()
+    db.session.add(MonitorLease(bot_id=bot.id, desired_state=MONITOR_RUNNING, interval=0.05,
+                                owner='outro:1', heartbeat_at=datetime.utcnow()))
+    db.session.commit()
+
+    status = monitors.start(app, bot.id)
+    assert status['local'] is False
+    assert status['owner'] == 'outro:1'
+    assert bot.id not in monitors._monitors
+
+    # Sem heartbeat além do prazo: a posse pode ser assumida
+    monkeypatch.setattr(monitors_module, 'MONITOR_LEASE_SECONDS', 1)
+    lease(bot.id).heartbeat_at = datetime.utcnow() - timedelta(seconds=5)
+    db.session.commit()
+
+    status = monitors.start(app, bot.id)
+    assert status['local'] is True
+    assert lease(bot.id).owner == process_owner()
+
+
+def test_monitor_stops_when_another_worker_takes_over(app):
+    bot = make_bot()
+    monitors.start(app, bot.id, 0.05)
+    monitor = monitors._monitors[bot.id]
+    assert wait_for(lambda: monitor.ticks >= 1)
+
+    # Outro processo assumiu a posse (ex.: heartbeat atrasado): este monitor encerra sozinho
+    lease(bot.id).owner = 'outro:2'
+    lease(bot.id).heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    monitor._thread.join(5)
+    assert not monitor.alive
+    assert monitor.stop_reason == 'Assumido por outro processo'
+    assert lease(bot.id).owner == 'outro:2'
+
+
+def test_resume_restarts_requested_monitors(app):
+    running = make_bot(name='Rodando')
+    paused = make_bot(name='Pausado')
+    stopped = make_bot(name='Parado')
+    elsewhere = make_bot(name='Outro worker')
+    db.session.add_all([
+        MonitorLease(bot_id=running.id, desired_state=MONITOR_RUNNING, interval=0.05),
+        MonitorLease(bot_id=paused.id, desired_state=MONITOR_PAUSED, interval=0.05,
+                     owner='antigo:1', heartbeat_at=datetime.utcnow() - timedelta(hours=1)),
+        MonitorLease(bot_id=stopped.id, desired_state='stopped', interval=0.05),
+        MonitorLease(bot_id=elsewhere.id, desired_state=MONITOR_RUNNING, interval=0.05,
+                     owner='outro:1', heartbeat_at=datetime.utcnow())
+    ])
+    db.session.commit()
+
+    assert monitors.resume(app) == 2
+    assert set(monitors._monitors) == {running.id, paused.id}
+    assert wait_for(lambda: monitors._monitors[running.id].ticks >= 1)
+    assert monitors._monitors[paused.id].state == MONITOR_PAUSED
+    assert monitors._monitors[paused.id].ticks == 0
+    assert lease(paused.id).owner == process_owner()
+    assert lease(paused.id).desired_state == MONITOR_PAUSED
+
+    # Já rodando neste processo: não duplica a thread
+    assert monitors.resume(app) == 0
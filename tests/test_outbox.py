@@ -0,0 +1,136 @@
+"""Outbox do Telegram: reserva por token, contagem na entrega e drenagem"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.bot import Strategy, GameResult
+from src.models.outbox import OutboxMessage, OUTBOX_SENDING, OUTBOX_SENT, OUTBOX_FAILED
+from src.services.outbox import outbox
+from src.services.signal_dispatcher import dispatch_signals
+from src.services.telegram_service import TelegramService
+from tests.conftest import make_bot
+
+
+class FakeTelegram:
+    """Envios registrados em memória; `response` é a resposta de cada envio"""
+
+    def __init__(self):
+        self.messages = []
+        self.response = {'success': True}
+
+    def send_message(self, chat_id, text, parse_mode='HTML'):
+        self.messages.append((chat_id, text))
+        return dict(self.response)
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    fake = FakeTelegram()
+    monkeypatch.setattr(TelegramService, 'send_message', fake.send_message)
+    return fake
+
+
+def strategies_of(bot):
+    return Strategy.query.filter_by(bot_id=bot.id).order_by(Strategy.id).all()
+
+
+def dispatch(strategies, round_id):
+    signals = [{'strategy_id': strategy.id, 'signal_data': {'pattern': strategy.pattern}}
+               for strategy in strategies]
+    return dispatch_signals('mines', {'round_id': round_id}, signals, 'casino')
+
+
+def total_signals(strategy_id):
+    return db.session.get(Strategy, strategy_id, populate_existing=True).total_signals or 0
+
+
+def test_total_signals_counts_deliveries(app, telegram):
+    strategies = strategies_of(make_bot(strategies=2))
+    queued = dispatch(strategies, 'r1')
+    assert len(queued) == 2
+
+    # Enfileirar não conta: a mensagem ainda não saiu
+    assert [total_signals(strategy.id) for strategy in strategies] == [0, 0]
+
+    # Falha temporária: reagendada e ainda sem contar
+    telegram.response = {'success': False, 'error': 'timeout'}
+    assert outbox.drain() == {'sent': 0, 'retried': 2, 'failed': 0}
+    assert [total_signals(strategy.id) for strategy in strategies] == [0, 0]
+
+    telegram.response = {'success': True}
+    OutboxMessage.query.update({'next_attempt_at': datetime.utcnow()})
+    db.session.commit()
+    assert outbox.drain() == {'sent': 2, 'retried': 0, 'failed': 0}
+    assert [total_signals(strategy.id) for strategy in strategies] == [1, 1]
+    assert all(result.signal_sent for result in GameResult.query)
+
+    # Rodada repetida: idempotente, nada novo a enviar nem a contar
+    assert dispatch(strategies, 'r1') == []
+    assert outbox.drain()['sent'] == 0
+    assert [total_signals(strategy.id) for strategy in strategies] == [1, 1]
+
+
+def test_permanent_failure_is_not_counted(app, telegram):
+    strategy = strategies_of(make_bot(strategies=1))[0]
+    dispatch([strategy], 'r1')
+
+    telegram.response = {'success': False, 'error': 'chat not found', 'status_code': 400}
+    assert outbox.drain() == {'sent': 0, 'retried': 0, 'failed': 1}
+    assert OutboxMessage.query.one().status == OUTBOX_FAILED
+    assert total_signals(strategy.id) == 0
+
+
+def test_drain_continues_after_a_lost_claim(app, telegram, monkeypatch):
+    strategy = strategies_of(make_bot(strategies=1))[0]
+    for round_id in range(3):
+        dispatch([strategy], f'r{round_id}')
+
+    # Primeira reserva perdida para outro processo (lote vazio com token)
+    claim = outbox._claim
+    calls = []
+
+    def racing_claim():
+        calls.append(1)
+        if len(calls) == 1:
+            return 'perdido', []
+        return claim()
+
+    monkeypatch.setattr(outbox, '_claim', racing_claim)
+    assert outbox.drain()['sent'] == 3
+    assert len(telegram.messages) == 3
+
+
+def test_expired_claim_is_reclaimed_and_live_claim_is_kept(app, telegram):
+    strategy = strategies_of(make_bot(strategies=1))[0]
+    dispatch([strategy], 'expired')
+    dispatch([strategy], 'live')
+    expired, live = OutboxMessage.query.order_by(OutboxMessage.id).all()
+
+    now = datetime.utcnow()
+    expired.status, expired.claim_token, expired.locked_until = OUTBOX_SENDING, 'caiu', now - timedelta(seconds=1)
+    live.status, live.claim_token, live.locked_until = OUTBOX_SENDING, 'vivo', now + timedelta(minutes=1)
+    db.session.commit()
+
+    assert outbox.drain()['sent'] == 1
+    db.session.expire_all()
+    assert db.session.get(OutboxMessage, expired.id).status == OUTBOX_SENT
+    live = db.session.get(OutboxMessage, live.id)
+    assert (live.status, live.claim_token) == (OUTBOX_SENDING, 'vivo')
+
+
+def test_record_is_fenced_by_claim_token(app, telegram, monkeypatch):
+    strategy = strategies_of(make_bot(strategies=1))[0]
+    dispatch([strategy], 'r1')
+
+    # A reserva expira durante o envio e outro processo assume a linha
+    def steal(service, chat_id, text, parse_mode='HTML'):
+        OutboxMessage.query.update({'claim_token': 'novo dono'}, synchronize_session=False)
+        db.session.commit()
+        return {'success': True}
+
+    monkeypatch.setattr(TelegramService, 'send_message', steal)
+    outbox.drain()
+
+    message = OutboxMessage.query.populate_existing().one()
+    assert (message.status, message.claim_token) == (OUTBOX_SENDING, 'novo dono')
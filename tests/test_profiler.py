@@ -0,0 +1,82 @@
+"""Profiler por amostragem e seus endpoints administrativos"""
+import sys
+import threading
+
+import pytest
+
+from src.services.profiler import SamplingProfiler, profiler
+
+ADMIN = {'X-Admin-Token': 'segredo'}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'segredo')
+    yield
+    profiler.stop()
+
+
+def test_admin_endpoints_require_token(client, monkeypatch):
+    assert client.get('/api/admin/profiler', headers={'X-Admin-Token': 'errado'}).status_code == 401
+    monkeypatch.delenv('ADMIN_TOKEN')
+    assert client.get('/api/admin/profiler', headers=ADMIN).status_code == 403
+
+
+def test_collects_collapsed_stacks(client):
+    ready = threading.Event()
+    release = threading.Event()
+
+    def wait_in_thread():
+        ready.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=wait_in_thread, name='amostrada', daemon=True)
+    thread.start()
+    ready.wait(5)
+    try:
+        response = client.post('/api/admin/profiler/start', headers=ADMIN,
+                               json={'duration': 5, 'interval_ms': 1, 'only_app': False})
+        assert response.status_code == 200
+        assert response.get_json()['data']['running'] is True
+
+        # Segunda sessão simultânea é recusada
+        assert client.post('/api/admin/profiler/start', headers=ADMIN, json={}).status_code == 409
+
+        while profiler.status()['samples'] < 3:
+            release.wait(0.01)
+        status = client.post('/api/admin/profiler/stop', headers=ADMIN).get_json()['data']
+    finally:
+        release.set()
+
+    assert status['running'] is False
+    assert status['samples'] >= 3
+
+    collapsed = client.get('/api/admin/profiler/stacks', headers=ADMIN).get_data(as_text=True)
+    lines = [line for line in collapsed.splitlines() if line.startswith('amostrada;')]
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert 'wait_in_thread (test_profiler.py:' in stack
+    assert int(count) >= 1
+
+    data = client.get('/api/admin/profiler/stacks?format=json&limit=1', headers=ADMIN).get_json()['data']
+    assert len(data['stacks']) == 1
+    assert isinstance(data['stacks'][0]['stack'], list)
+    assert data['stacks'][0]['samples'] >= 1
+
+
+def test_only_app_drops_stacks_outside_src():
+    sampler = SamplingProfiler()
+    frame = sys._getframe()
+    assert sampler._collapse_frame(frame) is None
+
+    sampler._only_app = False
+    assert sampler._collapse_frame(frame).endswith('test_only_app_drops_stacks_outside_src (test_profiler.py:'
+                                                   f'{frame.f_code.co_firstlineno})')
+
+
+def test_duration_and_interval_are_clamped():
+    sampler = SamplingProfiler()
+    status = sampler.start(duration=10000, interval_ms=0)
+    sampler.stop()
+    assert status['duration'] == 300
+    assert status['interval_ms'] == 1
@@ -0,0 +1,79 @@
+"""Visão geral dos robôs e projeções das listagens"""
+from src.models.user import db
+from src.models.bot import Strategy
+from tests.conftest import make_bot
+
+
+def _set_counters(strategy, **values):
+    for field, value in values.items():
+        setattr(strategy, field, value)
+    db.session.commit()
+
+
+def test_overview_aggregates_strategies_per_bot(client):
+    first = make_bot(strategies=2, name='Primeiro')
+    second = make_bot(strategies=1, name='Segundo', is_active=False)
+    empty = make_bot(strategies=0, name='Vazio')
+
+    strategies = Strategy.query.filter_by(bot_id=first.id).order_by(Strategy.id).all()
+    _set_counters(strategies[0], total_signals=6, wins=3, losses=3)
+    _set_counters(strategies[1], total_signals=4, wins=4, losses=0, is_active=False)
+
+    response = client.get('/api/bots/overview')
+    assert response.status_code == 200
+    overview = {bot['id']: bot for bot in response.get_json()['data']}
+
+    assert overview[first.id] == {
+        'id': first.id, 'name': 'Primeiro', 'game_type': 'mines', 'casino_site': 'casino',
+        'is_active': True, 'strategies': 2, 'active_strategies': 1, 'total_signals': 10,
+        'wins': 7, 'losses': 3, 'win_rate': 70.0
+    }
+    assert overview[second.id]['is_active'] is False
+    assert overview[second.id]['strategies'] == 1
+    # Robô sem estratégias aparece com totais zerados (outer join)
+    assert overview[empty.id]['strategies'] == 0
+    assert overview[empty.id]['total_signals'] == 0
+    assert overview[empty.id]['win_rate'] == 0.0
+    assert 'telegram_token' not in overview[first.id]
+
+
+def test_overview_fields(client):
+    bot = make_bot(strategies=1)
+
+    response = client.get('/api/bots/overview?fields=id,telegram_chat_id')
+    assert response.status_code == 200
+    row = response.get_json()['data'][0]
+    assert row['id'] == bot.id
+    assert row['telegram_chat_id'] == '1000'
+    assert 'name' not in row
+    assert row['strategies'] == 1
+
+
+def test_overview_rejects_unknown_fields(client):
+    make_bot()
+
+    response = client.get('/api/bots/overview?fields=id,telegram_token')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert 'telegram_token' in response.get_json()['error']
+
+
+def test_strategy_fields_compute_win_rate(client):
+    bot = make_bot(strategies=1)
+    _set_counters(Strategy.query.filter_by(bot_id=bot.id).one(), total_signals=4, wins=1)
+
+    response = client.get(f'/api/bots/{bot.id}/strategies?fields=id,win_rate')
+    assert response.status_code == 200
+    assert response.get_json()['data'] == [
+        {'id': Strategy.query.filter_by(bot_id=bot.id).one().id, 'win_rate': 25.0}
+    ]
+
+
+def test_summary_view_and_invalid_view(client):
+    make_bot()
+
+    response = client.get('/api/bots?view=summary')
+    assert response.status_code == 200
+    assert set(response.get_json()['data'][0]) == {'id', 'name', 'game_type', 'casino_site', 'is_active'}
+
+    assert client.get('/api/bots?view=compact').status_code == 400
@@ -0,0 +1,99 @@
+"""Retenção de game_results: arquivo diário, remoção e incremental_vacuum"""
+import gzip
+import os
+from datetime import datetime, date, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from src.models.user import db
+from src.models.bot import Strategy, GameResult, GameRound, ResultArchive
+from src.services import retention as retention_module
+from src.services.retention import RetentionService
+from src.services.serializer import loads
+from tests.conftest import make_bot
+
+NOW = datetime(2026, 3, 31, 12, 0)
+OLD_DAY = datetime(2026, 2, 1, 10, 0)  # Antes do corte de 30 dias
+
+
+@pytest.fixture
+def service(tmp_path):
+    return RetentionService(retention_days=30, archive_dir=str(tmp_path / 'archive'))
+
+
+def add_round(played_at=None, multiplier=2.0):
+    game_round = GameRound(game_type='aviator', casino_site='casino', multiplier=multiplier, played_at=played_at)
+    db.session.add(game_round)
+    db.session.flush()
+    return game_round
+
+
+def add_result(strategy_id, timestamp, game_round=None, result='win'):
+    db.session.add(GameResult(strategy_id=strategy_id, round_id=game_round.id if game_round else None,
+                              game_data=None if game_round else '{"legacy": true}',
+                              result=result, signal_sent=True, timestamp=timestamp))
+
+
+def test_archive_delete_and_vacuum(app, service, monkeypatch):
+    # Lotes pequenos: o dia é exportado em várias leituras
+    monkeypatch.setattr(retention_module, 'ARCHIVE_BATCH_SIZE', 2)
+    bot = make_bot(strategies=1)
+    strategy_id = Strategy.query.filter_by(bot_id=bot.id).one().id
+
+    dated = add_round(played_at=OLD_DAY)
+    undated = add_round(played_at=None, multiplier=3.0)
+    for minute in range(4):
+        add_result(strategy_id, OLD_DAY + timedelta(minutes=minute), dated)
+    add_result(strategy_id, OLD_DAY + timedelta(hours=1), undated, result='loss')
+    add_result(strategy_id, OLD_DAY + timedelta(days=1))  # Legado, sem rodada
+
+    # Rodadas recentes (ainda referenciadas ou mais novas que as arquivadas) ficam
+    recent_undated = add_round(played_at=None)
+    add_result(strategy_id, NOW - timedelta(days=1), recent_undated)
+    newer_orphan = add_round(played_at=None)
+    db.session.commit()
+
+    summary = service.run_once(now=NOW)
+
+    assert summary['archived_days'] == ['2026-02-01', '2026-02-02']
+    assert summary['archived_rows'] == 6
+    assert GameResult.query.count() == 1
+    assert {game_round.id for game_round in GameRound.query} == {recent_undated.id, newer_orphan.id}
+
+    archives = ResultArchive.query.order_by(ResultArchive.day).all()
+    assert [(archive.day, archive.row_count) for archive in archives] == \
+        [(date(2026, 2, 1), 5), (date(2026, 2, 2), 1)]
+    with gzip.open(archives[0].path, 'rb') as f:
+        rows = [loads(line) for line in f]
+    assert [row['result'] for row in rows] == ['win'] * 4 + ['loss']
+    assert rows[-1]['game_data']['multiplier'] == 3.0
+
+    archived = list(service.iter_archived_results(date(2026, 2, 1), date(2026, 2, 2)))
+    assert len(archived) == 6
+    assert archived[-1]['game_data'] == {'legacy': True}
+
+    with db.engine.connect() as conn:
+        assert conn.execute(text('PRAGMA auto_vacuum')).scalar() == 2
+
+    # Nada mais antes do corte: a próxima execução não arquiva nada
+    assert service.run_once(now=NOW)['archived_rows'] == 0
+
+
+def test_failed_export_keeps_rows(app, service, monkeypatch):
+    bot = make_bot(strategies=1)
+    strategy_id = Strategy.query.filter_by(bot_id=bot.id).one().id
+    add_result(strategy_id, OLD_DAY, add_round(played_at=OLD_DAY))
+    db.session.commit()
+
+    def broken(value):
+        raise RuntimeError('disco cheio')
+
+    monkeypatch.setattr(retention_module, 'dumps_bytes', broken)
+    with pytest.raises(RuntimeError):
+        service.run_once(now=NOW)
+
+    assert GameResult.query.count() == 1
+    assert ResultArchive.query.count() == 0
+    # Nem arquivo final nem temporário sobram no diretório
+    assert [name for name in os.listdir(service.archive_dir) if not name.startswith('.')] == []
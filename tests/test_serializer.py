@@ -0,0 +1,55 @@
+import pytest
+
+from src.models.bot import GameResult, GameRound
+from src.models.user import db
+from src.services import serializer
+from src.services.serializer import RawJSON, dumps_bytes, loads
+from tests.conftest import make_bot
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, monkeypatch):
+    monkeypatch.setenv('JSON_PROVIDER', request.param)
+    return request.param
+
+
+def test_raw_json_is_embedded_without_reencoding(provider):
+    body = dumps_bytes({'data': RawJSON('{"result":"red","multiplier":1.5}'), 'ids': (1, 2)})
+    assert loads(body) == {'data': {'result': 'red', 'multiplier': 1.5}, 'ids': [1, 2]}
+
+
+def test_orjson_passthrough_does_not_parse(monkeypatch):
+    monkeypatch.setenv('JSON_PROVIDER', 'orjson')
+    monkeypatch.setattr(serializer.orjson, 'loads', lambda data: pytest.fail('RawJSON foi reprocessado'))
+    assert dumps_bytes([RawJSON(b'{"a":1}')]) == b'[{"a":1}]'
+
+
+def _results():
+    bot = make_bot()
+    strategy = bot.strategies[0]
+    played = GameRound.from_game_data('mines', {'result': 'red', 'multiplier': 1.5})
+    db.session.add(played)
+    db.session.flush()
+    db.session.add_all([
+        GameResult(strategy_id=strategy.id, round_id=played.id),
+        GameResult(strategy_id=strategy.id, game_data='{"result": "black"}')
+    ])
+    db.session.commit()
+    return strategy
+
+
+def test_results_keep_string_game_data_by_default(app, client, monkeypatch):
+    monkeypatch.delenv('GAME_DATA_AS_STRING', raising=False)
+    strategy = _results()
+
+    data = client.get(f'/api/strategies/{strategy.id}/results').get_json()['data']
+    assert all(isinstance(result['game_data'], str) for result in data)
+    assert sorted(loads(result['game_data']).get('result') for result in data) == ['black', 'red']
+
+
+def test_results_as_objects_when_opted_in(app, client, monkeypatch):
+    monkeypatch.setenv('GAME_DATA_AS_STRING', '0')
+    strategy = _results()
+
+    data = client.get(f'/api/strategies/{strategy.id}/results').get_json()['data']
+    assert sorted(result['game_data']['result'] for result in data) == ['black', 'red']
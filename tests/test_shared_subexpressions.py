@@ -0,0 +1,87 @@
+"""Subexpressões compartilhadas entre estratégias dentro de uma rodada"""
+from src.services.signal_analyzer import SignalAnalyzer
+
+
+def strategies(count, pattern='red-red-black', **fields):
+    return [dict({'id': index, 'pattern': pattern, 'action': 'bet_red'}, **fields) for index in range(1, count + 1)]
+
+
+def feed_rounds(analyzer, game_type, rounds):
+    for game_data in rounds:
+        analyzer.record_round(game_type, game_data)
+
+
+def test_same_pattern_is_evaluated_once_per_round():
+    analyzer = SignalAnalyzer()
+    feed_rounds(analyzer, 'mines', [{'result': 'red'}, {'result': 'red'}])
+
+    signals = analyzer.analyze_game_data('mines', {'result': 'black'}, strategies(4))
+
+    assert [signal['strategy_id'] for signal in signals] == [1, 2, 3, 4]
+    assert signals[0]['signal_data']['last_results'] == ['red', 'red', 'black']
+    # Janela, resultados e correspondência calculados só para a primeira estratégia
+    assert analyzer.shared_evaluations == 3
+    assert analyzer.shared_hits == 6
+
+
+def test_values_are_recomputed_on_the_next_round():
+    analyzer = SignalAnalyzer()
+    feed_rounds(analyzer, 'mines', [{'result': 'red'}, {'result': 'red'}])
+    assert len(analyzer.analyze_game_data('mines', {'result': 'black'}, strategies(2))) == 2
+    tick = analyzer.pattern_cache['mines']['tick']
+
+    # A rodada seguinte não reaproveita a correspondência da anterior
+    assert analyzer.analyze_game_data('mines', {'result': 'black'}, strategies(2)) == []
+    assert analyzer.pattern_cache['mines']['tick'] == tick + 1
+    assert analyzer.pattern_cache['mines']['values']['results:3'] == ['red', 'black', 'black']
+
+
+def test_different_patterns_share_the_window():
+    analyzer = SignalAnalyzer()
+    feed_rounds(analyzer, 'mines', [{'result': 'red'}, {'result': 'red'}])
+    mixed = strategies(1) + [{'id': 2, 'pattern': 'black-black-black', 'action': 'bet_red'}]
+
+    signals = analyzer.analyze_game_data('mines', {'result': 'black'}, mixed)
+
+    assert [signal['strategy_id'] for signal in signals] == [1]
+    assert set(analyzer.pattern_cache['mines']['values']) == {
+        'window:3', 'results:3', 'match:3:red-red-black', 'match:3:black-black-black'
+    }
+
+
+def test_aviator_count_is_shared_and_kept_per_game():
+    analyzer = SignalAnalyzer()
+    feed_rounds(analyzer, 'aviator', [{'multiplier': value} for value in (1.1, 1.5, 3.0, 1.2)])
+    feed_rounds(analyzer, 'mines', [{'result': 'red'}, {'result': 'red'}])
+
+    signals = analyzer.analyze_game_data('aviator', {'multiplier': 1.3}, strategies(3, pattern='baixos'))
+    assert [signal['pattern'] for signal in signals] == ['Sequência de 4 multiplicadores baixos'] * 3
+    assert analyzer.pattern_cache['aviator']['values']['below:5:2.0'] == 4
+
+    # Outro jogo tem seu próprio cache: a rodada do aviator não é reaproveitada
+    signals = analyzer.analyze_game_data('mines', {'result': 'black'}, strategies(1))
+    assert len(signals) == 1
+    assert 'below:5:2.0' not in analyzer.pattern_cache['mines']['values']
+    assert 'below:5:2.0' in analyzer.pattern_cache['aviator']['values']
+
+
+def test_schedule_is_parsed_once_per_round():
+    analyzer = SignalAnalyzer()
+    feed_rounds(analyzer, 'mines', [{'result': 'red'}, {'result': 'red'}])
+    scheduled = strategies(3, start_time='00:00', end_time='23:59:59')
+
+    assert len(analyzer.analyze_game_data('mines', {'result': 'black'}, scheduled)) == 3
+    values = analyzer.pattern_cache['mines']['values']
+    assert {'now', 'time:00:00', 'time:23:59:59'} <= set(values)
+
+
+def test_pattern_cache_is_not_checkpointed():
+    analyzer = SignalAnalyzer()
+    feed_rounds(analyzer, 'mines', [{'result': 'red'}, {'result': 'red'}])
+    analyzer.analyze_game_data('mines', {'result': 'black'}, strategies(1))
+
+    restored = SignalAnalyzer()
+    restored.load_state(analyzer.export_state())
+    assert restored.pattern_cache == {}
+    assert restored.tick_ids == {'mines': 1}
+    assert len(restored.analyze_game_data('mines', {'result': 'red'}, strategies(1, pattern='red-black-red'))) == 1
@@ -0,0 +1,61 @@
+"""Inicialização: create_app sem banco, esquema e serviços na primeira requisição"""
+import os
+
+import pytest
+from sqlalchemy import inspect
+
+from src import main
+from src.main import create_app
+from src.models.user import db
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Serviços de background substituídos por registros das chamadas"""
+    calls = []
+    for name, method in (('retention', 'start'), ('counters', 'start'), ('outbox', 'start'),
+                         ('checkpoint', 'restore'), ('event_log', 'start'), ('checkpoint', 'start'),
+                         ('monitors', 'resume')):
+        monkeypatch.setattr(getattr(main, name), method,
+                            lambda *args, _name=f'{name}.{method}': calls.append(_name))
+    return calls
+
+
+def test_create_app_does_not_touch_the_database(tmp_path, started):
+    path = tmp_path / 'app.db'
+    app = create_app(f'sqlite:///{path}')
+
+    assert not path.exists()
+    assert app.extensions['roasbot'] == {'schema_ready': False, 'services_pid': None}
+    assert app.config['STARTUP_SECONDS'] >= 0
+    assert started == []
+
+
+def test_first_request_prepares_schema_and_services_once(tmp_path, started):
+    app = create_app(f"sqlite:///{tmp_path / 'app.db'}")
+    client = app.test_client()
+
+    assert client.get('/api/bots').status_code == 200
+    assert client.get('/api/bots').status_code == 200
+
+    state = app.extensions['roasbot']
+    assert state['schema_ready'] is True
+    assert state['services_pid'] == os.getpid()
+    assert started == ['retention.start', 'counters.start', 'outbox.start', 'checkpoint.restore',
+                       'event_log.start', 'checkpoint.start', 'monitors.resume']
+    with app.app_context():
+        assert {'bots', 'strategies', 'game_rounds', 'telegram_outbox'} <= set(inspect(db.engine).get_table_names())
+        db.session.remove()
+
+
+def test_services_restart_in_a_forked_worker(tmp_path, started):
+    app = create_app(f"sqlite:///{tmp_path / 'app.db'}")
+    client = app.test_client()
+    client.get('/api/bots')
+
+    # Worker criado por fork após o preload: outro pid, serviços ainda não iniciados nele
+    app.extensions['roasbot']['services_pid'] = -1
+    started.clear()
+    client.get('/api/bots')
+    assert started[0] == 'retention.start'
+    assert app.extensions['roasbot']['services_pid'] == os.getpid()
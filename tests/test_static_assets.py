@@ -0,0 +1,88 @@
+"""Manifesto estático: nomes versionados, compressão, 304 e recarga"""
+import os
+
+import pytest
+from flask import Flask
+
+from src.services import static_assets
+from src.services.static_assets import StaticManifest, IMMUTABLE_CACHE, REVALIDATE_CACHE
+
+SCRIPT = b'console.log("roasbot");\n' * 64
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(static_assets, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / 'index.html').write_bytes(b'<html><script src="app.js"></script></html>')
+    (tmp_path / 'app.js').write_bytes(SCRIPT)
+    return tmp_path
+
+
+@pytest.fixture
+def flask_app():
+    return Flask(__name__)
+
+
+def test_index_points_to_hashed_assets(folder, flask_app):
+    manifest = StaticManifest(str(folder))
+    app_js = manifest.lookup('app.js')
+    hashed = app_js.hashed_name()
+
+    assert f'src="/{hashed}"'.encode() in manifest.lookup('').body
+    assert manifest.lookup(hashed).cache_control == IMMUTABLE_CACHE
+    assert app_js.cache_control == REVALIDATE_CACHE
+    # Caminho desconhecido: fallback do SPA
+    assert manifest.lookup('painel/robos') is manifest.index
+
+    with flask_app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = manifest.respond(manifest.lookup(hashed))
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Cache-Control'] == IMMUTABLE_CACHE
+        etag = response.get_etag()[0]
+
+    with flask_app.test_request_context(headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'}):
+        assert manifest.respond(manifest.lookup(hashed)).status_code == 304
+
+
+def test_auto_reload_checks_mtimes_at_most_once_per_interval(folder, clock, monkeypatch):
+    manifest = StaticManifest(str(folder), auto_reload=True, reload_interval=1.0)
+    checks = []
+    getmtime = os.path.getmtime
+    monkeypatch.setattr(static_assets.os.path, 'getmtime', lambda path: checks.append(path) or getmtime(path))
+
+    for _ in range(100):
+        manifest.lookup('app.js')
+    assert checks == []
+
+    (folder / 'app.js').write_bytes(SCRIPT + b'// novo\n')
+    os.utime(folder / 'app.js', (1, 1))
+    assert manifest.lookup('app.js').body == SCRIPT  # Ainda dentro do intervalo
+
+    clock.now += 1.0
+    assert manifest.lookup('app.js').body == SCRIPT + b'// novo\n'
+    checks_after_reload = len(checks)
+    for _ in range(100):
+        manifest.lookup('app.js')
+    assert len(checks) == checks_after_reload
+
+
+def test_without_auto_reload_never_touches_the_filesystem(folder, clock, monkeypatch):
+    manifest = StaticManifest(str(folder))
+    monkeypatch.setattr(static_assets.os.path, 'getmtime', lambda path: pytest.fail('getmtime chamado'))
+
+    clock.now += 60
+    assert manifest.lookup('app.js').body == SCRIPT
@@ -0,0 +1,89 @@
+"""Registro de clientes do Telegram: LRU de clientes e de consultas com TTL"""
+import pytest
+
+from src.services import telegram_service
+from src.services.telegram_service import TelegramRegistry, TelegramService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(telegram_service, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """getMe falso: conta as chamadas por token; tokens 'ruim*' falham"""
+    calls = []
+
+    def get_bot_info(self):
+        calls.append(self.bot_token)
+        if self.bot_token.startswith('ruim'):
+            return {'success': False, 'error': 'Unauthorized'}
+        return {'success': True, 'data': {'result': {'username': self.bot_token}}}
+
+    monkeypatch.setattr(TelegramService, 'get_bot_info', get_bot_info)
+    return calls
+
+
+def test_clients_are_bounded_lru():
+    registry = TelegramRegistry(max_clients=2)
+    first = registry.get('a')
+    registry.get('b')
+    assert registry.get('a') is first  # 'a' passa a ser o mais recente
+    registry.get('c')
+
+    assert list(registry._clients) == ['a', 'c']
+    assert registry.get('a') is first
+
+
+def test_lookups_are_bounded_lru(clock, lookups):
+    registry = TelegramRegistry(max_lookups=2)
+    registry.get_bot_info('a')
+    registry.get_bot_info('b')
+    registry.get_bot_info('a')  # Acerto: 'a' passa a ser o mais recente
+    registry.get_bot_info('c')  # Descarta 'b', não 'a'
+
+    assert lookups == ['a', 'b', 'c']
+    assert list(registry._cache) == [('me', 'a'), ('me', 'c')]
+    assert registry.stats()['evictions'] == 1
+
+    registry.get_bot_info('b')
+    assert lookups == ['a', 'b', 'c', 'b']
+    assert len(registry._cache) == 2
+
+
+def test_lookups_expire_after_ttl(clock, lookups):
+    registry = TelegramRegistry(ttl=300, failure_ttl=30)
+    registry.get_bot_info('bom')
+    registry.get_bot_info('ruim')
+
+    clock.now += 31  # Falhas vencem antes
+    registry.get_bot_info('bom')
+    registry.get_bot_info('ruim')
+    assert lookups == ['bom', 'ruim', 'ruim']
+
+    clock.now += 300
+    assert registry.get_bot_info('bom')['success'] is True
+    assert lookups == ['bom', 'ruim', 'ruim', 'bom']
+    assert (registry.hits, registry.misses) == (1, 4)
+
+
+def test_forget_drops_client_and_lookups(clock, lookups):
+    registry = TelegramRegistry()
+    client = registry.get('a')
+    registry.get_bot_info('a')
+    registry.forget('a')
+
+    assert registry.get('a') is not client
+    registry.get_bot_info('a')
+    assert lookups == ['a', 'a']
@@ -0,0 +1,119 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.models.bot import RoundEvent
+from src.models.user import db
+from src.services.event_log import RoundEventLog
+from src.services.feed_router import FeedRouter
+from src.services.tiered_history import TieredHistory
+
+
+def _utc(minutes_ago=0):
+    return (datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)).isoformat()
+
+
+@pytest.fixture(params=['Asia/Tokyo', 'America/Sao_Paulo'])
+def local_timezone(request):
+    """Fuso local diferente de UTC durante o teste"""
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = request.param
+    time.tzset()
+    yield request.param
+    if previous is None:
+        os.environ.pop('TZ', None)
+    else:
+        os.environ['TZ'] = previous
+    time.tzset()
+
+
+def test_last_rounds_and_bounded_tiers():
+    history = TieredHistory(size=5, minutes=3, hours=2)
+    for index in range(10):
+        history.append({'multiplier': 1.0 + index}, _utc(minutes_ago=10 - index))
+
+    assert len(history) == 5
+    assert [item['data']['multiplier'] for item in history.last_rounds(3)] == [8.0, 9.0, 10.0]
+    assert history.total_rounds == 10
+    assert len(history.minutes) == 3
+    assert history.capacity() == {'rounds': 5, 'minutes': 3, 'hours': 2}
+
+
+def test_summary_counts_low_multipliers_and_results():
+    history = TieredHistory(size=10)
+    for multiplier, result in ((1.5, 'red'), (3.0, 'black'), (1.2, 'red')):
+        history.append({'multiplier': multiplier, 'result': result})
+
+    summary = history.summary(minutes=5)
+    assert summary['rounds'] == 3
+    assert summary['min_multiplier'] == 1.2
+    assert summary['max_multiplier'] == 3.0
+    assert summary['low_multiplier_rate'] == round(2 / 3 * 100, 2)
+    assert summary['results'] == {'red': 2, 'black': 1}
+
+
+def test_windows_are_anchored_to_the_clock():
+    history = TieredHistory(size=10)
+    history.append({'multiplier': 1.5}, _utc(minutes_ago=90))
+
+    # A rodada saiu da última hora, mesmo sendo a mais recente do feed
+    assert history.summary(minutes=60)['rounds'] == 0
+    assert history.summary(hours=3)['rounds'] == 1
+    later = time.time() - 80 * 60
+    assert history.summary(minutes=60, now=later)['rounds'] == 1
+
+
+def test_export_and_legacy_load():
+    history = TieredHistory(size=10)
+    for index in range(4):
+        history.append({'multiplier': 2.0 + index}, _utc(minutes_ago=4 - index))
+
+    restored = TieredHistory(size=10)
+    restored.load_state(history.export_state())
+    assert list(restored) == list(history)
+    assert restored.summary(minutes=10) == history.summary(minutes=10)
+
+    legacy = TieredHistory(size=10)
+    legacy.load_state(list(history))
+    assert legacy.summary(minutes=10)['rounds'] == 4
+
+
+def test_recent_round_in_window_under_local_timezone(local_timezone):
+    history = TieredHistory(size=10)
+    history.append({'multiplier': 1.5})
+    history.append({'multiplier': 1.7}, datetime.utcnow().isoformat())
+
+    assert history.summary(minutes=5)['rounds'] == 2
+    now_minute = int(time.time() // 60)
+    assert all(bucket.start <= now_minute for bucket in history.buckets(minutes=5))
+
+
+def test_event_log_rounds_in_window_under_local_timezone(app, local_timezone):
+    log = RoundEventLog(enabled=True)
+    router = FeedRouter()
+    log.attach(router)
+    db.session.add(RoundEvent.from_game_data('aviator', {'multiplier': 1.4}, 'casino'))
+    db.session.commit()
+
+    log.sync()
+    history = router.feed('casino', 'aviator').analyzer.history('aviator')
+    assert history.summary(minutes=5)['rounds'] == 1
+
+
+def test_history_route(app, client):
+    for index in range(3):
+        client.post('/api/signals/analyze', json={
+            'game_type': 'aviator', 'casino_site': 'casino',
+            'game_data': {'multiplier': 1.1 + index}
+        })
+
+    rounds = client.get('/api/signals/history/aviator?casino_site=casino&rounds=2').get_json()['data']
+    assert [item['data']['multiplier'] for item in rounds['rounds']] == [2.1, 3.1]
+
+    summary = client.get('/api/signals/history/aviator?casino_site=casino&minutes=5').get_json()['data']
+    assert summary['summary']['rounds'] == 3
+
+    assert client.get('/api/signals/history/aviator?minutes=5&hours=1').status_code == 400
+    assert client.get('/api/signals/history/aviator?rounds=0').status_code == 400